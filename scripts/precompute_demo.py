@@ -23,7 +23,7 @@ import pandas as pd
 
 from src.data_loader import RORLoader, ShapefileLoader
 from src.ror_engine import RORConstraintEngine, create_constraint_engine
-from src.confidence import ConfidenceScorer, ConflictDetector
+from src.confidence import ConfidenceScorer, ConflictDetector, FACTOR_NAMES, conflicts_to_records
 from src.topology import TopologyFixer
 
 
@@ -118,24 +118,12 @@ def process_village(village_config: dict) -> dict:
             'max_area': gdf['area_sqm'].max(),
         }
 
-        confidence_scores = []
-        confidence_factors_list = []
-        routings = []
+        scores = scorer.score_table(gdf, village_stats)
 
-        for idx, row in gdf.iterrows():
-            # Use the pandas Series directly - it supports both .get() and .attribute access
-            parcel_result = scorer.score_parcel(row, village_stats)
-
-            confidence_scores.append(parcel_result.confidence_score)
-            routings.append(parcel_result.routing.value)
-
-            # Get factors from parcel_result
-            factors = parcel_result.factors.to_dict() if parcel_result.factors else {}
-            confidence_factors_list.append(factors)
-
-        gdf['confidence'] = confidence_scores
-        gdf['routing'] = routings
-        gdf['confidence_factors'] = confidence_factors_list
+        gdf['confidence'] = scores['confidence']
+        gdf['routing'] = scores['routing']
+        gdf['confidence_factors'] = scores[FACTOR_NAMES].to_dict('records')
+        gdf['reason_codes'] = scores['reason_codes']  # Render with explain_parcel()
 
         # Detect conflicts
         print("Detecting conflicts...")
@@ -195,20 +183,8 @@ def process_village(village_config: dict) -> dict:
 
         # Save conflicts
         conflicts_path = CACHE_DIR / f"{name.lower()}_conflicts.json"
-        # Conflicts may be dicts or dataclass objects
-        conflicts_data = []
-        for c in conflicts:
-            if isinstance(c, dict):
-                conflicts_data.append(c)
-            else:
-                conflicts_data.append({
-                    'type': c.type,
-                    'severity': c.severity,
-                    'message': c.message,
-                    'details': c.details if hasattr(c, 'details') else {}
-                })
         with open(conflicts_path, 'w') as f:
-            json.dump(conflicts_data, f, indent=2)
+            json.dump(conflicts_to_records(conflicts), f, indent=2)
 
         result['success'] = True
         result['stats'] = stats
@@ -31,6 +31,7 @@ from shapely.geometry import box
 
 from src.data_loader import RORLoader, ShapefileLoader
 from src.segmentation import RORGuidedSegmenter
+from src.embedding_cache import EmbeddingCache
 from src.evaluation import ParcelEvaluator, print_evaluation_result, compare_configurations, EvaluationResult
 
 
@@ -201,7 +202,8 @@ def run_single_configuration(
     tile_path: str,
     ror_records: List[Dict],
     ground_truth: gpd.GeoDataFrame,
-    config: Dict
+    config: Dict,
+    embedding_cache: EmbeddingCache = None
 ) -> EvaluationResult:
     """Run SAM with a single configuration and evaluate."""
     print(f"\n  Running: {config['name']}...")
@@ -217,6 +219,7 @@ def run_single_configuration(
             use_area_filtering=flags['use_area_filtering'],
             use_iterative_refinement=flags['use_iterative_refinement'],
             use_hungarian_matching=flags['use_hungarian_matching'],
+            embedding_cache=embedding_cache,
         )
 
         # Run segmentation
@@ -331,15 +334,22 @@ def run_ablation_study():
     print("\n5. Running ablation study...")
     results = []
 
+    # All configurations segment the same tile - encode it once
+    embedding_cache = EmbeddingCache()
+
     for config in CONFIGURATIONS:
         result = run_single_configuration(
             tile_path,
             ror_records,
             ground_truth,
-            config
+            config,
+            embedding_cache=embedding_cache
         )
         results.append(result)
 
+    cache_stats = embedding_cache.stats()
+    print(f"\n   Embedding cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses")
+
     # Print individual results
     print("\n" + "=" * 70)
     print("INDIVIDUAL RESULTS")
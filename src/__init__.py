@@ -11,11 +11,13 @@ from .data_loader import ORILoader, RORLoader, ShapefileLoader, VillageDataset
 from .segmentation import ParcelSegmenter, TiledSegmenter, RORGuidedSegmenter, BoundaryConfidenceEstimator
 from .vectorization import TopologyEnforcer, BoundaryRefiner
 from .ror_engine import RORConstraintEngine
-from .confidence import ConfidenceScorer, ConflictDetector
+from .confidence import ConfidenceScorer, ConflictDetector, ReasonCode, explain_parcel, conflicts_to_records
 from .pipeline import BoundaryAIPipeline, PipelineConfig, PipelineResult
 from .edge_detection import EdgeDetector, BundDetector
 from .topology import TopologyFixer
+from .planar_topology import PlanarTopology
 from .evaluation import ParcelEvaluator, EvaluationResult
+from .embedding_cache import EmbeddingCache
 
 __all__ = [
     'ORILoader',
@@ -31,12 +33,17 @@ __all__ = [
     'RORConstraintEngine',
     'ConfidenceScorer',
     'ConflictDetector',
+    'ReasonCode',
+    'explain_parcel',
+    'conflicts_to_records',
     'BoundaryAIPipeline',
     'PipelineConfig',
     'PipelineResult',
     'EdgeDetector',
     'BundDetector',
     'TopologyFixer',
+    'PlanarTopology',
     'ParcelEvaluator',
     'EvaluationResult',
+    'EmbeddingCache',
 ]
@@ -9,13 +9,14 @@ Calculates confidence scores for parcels and routes them for review:
 This is a key innovation - prioritizing human effort where it matters most.
 """
 
-from enum import Enum
+from enum import Enum, IntFlag
 from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass, field
 
 import numpy as np
 import pandas as pd
 import geopandas as gpd
+import shapely
 from shapely.geometry import Polygon
 
 
@@ -26,6 +27,100 @@ class ReviewStatus(Enum):
     FIELD_VERIFICATION = "FIELD_VERIFICATION"
 
 
+class ReasonCode(IntFlag):
+    """
+    Reasons behind a confidence score, stored as bit flags.
+
+    Scored GeoDataFrames keep these in an integer 'reason_codes' column;
+    ``render_explanation`` turns them into text on demand.
+    """
+    NONE = 0
+    AREA_MATCH = 1           # Area within 5% of ROR
+    AREA_MISMATCH = 2        # Area off by more than 20%
+    NO_ROR_AREA = 4
+    ROR_LINKED = 8
+    NO_ROR_MATCH = 16
+    REGULAR_SHAPE = 32
+    IRREGULAR_SHAPE = 64
+    COUNT_MISMATCH = 128     # Village-level parcel count off
+    UNUSUAL_SIZE = 256
+
+
+ROUTING_EXPLANATIONS = {
+    ReviewStatus.AUTO_APPROVE: "High confidence - auto-approved",
+    ReviewStatus.DESKTOP_REVIEW: "Medium confidence - desktop review",
+    ReviewStatus.FIELD_VERIFICATION: "Low confidence - field verification needed",
+}
+
+
+def render_explanation(
+    reason_codes: int,
+    routing=None,
+    survey_no: Optional[str] = None,
+    area_mismatch: Optional[float] = None
+) -> List[str]:
+    """
+    Render reason codes as human-readable explanation lines.
+
+    Args:
+        reason_codes: ReasonCode flags (e.g. a 'reason_codes' cell)
+        routing: ReviewStatus or its value; adds the routing line first
+        survey_no: Linked ROR survey number, for the link line
+        area_mismatch: Fractional area mismatch, for the mismatch line
+
+    Returns:
+        List of explanation strings
+    """
+    codes = ReasonCode(int(reason_codes))
+    lines = []
+
+    if routing is not None:
+        lines.append(ROUTING_EXPLANATIONS[ReviewStatus(routing)])
+
+    if ReasonCode.AREA_MATCH in codes:
+        lines.append("Area matches ROR within 5%")
+    elif ReasonCode.AREA_MISMATCH in codes:
+        lines.append(f"Area mismatch: {area_mismatch:.1%}")
+    elif ReasonCode.NO_ROR_AREA in codes:
+        lines.append("No ROR area for comparison")
+
+    if ReasonCode.ROR_LINKED in codes:
+        lines.append(f"Linked to ROR: {survey_no}")
+    elif ReasonCode.NO_ROR_MATCH in codes:
+        lines.append("No ROR match found")
+
+    if ReasonCode.REGULAR_SHAPE in codes:
+        lines.append("Regular parcel shape")
+    elif ReasonCode.IRREGULAR_SHAPE in codes:
+        lines.append("Irregular shape - verify boundary")
+
+    if ReasonCode.COUNT_MISMATCH in codes:
+        lines.append("Village parcel count mismatch")
+
+    if ReasonCode.UNUSUAL_SIZE in codes:
+        lines.append("Unusual parcel size")
+
+    return lines
+
+
+def explain_parcel(parcel: pd.Series) -> List[str]:
+    """
+    Explain one scored parcel (a row of ``score_all_parcels`` output).
+
+    Args:
+        parcel: Row with 'reason_codes' and 'routing' columns
+
+    Returns:
+        List of explanation strings
+    """
+    return render_explanation(
+        parcel.get('reason_codes', 0),
+        routing=parcel.get('routing'),
+        survey_no=parcel.get('ror_survey_no'),
+        area_mismatch=parcel.get('area_mismatch')
+    )
+
+
 @dataclass
 class ConfidenceFactors:
     """Individual factors contributing to confidence score"""
@@ -47,6 +142,25 @@ class ConfidenceFactors:
         }
 
 
+FACTOR_NAMES = list(ConfidenceFactors().to_dict())
+
+# Columns of the conflicts table returned by ConflictDetector.detect_conflicts
+CONFLICT_COLUMNS = [
+    'type', 'severity', 'parcel_id', 'survey_no', 'generated_area_sqm',
+    'ror_area_sqm', 'mismatch_pct', 'area_sqm', 'message'
+]
+
+# Fields each conflict type carries when written as one dictionary per conflict
+CONFLICT_TYPE_COLUMNS = {
+    'AREA_MISMATCH': [
+        'type', 'severity', 'parcel_id', 'survey_no', 'generated_area_sqm',
+        'ror_area_sqm', 'mismatch_pct', 'message'
+    ],
+    'EXTRA_PARCEL': ['type', 'severity', 'parcel_id', 'survey_no', 'area_sqm', 'message'],
+    'MISSING_PARCEL': ['type', 'severity', 'parcel_id', 'survey_no', 'message'],
+}
+
+
 @dataclass
 class ParcelConfidence:
     """Confidence assessment for a single parcel"""
@@ -55,6 +169,7 @@ class ParcelConfidence:
     routing: ReviewStatus
     factors: ConfidenceFactors
     explanation: List[str] = field(default_factory=list)
+    reason_codes: int = 0
 
 
 class ConfidenceScorer:
@@ -180,28 +295,28 @@ class ConfidenceScorer:
             ParcelConfidence with score, routing, and explanation
         """
         factors = ConfidenceFactors()
-        explanations = []
+        reasons = ReasonCode.NONE
 
         # Factor 1: Area match with ROR
         area_mismatch = parcel.get('area_mismatch')
         if area_mismatch is not None and not pd.isna(area_mismatch):
             factors.area_match = max(0.0, 1.0 - area_mismatch)
             if factors.area_match >= 0.95:
-                explanations.append(f"Area matches ROR within 5%")
+                reasons |= ReasonCode.AREA_MATCH
             elif factors.area_match < 0.80:
-                explanations.append(f"Area mismatch: {area_mismatch:.1%}")
+                reasons |= ReasonCode.AREA_MISMATCH
         else:
             factors.area_match = 0.5
-            explanations.append("No ROR area for comparison")
+            reasons |= ReasonCode.NO_ROR_AREA
 
         # Factor 2: Has ROR link
         ror_survey_no = parcel.get('ror_survey_no')
         if ror_survey_no is not None and not pd.isna(ror_survey_no):
             factors.has_ror_link = 1.0
-            explanations.append(f"Linked to ROR: {ror_survey_no}")
+            reasons |= ReasonCode.ROR_LINKED
         else:
             factors.has_ror_link = 0.0
-            explanations.append("No ROR match found")
+            reasons |= ReasonCode.NO_ROR_MATCH
 
         # Factor 3: Boundary clarity (use edge_score if available)
         edge_score = parcel.get('edge_score', parcel.get('boundary_clarity'))
@@ -214,9 +329,9 @@ class ConfidenceScorer:
         geometry = parcel.geometry
         factors.shape_regularity = self.calculate_shape_regularity(geometry)
         if factors.shape_regularity >= 0.7:
-            explanations.append("Regular parcel shape")
+            reasons |= ReasonCode.REGULAR_SHAPE
         elif factors.shape_regularity < 0.3:
-            explanations.append("Irregular shape - verify boundary")
+            reasons |= ReasonCode.IRREGULAR_SHAPE
 
         # Factor 5: Count consistency
         expected_count = village_stats.get('expected_count', 0)
@@ -225,7 +340,7 @@ class ConfidenceScorer:
             count_ratio = min(expected_count, actual_count) / max(expected_count, actual_count)
             factors.count_consistency = count_ratio
             if count_ratio < 0.8:
-                explanations.append(f"Village parcel count mismatch")
+                reasons |= ReasonCode.COUNT_MISMATCH
         else:
             factors.count_consistency = 0.5
 
@@ -235,38 +350,170 @@ class ConfidenceScorer:
         max_area = village_stats.get('max_area_sqm', float('inf'))
         factors.size_reasonable = self.calculate_size_reasonability(area_sqm, min_area, max_area)
         if factors.size_reasonable < 0.5:
-            explanations.append("Unusual parcel size")
+            reasons |= ReasonCode.UNUSUAL_SIZE
 
         # Calculate weighted score
         factor_dict = factors.to_dict()
         score = sum(factor_dict[k] * self.weights[k] for k in factor_dict)
-        score = round(score, 3)
+        score = round(float(score), 3)
 
         # Determine routing
         if score >= self.auto_threshold:
             routing = ReviewStatus.AUTO_APPROVE
-            explanations.insert(0, "High confidence - auto-approved")
         elif score >= self.desktop_threshold:
             routing = ReviewStatus.DESKTOP_REVIEW
-            explanations.insert(0, "Medium confidence - desktop review")
         else:
             routing = ReviewStatus.FIELD_VERIFICATION
-            explanations.insert(0, "Low confidence - field verification needed")
 
         return ParcelConfidence(
             parcel_id=parcel.get('parcel_id', parcel.name),
             confidence_score=score,
             routing=routing,
             factors=factors,
-            explanation=explanations
+            explanation=render_explanation(reasons, routing, ror_survey_no, area_mismatch),
+            reason_codes=int(reasons)
         )
 
+    def score_table(
+        self,
+        parcels: gpd.GeoDataFrame,
+        village_stats: Dict
+    ) -> pd.DataFrame:
+        """
+        Score all parcels at once (columnar version of ``score_parcel``).
+
+        Every factor is computed as an array over the whole GeoDataFrame,
+        giving the same scores and routing as calling ``score_parcel`` on
+        each row.
+
+        Args:
+            parcels: GeoDataFrame of parcels
+            village_stats: Village-level statistics, as for ``score_parcel``
+
+        Returns:
+            DataFrame indexed like ``parcels`` with one column per
+            confidence factor plus 'confidence', 'routing' and
+            'reason_codes' (ReasonCode flags)
+        """
+        n = len(parcels)
+        geometries = np.asarray(parcels.geometry)
+        areas = shapely.area(geometries)
+
+        def numeric_column(name: str) -> np.ndarray:
+            return parcels[name].astype(float).to_numpy()
+
+        factors = {}
+        reasons = np.zeros(n, dtype=np.int64)
+
+        def flag(mask, code: ReasonCode):
+            reasons[mask] |= int(code)
+
+        # Factor 1: Area match with ROR
+        if 'area_mismatch' in parcels.columns:
+            mismatch = numeric_column('area_mismatch')
+            has_area = ~np.isnan(mismatch)
+            factors['area_match'] = np.where(
+                has_area, np.maximum(0.0, 1.0 - mismatch), 0.5
+            )
+            flag(has_area & (factors['area_match'] >= 0.95), ReasonCode.AREA_MATCH)
+            flag(has_area & (factors['area_match'] < 0.80), ReasonCode.AREA_MISMATCH)
+            flag(~has_area, ReasonCode.NO_ROR_AREA)
+        else:
+            factors['area_match'] = np.full(n, 0.5)
+            flag(slice(None), ReasonCode.NO_ROR_AREA)
+
+        # Factor 2: Has ROR link
+        if 'ror_survey_no' in parcels.columns:
+            linked = parcels['ror_survey_no'].notna().to_numpy()
+        else:
+            linked = np.zeros(n, dtype=bool)
+        factors['has_ror_link'] = linked.astype(float)
+        flag(linked, ReasonCode.ROR_LINKED)
+        flag(~linked, ReasonCode.NO_ROR_MATCH)
+
+        # Factor 3: Boundary clarity (edge_score takes precedence)
+        edge_column = next(
+            (c for c in ('edge_score', 'boundary_clarity') if c in parcels.columns), None
+        )
+        if edge_column is not None:
+            edge = numeric_column(edge_column)
+            factors['boundary_clarity'] = np.where(np.isnan(edge), 0.5, edge)
+        else:
+            factors['boundary_clarity'] = np.full(n, 0.5)
+
+        # Factor 4: Shape regularity (isoperimetric quotient)
+        perimeters = shapely.length(geometries)
+        usable = shapely.is_valid(geometries) & ~shapely.is_empty(geometries) & (perimeters != 0)
+        # Square with Python float pow, which can differ from numpy's x * x
+        # in the last bit (about 1 perimeter in 1000, e.g. a 27.021 x 3.011
+        # box), so factors match calculate_shape_regularity exactly
+        squared = np.array([value ** 2 for value in perimeters.tolist()], dtype=float)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ipq = (4 * np.pi * areas) / squared
+        factors['shape_regularity'] = np.where(usable, np.clip(ipq, 0.0, 1.0), 0.0)
+        flag(factors['shape_regularity'] >= 0.7, ReasonCode.REGULAR_SHAPE)
+        flag(factors['shape_regularity'] < 0.3, ReasonCode.IRREGULAR_SHAPE)
+
+        # Factor 5: Count consistency
+        expected_count = village_stats.get('expected_count', 0)
+        actual_count = village_stats.get('actual_count', 0)
+        if expected_count > 0 and actual_count > 0:
+            count_ratio = min(expected_count, actual_count) / max(expected_count, actual_count)
+            if count_ratio < 0.8:
+                flag(slice(None), ReasonCode.COUNT_MISMATCH)
+        else:
+            count_ratio = 0.5
+        factors['count_consistency'] = np.full(n, count_ratio)
+
+        # Factor 6: Size reasonability
+        lower_bound = village_stats.get('min_area_sqm', 0) * 0.5
+        upper_bound = village_stats.get('max_area_sqm', float('inf')) * 1.5
+        with np.errstate(divide='ignore', invalid='ignore'):
+            factors['size_reasonable'] = np.where(
+                (lower_bound <= areas) & (areas <= upper_bound),
+                1.0,
+                np.where(
+                    areas < lower_bound,
+                    np.maximum(0.0, areas / lower_bound),
+                    np.maximum(0.0, upper_bound / areas)
+                )
+            )
+        flag(factors['size_reasonable'] < 0.5, ReasonCode.UNUSUAL_SIZE)
+
+        # Weighted score, summed in the same order as score_parcel
+        score = 0
+        for name in FACTOR_NAMES:
+            score = score + factors[name] * self.weights[name]
+        # Python's round() (not np.round) for results identical to score_parcel.
+        # They differ on sums that land on a midpoint of the third decimal,
+        # which happens when every factor is exact, e.g. a degenerate
+        # geometry with no ROR link and 3-decimal area_mismatch/edge_score
+        # (0.4545 rounds to 0.455 here, 0.454 with np.round)
+        score = np.array([round(value, 3) for value in np.asarray(score, dtype=float).tolist()])
+
+        routing = np.where(
+            score >= self.auto_threshold,
+            ReviewStatus.AUTO_APPROVE.value,
+            np.where(
+                score >= self.desktop_threshold,
+                ReviewStatus.DESKTOP_REVIEW.value,
+                ReviewStatus.FIELD_VERIFICATION.value
+            )
+        )
+
+        table = pd.DataFrame(factors, index=parcels.index)
+        table['confidence'] = score
+        table['routing'] = routing.astype(object)
+        table['reason_codes'] = reasons
+        return table
+
     def score_all_parcels(
         self,
         parcels: gpd.GeoDataFrame,
         expected_count: int,
         min_area_sqm: float,
-        max_area_sqm: float
+        max_area_sqm: float,
+        explain: bool = False
     ) -> gpd.GeoDataFrame:
         """
         Calculate confidence scores for all parcels.
@@ -276,9 +523,11 @@ class ConfidenceScorer:
             expected_count: Expected parcel count from ROR
             min_area_sqm: Minimum expected area
             max_area_sqm: Maximum expected area
+            explain: Also add a text 'explanation' column. Normally leave
+                this off and render single parcels with ``explain_parcel``
 
         Returns:
-            GeoDataFrame with confidence scores and routing
+            GeoDataFrame with confidence scores, routing and reason codes
         """
         parcels = parcels.copy()
 
@@ -290,21 +539,15 @@ class ConfidenceScorer:
             'max_area_sqm': max_area_sqm
         }
 
-        # Initialize new columns
-        parcels['confidence'] = 0.0
-        parcels['routing'] = ''
-        parcels['confidence_factors'] = None
-        parcels['explanation'] = None
+        table = self.score_table(parcels, village_stats)
 
-        # Score each parcel
-        for idx in parcels.index:
-            parcel = parcels.loc[idx]
-            result = self.score_parcel(parcel, village_stats)
+        parcels['confidence'] = table['confidence']
+        parcels['routing'] = table['routing']
+        parcels['confidence_factors'] = table[FACTOR_NAMES].to_dict('records')
+        parcels['reason_codes'] = table['reason_codes']
 
-            parcels.at[idx, 'confidence'] = result.confidence_score
-            parcels.at[idx, 'routing'] = result.routing.value
-            parcels.at[idx, 'confidence_factors'] = result.factors.to_dict()
-            parcels.at[idx, 'explanation'] = result.explanation
+        if explain:
+            parcels['explanation'] = [explain_parcel(row) for _, row in parcels.iterrows()]
 
         return parcels
 
@@ -396,7 +639,7 @@ class ConflictDetector:
         self,
         parcels: gpd.GeoDataFrame,
         ror_records: List[Dict]
-    ) -> List[Dict]:
+    ) -> pd.DataFrame:
         """
         Detect all conflicts.
 
@@ -405,96 +648,88 @@ class ConflictDetector:
             ror_records: List of ROR records
 
         Returns:
-            List of conflict dictionaries
+            DataFrame with one row per conflict and CONFLICT_COLUMNS
+            (fields that do not apply to a conflict type are null)
         """
-        conflicts = []
+        tables = []
+        areas = pd.Series(shapely.area(np.asarray(parcels.geometry)), index=parcels.index)
 
         # Check area mismatches
         if 'area_mismatch' in parcels.columns:
-            for idx, row in parcels.iterrows():
-                mismatch = row.get('area_mismatch')
-                if mismatch is not None and not pd.isna(mismatch):
-                    if mismatch > 0.20:
-                        severity = 'HIGH'
-                    elif mismatch > self.area_threshold:
-                        severity = 'MEDIUM'
-                    else:
-                        continue
-
-                    conflicts.append({
-                        'type': 'AREA_MISMATCH',
-                        'severity': severity,
-                        'parcel_id': idx,
-                        'survey_no': row.get('ror_survey_no'),
-                        'generated_area_sqm': row.geometry.area,
-                        'ror_area_sqm': row.get('ror_area_sqm'),
-                        'mismatch_pct': mismatch * 100,
-                        'message': f"Area mismatch: {mismatch:.1%}"
-                    })
+            mismatch = parcels['area_mismatch'].astype(float)
+            flagged = (mismatch > 0.20) | (mismatch > self.area_threshold)
+            mismatch = mismatch[flagged]
+
+            tables.append(pd.DataFrame({
+                'type': 'AREA_MISMATCH',
+                'severity': np.where(mismatch > 0.20, 'HIGH', 'MEDIUM'),
+                'parcel_id': mismatch.index.to_numpy(dtype=object),
+                'survey_no': parcels.loc[flagged, 'ror_survey_no'].to_numpy(dtype=object)
+                if 'ror_survey_no' in parcels.columns else None,
+                'generated_area_sqm': areas[flagged].to_numpy(),
+                'ror_area_sqm': parcels.loc[flagged, 'ror_area_sqm'].astype(float).to_numpy()
+                if 'ror_area_sqm' in parcels.columns else np.nan,
+                'mismatch_pct': mismatch.to_numpy() * 100,
+                'message': [f"Area mismatch: {m:.1%}" for m in mismatch],
+            }))
 
         # Check for extra parcels (no ROR match)
         if 'ror_survey_no' in parcels.columns:
-            extra = parcels[parcels['ror_survey_no'].isna()]
-            for idx, row in extra.iterrows():
-                conflicts.append({
-                    'type': 'EXTRA_PARCEL',
-                    'severity': 'HIGH',
-                    'parcel_id': idx,
-                    'survey_no': None,
-                    'area_sqm': row.geometry.area,
-                    'message': f"No ROR record found for parcel"
-                })
-
-            # Check for missing ROR records
-            matched_survey_nos = set(parcels['ror_survey_no'].dropna())
-            all_survey_nos = set(r.get('survey_no') for r in ror_records)
-            missing = all_survey_nos - matched_survey_nos
-
-            for survey_no in missing:
-                conflicts.append({
-                    'type': 'MISSING_PARCEL',
-                    'severity': 'HIGH',
-                    'parcel_id': None,
-                    'survey_no': survey_no,
-                    'message': f"ROR record {survey_no} has no matching parcel"
-                })
-
-        return conflicts
-
-    def get_conflict_summary(self, conflicts: List[Dict]) -> Dict:
+            extra = parcels['ror_survey_no'].isna()
+            tables.append(pd.DataFrame({
+                'type': 'EXTRA_PARCEL',
+                'severity': 'HIGH',
+                'parcel_id': parcels.index[extra].to_numpy(dtype=object),
+                'survey_no': None,
+                'area_sqm': areas[extra].to_numpy(),
+                'message': "No ROR record found for parcel",
+            }))
+
+            # Check for missing ROR records (in ROR order)
+            ror_survey_nos = pd.Series([r.get('survey_no') for r in ror_records], dtype=object)
+            matched = set(parcels['ror_survey_no'].dropna())
+            missing = ror_survey_nos[~ror_survey_nos.isin(matched)].drop_duplicates()
+            tables.append(pd.DataFrame({
+                'type': 'MISSING_PARCEL',
+                'severity': 'HIGH',
+                'parcel_id': None,
+                'survey_no': missing.to_numpy(dtype=object),
+                'message': [f"ROR record {survey_no} has no matching parcel" for survey_no in missing],
+            }))
+
+        tables = [t for t in tables if len(t)]
+        if not tables:
+            return pd.DataFrame(columns=CONFLICT_COLUMNS)
+
+        conflicts = pd.concat(tables, ignore_index=True)
+        return conflicts.reindex(columns=CONFLICT_COLUMNS)
+
+    def get_conflict_summary(self, conflicts: pd.DataFrame) -> Dict:
         """
         Get summary of conflicts by type and severity.
 
         Args:
-            conflicts: List of conflict dictionaries
+            conflicts: Conflicts table from ``detect_conflicts`` (a list of
+                conflict dictionaries is also accepted)
 
         Returns:
             Summary dictionary
         """
-        summary = {
+        if not isinstance(conflicts, pd.DataFrame):
+            conflicts = pd.DataFrame(list(conflicts), columns=['type', 'severity'])
+
+        by_type = conflicts.groupby(conflicts['type'].fillna('UNKNOWN'), sort=False).size()
+        by_severity = conflicts.groupby(conflicts['severity'].fillna('MEDIUM')).size()
+
+        return {
             'total': len(conflicts),
-            'by_type': {},
+            'by_type': {k: int(v) for k, v in by_type.items()},
             'by_severity': {
-                'HIGH': 0,
-                'MEDIUM': 0,
-                'LOW': 0
+                severity: int(by_severity.get(severity, 0))
+                for severity in ('HIGH', 'MEDIUM', 'LOW')
             }
         }
 
-        for conflict in conflicts:
-            # Count by type
-            conflict_type = conflict.get('type', 'UNKNOWN')
-            if conflict_type not in summary['by_type']:
-                summary['by_type'][conflict_type] = 0
-            summary['by_type'][conflict_type] += 1
-
-            # Count by severity
-            severity = conflict.get('severity', 'MEDIUM')
-            if severity in summary['by_severity']:
-                summary['by_severity'][severity] += 1
-
-        return summary
-
 
 # Convenience functions
 
@@ -526,6 +761,21 @@ def get_routing_stats(parcels: gpd.GeoDataFrame) -> Dict:
     return scorer.get_routing_summary(parcels)
 
 
+def conflicts_to_records(conflicts: pd.DataFrame) -> List[Dict]:
+    """
+    Convert a conflicts table to one dictionary per conflict.
+
+    Each dictionary has only the fields of its conflict type (see
+    CONFLICT_TYPE_COLUMNS), with missing values as None, so it is
+    JSON-serializable.
+    """
+    records = conflicts.astype(object).where(conflicts.notna(), None).to_dict('records')
+    return [
+        {key: record.get(key) for key in CONFLICT_TYPE_COLUMNS.get(record['type'], CONFLICT_COLUMNS)}
+        for record in records
+    ]
+
+
 # Additional class methods for pipeline compatibility
 
 ConfidenceScorer.score_parcels = lambda self, parcels, ror_records=None, expected_count=None: \
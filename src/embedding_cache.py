@@ -0,0 +1,242 @@
+"""
+Persistent SAM Image-Embedding Cache
+
+The SAM image encoder is by far the most expensive step in segmentation,
+and the same tile is often encoded again on a later run or by a different
+ablation configuration. This module stores encoder outputs on disk, keyed
+by the tile's pixels and the model that produced them, so repeat
+encodings become a file read.
+
+Embeddings are stored as memory-mapped .npy blobs. The cache is trimmed
+to a size budget by evicting the least recently used entries.
+"""
+
+import hashlib
+import os
+from pathlib import Path
+from typing import Optional, Union
+
+import numpy as np
+
+
+DEFAULT_CACHE_DIR = Path.home() / '.cache' / 'sam' / 'embeddings'
+
+
+def model_fingerprint(model_type: str, checkpoint_path: Union[str, Path]) -> str:
+    """
+    Identify a SAM model by type and checkpoint contents.
+
+    Hashing a multi-GB checkpoint on every start-up is too slow, so only
+    the file size and its first and last megabyte are hashed.
+
+    Args:
+        model_type: SAM model variant ('vit_h', 'vit_l', 'vit_b')
+        checkpoint_path: Path to the checkpoint file
+
+    Returns:
+        Hex digest identifying the model weights
+    """
+    checkpoint_path = Path(checkpoint_path)
+    chunk = 1024 * 1024
+    size = checkpoint_path.stat().st_size
+
+    h = hashlib.sha256()
+    h.update(model_type.encode())
+    h.update(str(size).encode())
+    with open(checkpoint_path, 'rb') as f:
+        h.update(f.read(chunk))
+        if size > chunk:
+            f.seek(max(chunk, size - chunk))
+            h.update(f.read(chunk))
+
+    return h.hexdigest()[:16]
+
+
+class EmbeddingCache:
+    """
+    Content-addressed on-disk cache of SAM image embeddings.
+
+    Keys combine a hash of the tile pixels with the model fingerprint, so
+    the same tile encoded by a different model never collides.
+    """
+
+    RESCAN_EVERY = 256  # Puts between full directory scans
+
+    def __init__(
+        self,
+        cache_dir: Optional[Union[str, Path]] = None,
+        max_bytes: int = 4 * 1024 ** 3
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_dir: Directory for .npy blobs (default ~/.cache/sam/embeddings)
+            max_bytes: Size budget; least recently used entries are evicted
+                once the cache grows beyond it
+        """
+        self.cache_dir = Path(cache_dir) if cache_dir else DEFAULT_CACHE_DIR
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+
+        self.hits = 0
+        self.misses = 0
+
+        # Running size estimate; refreshed from disk on eviction and every
+        # RESCAN_EVERY puts so entries written by other workers are counted
+        self._total_bytes: Optional[int] = None
+        self._puts_since_scan = 0
+
+    def make_key(self, image: np.ndarray, model_id: str) -> str:
+        """
+        Build the cache key for an image.
+
+        Args:
+            image: Image array exactly as passed to the encoder
+            model_id: Model fingerprint from ``model_fingerprint``
+
+        Returns:
+            Hex key
+        """
+        image = np.ascontiguousarray(image)
+        h = hashlib.sha256()
+        h.update(model_id.encode())
+        h.update(str(image.shape).encode())
+        h.update(str(image.dtype).encode())
+        h.update(image.data)
+        return h.hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.npy"
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        """
+        Look up an embedding.
+
+        Returns:
+            Copy-on-write memory-mapped array, or None on a miss
+        """
+        path = self._path(key)
+        try:
+            features = np.load(path, mmap_mode='c')
+        except (FileNotFoundError, ValueError, OSError):
+            self.misses += 1
+            return None
+
+        # Bump recency for LRU eviction
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+        self.hits += 1
+        return features
+
+    def put(self, key: str, features: np.ndarray):
+        """
+        Store an embedding, then evict old entries if over budget.
+
+        Writes go to a temporary file first so concurrent readers never see
+        a partially written blob. The temporary name does not end in .npy,
+        so eviction (possibly in another worker) never counts or deletes it.
+        """
+        path = self._path(key)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'wb') as f:
+            np.save(f, np.ascontiguousarray(features))
+
+        written = tmp_path.stat().st_size
+        try:
+            replaced = path.stat().st_size
+        except FileNotFoundError:
+            replaced = 0
+        os.replace(tmp_path, path)
+
+        self._puts_since_scan += 1
+        if self._total_bytes is None or self._puts_since_scan >= self.RESCAN_EVERY:
+            self._evict()
+            return
+
+        self._total_bytes += written - replaced
+        if self._total_bytes > self.max_bytes:
+            self._evict()
+
+    def _evict(self):
+        """Rescan the cache and remove least recently used entries until under max_bytes."""
+        self._puts_since_scan = 0
+        entries = []
+        total = 0
+        for path in self.cache_dir.glob('*.npy'):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+
+        if total > self.max_bytes:
+            entries.sort()
+            for _, size, path in entries:
+                if total <= self.max_bytes:
+                    break
+                path.unlink(missing_ok=True)
+                total -= size
+
+        self._total_bytes = total
+
+    def get_or_encode(self, predictor, image: np.ndarray, model_id: str):
+        """
+        Return the embedding for an image, encoding it on a miss.
+
+        Args:
+            predictor: SamPredictor used to encode on a miss
+            image: RGB uint8 image (H, W, 3)
+            model_id: Model fingerprint from ``model_fingerprint``
+
+        Returns:
+            (features tensor on the predictor's device, input_size)
+        """
+        import torch
+
+        key = self.make_key(image, model_id)
+        input_size = predictor.transform.get_preprocess_shape(
+            image.shape[0], image.shape[1], predictor.transform.target_length
+        )
+
+        cached = self.get(key)
+        if cached is not None:
+            # No copy: the tensor reads straight from the memory map
+            features = torch.from_numpy(np.asarray(cached)).to(predictor.device)
+            return features, input_size
+
+        predictor.set_image(image)
+        features = predictor.features
+        self.put(key, features.detach().cpu().numpy())
+        return features, input_size
+
+    def set_image(self, predictor, image: np.ndarray, model_id: str):
+        """
+        Drop-in replacement for ``predictor.set_image(image)``.
+
+        On a hit the stored embedding is installed on the predictor and the
+        image encoder is skipped entirely.
+        """
+        features, input_size = self.get_or_encode(predictor, image, model_id)
+
+        if predictor.is_image_set and predictor.features is features:
+            return
+
+        predictor.reset_image()
+        predictor.original_size = image.shape[:2]
+        predictor.input_size = input_size
+        predictor.features = features
+        predictor.is_image_set = True
+
+    def stats(self) -> dict:
+        """Get hit/miss counters."""
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+        }
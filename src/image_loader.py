@@ -5,11 +5,16 @@ Handles loading and tiling of large ortho-rectified drone imagery.
 Supports Cloud Optimized GeoTIFFs (COG) for efficient access.
 """
 
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
 import numpy as np
 import rasterio
 from rasterio.windows import Window
 from pathlib import Path
-from typing import Generator, Tuple, Optional
+from typing import Generator, Iterable, List, Tuple, Optional
 from dataclasses import dataclass
 
 
@@ -76,48 +81,146 @@ class ORILoader:
             'n_tiles_y': self.n_tiles_y,
         }
 
-    def iter_tiles(self) -> Generator[ImageTile, None, None]:
+    def _tile_window(self, row_idx: int, col_idx: int) -> Window:
+        """Calculate the rasterio window for a tile, clipped at image edges."""
+        col_off = col_idx * self.stride
+        row_off = row_idx * self.stride
+
+        # Adjust size for edge tiles
+        width = min(self.tile_size, self.width - col_off)
+        height = min(self.tile_size, self.height - row_off)
+
+        return Window(col_off, row_off, width, height)
+
+    def tile_bounds(self, row_idx: int, col_idx: int) -> Tuple[float, float, float, float]:
+        """
+        Get the geographic footprint of a tile.
+
+        Returns:
+            (minx, miny, maxx, maxy) in the image CRS
+        """
+        window = self._tile_window(row_idx, col_idx)
+        return rasterio.windows.bounds(window, self.transform)
+
+    def _read_tile(self, src, row_idx: int, col_idx: int) -> ImageTile:
+        """Read a single tile from an open rasterio dataset."""
+        window = self._tile_window(row_idx, col_idx)
+
+        # Read tile data
+        data = src.read(window=window)
+
+        # Convert from (C, H, W) to (H, W, C) for SAM
+        if data.shape[0] >= 3:
+            # Take RGB channels
+            data = np.transpose(data[:3], (1, 2, 0))
+        else:
+            # Grayscale - repeat to make RGB
+            data = np.transpose(data, (1, 2, 0))
+            data = np.repeat(data, 3, axis=2)
+
+        # Get transform for this tile
+        tile_transform = rasterio.windows.transform(window, src.transform)
+
+        return ImageTile(
+            data=data,
+            window=window,
+            transform=tile_transform,
+            crs=str(src.crs),
+            tile_id=(row_idx, col_idx)
+        )
+
+    def tile_indices(self) -> List[Tuple[int, int]]:
+        """Get (row_idx, col_idx) for every tile in row-major order."""
+        return [
+            (row_idx, col_idx)
+            for row_idx in range(self.n_tiles_y)
+            for col_idx in range(self.n_tiles_x)
+        ]
+
+    def iter_tiles(
+        self,
+        prefetch: int = 0,
+        num_workers: int = 2,
+        tile_ids: Optional[Iterable[Tuple[int, int]]] = None
+    ) -> Generator[ImageTile, None, None]:
         """
         Iterate over all tiles in the image.
 
+        Args:
+            prefetch: Number of tiles to read ahead in background threads.
+                0 reads each tile synchronously.
+            num_workers: Reader threads used when prefetching. Each thread
+                holds its own rasterio handle (GDAL handles are not thread-safe).
+            tile_ids: Optional (row_idx, col_idx) subset to read, in order.
+                Defaults to every tile in row-major order.
+
         Yields:
             ImageTile objects containing tile data and metadata
         """
+        if tile_ids is None:
+            tile_ids = self.tile_indices()
+
+        if prefetch > 0:
+            yield from self._iter_tiles_prefetch(tile_ids, prefetch, num_workers)
+            return
+
         with rasterio.open(self.image_path) as src:
-            for row_idx in range(self.n_tiles_y):
-                for col_idx in range(self.n_tiles_x):
-                    # Calculate window
-                    col_off = col_idx * self.stride
-                    row_off = row_idx * self.stride
-
-                    # Adjust size for edge tiles
-                    width = min(self.tile_size, self.width - col_off)
-                    height = min(self.tile_size, self.height - row_off)
-
-                    window = Window(col_off, row_off, width, height)
-
-                    # Read tile data
-                    data = src.read(window=window)
-
-                    # Convert from (C, H, W) to (H, W, C) for SAM
-                    if data.shape[0] >= 3:
-                        # Take RGB channels
-                        data = np.transpose(data[:3], (1, 2, 0))
-                    else:
-                        # Grayscale - repeat to make RGB
-                        data = np.transpose(data, (1, 2, 0))
-                        data = np.repeat(data, 3, axis=2)
-
-                    # Get transform for this tile
-                    tile_transform = rasterio.windows.transform(window, src.transform)
-
-                    yield ImageTile(
-                        data=data,
-                        window=window,
-                        transform=tile_transform,
-                        crs=str(src.crs),
-                        tile_id=(row_idx, col_idx)
-                    )
+            for row_idx, col_idx in tile_ids:
+                yield self._read_tile(src, row_idx, col_idx)
+
+    def _iter_tiles_prefetch(
+        self,
+        tile_ids: Iterable[Tuple[int, int]],
+        prefetch: int,
+        num_workers: int
+    ) -> Generator[ImageTile, None, None]:
+        """
+        Iterate tiles with a bounded read-ahead queue.
+
+        Decoding of upcoming windows overlaps with whatever the consumer does
+        with the current tile. Tiles are yielded in the same order as the
+        synchronous iterator.
+        """
+        local = threading.local()
+        handles = []
+        handles_lock = threading.Lock()
+
+        def read(row_idx: int, col_idx: int) -> ImageTile:
+            src = getattr(local, 'src', None)
+            if src is None:
+                src = rasterio.open(self.image_path)
+                local.src = src
+                with handles_lock:
+                    handles.append(src)
+            return self._read_tile(src, row_idx, col_idx)
+
+        indices = iter(tile_ids)
+        pending = deque()
+        executor = ThreadPoolExecutor(
+            max_workers=max(1, num_workers),
+            thread_name_prefix='ori-reader'
+        )
+
+        try:
+            # Fill the read-ahead queue
+            for row_idx, col_idx in islice(indices, prefetch):
+                pending.append(executor.submit(read, row_idx, col_idx))
+
+            while pending:
+                tile = pending.popleft().result()
+
+                # Keep the queue topped up before handing the tile out
+                for row_idx, col_idx in islice(indices, 1):
+                    pending.append(executor.submit(read, row_idx, col_idx))
+
+                yield tile
+        finally:
+            # Consumer may stop early (e.g. max_tiles) - drop queued reads
+            for future in pending:
+                future.cancel()
+            executor.shutdown(wait=True)
+            for src in handles:
+                src.close()
 
     def get_tile(self, row_idx: int, col_idx: int) -> Optional[ImageTile]:
         """
@@ -134,30 +237,7 @@ class ORILoader:
             return None
 
         with rasterio.open(self.image_path) as src:
-            col_off = col_idx * self.stride
-            row_off = row_idx * self.stride
-
-            width = min(self.tile_size, self.width - col_off)
-            height = min(self.tile_size, self.height - row_off)
-
-            window = Window(col_off, row_off, width, height)
-            data = src.read(window=window)
-
-            if data.shape[0] >= 3:
-                data = np.transpose(data[:3], (1, 2, 0))
-            else:
-                data = np.transpose(data, (1, 2, 0))
-                data = np.repeat(data, 3, axis=2)
-
-            tile_transform = rasterio.windows.transform(window, src.transform)
-
-            return ImageTile(
-                data=data,
-                window=window,
-                transform=tile_transform,
-                crs=str(src.crs),
-                tile_id=(row_idx, col_idx)
-            )
+            return self._read_tile(src, row_idx, col_idx)
 
     def get_full_image_downsampled(self, max_size: int = 2048) -> Tuple[np.ndarray, float]:
         """
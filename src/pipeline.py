@@ -11,10 +11,13 @@ Orchestrates the complete parcel detection and analysis workflow:
 """
 
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple, Union
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
 from dataclasses import dataclass
 from datetime import datetime
+from itertools import islice
 import json
+import multiprocessing
+import os
 
 import numpy as np
 import geopandas as gpd
@@ -29,6 +32,10 @@ from .sam_segmenter import (
     parcels_to_geodataframe,
     SAM_AVAILABLE
 )
+from .embedding_cache import EmbeddingCache
+from .seam_merge import SeamMerger
+from .tile_journal import TileJournal, segmentation_config_hash
+from .profiling import StageProfiler
 from .data_loader import RORLoader, ShapefileLoader
 from .ror_engine import RORConstraintEngine, create_constraint_engine
 from .confidence import ConfidenceScorer, ConflictDetector
@@ -41,6 +48,8 @@ class PipelineConfig:
     # Image loading
     tile_size: int = 1024
     tile_overlap: int = 128
+    tile_prefetch: int = 2        # Tiles read ahead while SAM runs (0 = synchronous)
+    tile_read_workers: int = 2    # Reader threads for prefetching
 
     # SAM parameters
     sam_model: str = 'vit_b'  # 'vit_b', 'vit_l', 'vit_h'
@@ -48,13 +57,34 @@ class PipelineConfig:
     max_parcel_area_pixels: int = 1000000
     stability_threshold: float = 0.85
     iou_threshold: float = 0.80
+    sam_batch_size: int = 1       # Tiles per image-encoder pass (1 = per-tile)
+    num_workers: int = 1          # Tile worker processes, each with its own SAM
+    torch_threads_per_worker: Optional[int] = None  # Default: cores / num_workers
+    embedding_cache_dir: Optional[str] = None  # Reuse SAM embeddings across runs
 
     # Post-processing
     merge_overlap_threshold: float = 0.5
+    merge_strategy: str = 'seam'  # 'seam' (tile overlap strips only) or 'global'
     simplify_tolerance: float = 2.0
+    simplify_mode: str = 'polygon'  # 'polygon' or 'shared' (simplify shared boundaries once per tile)
+    parcel_mask_format: str = 'none'  # 'none', 'rle' or 'full' masks on DetectedParcel
 
     # Matching settings
     area_tolerance: float = 0.20
+    ror_solver: str = 'dense'         # 'dense' or 'sparse' (banded, for district-scale ROR)
+    ror_area_ratio_band: float = 1.5  # Sparse solver: max area ratio of candidate pairs (cost grows with pairs in band)
+    ror_block_shapefile: Optional[str] = None  # Reference parcels; match per survey block
+    ror_block_column: str = 'survey_no'        # Survey number column in that shapefile
+
+    # Resumable runs
+    journal_path: Optional[str] = None  # SQLite per-tile journal; completed tiles are skipped (masks not kept)
+
+    # Streaming output
+    stream_batch_size: int = 500  # Finalized parcels per GeoPackage append
+    stream_read_back: bool = False  # Load the streamed layer into the result (forced by ROR matching)
+
+    # Profiling
+    chrome_trace_path: Optional[str] = None  # Write stage timings as a Chrome trace
 
 
 @dataclass
@@ -66,6 +96,86 @@ class PipelineResult:
     statistics: Dict
     processing_time: float
     config: PipelineConfig
+    profiler: Optional[StageProfiler] = None
+    output_path: Optional[Path] = None  # Streamed GeoPackage, when parcels were streamed
+
+
+class ParcelStream:
+    """
+    Buffers finalized parcels and appends them to a GeoPackage in batches.
+
+    Masks are released as parcels are buffered, and buffered parcels are
+    dropped once written, so memory stays bounded by ``stream_batch_size``.
+    Behaves like a list for ``extend`` and ``len``. Only area and confidence
+    are kept per written parcel, enough for summary statistics.
+    """
+
+    def __init__(self, output_dir: str, village_name: str, crs, config: PipelineConfig):
+        self.output_dir = output_dir
+        self.village_name = village_name
+        self.crs = crs
+        self.config = config
+        self.path = geopackage_path(output_dir, village_name)
+        self.count = 0
+        self._buffer: List[DetectedParcel] = []
+        self._areas: List[float] = []
+        self._confidences: List[float] = []
+
+        # Start a fresh layer; batches are appended from here on
+        self.path.unlink(missing_ok=True)
+
+    def extend(self, parcels: Iterable[DetectedParcel]):
+        for parcel in parcels:
+            parcel.mask = None
+            self._buffer.append(parcel)
+
+        if len(self._buffer) >= self.config.stream_batch_size:
+            self.flush()
+
+    def flush(self):
+        """Append buffered parcels to the GeoPackage."""
+        if not self._buffer:
+            return
+
+        batch_gdf = parcels_to_geodataframe(self._buffer, crs=self.crs, start_index=self.count)
+        batch_gdf['area_sqm'] = batch_gdf.geometry.area
+        batch_gdf['area_acres'] = batch_gdf['area_sqm'] / 4046.86
+
+        batch = PipelineResult(
+            village_name=self.village_name,
+            parcels=batch_gdf,
+            statistics={},
+            processing_time=0.0,
+            config=self.config
+        )
+        export_results(batch, self.output_dir, append=True)
+
+        self._areas.extend(batch_gdf['area_sqm'].tolist())
+        self._confidences.extend(batch_gdf['confidence'].tolist())
+        self.count += len(self._buffer)
+        self._buffer = []
+
+    def close(self):
+        self.flush()
+
+    def attributes(self) -> pd.DataFrame:
+        """Area and confidence of every written parcel, without geometries."""
+        return pd.DataFrame({'area_sqm': self._areas, 'confidence': self._confidences})
+
+    def read(self) -> gpd.GeoDataFrame:
+        """
+        Load the written layer back into memory.
+
+        Returns:
+            GeoDataFrame of written parcels; empty with the parcel schema if
+            nothing was written (no GeoPackage is created in that case)
+        """
+        if self.count == 0:
+            return parcels_to_geodataframe([], crs=self.crs)
+        return gpd.read_file(self.path)
+
+    def __len__(self) -> int:
+        return self.count + len(self._buffer)
 
 
 class BoundaryAIPipeline:
@@ -86,6 +196,7 @@ class BoundaryAIPipeline:
         """
         self.config = config or PipelineConfig()
         self.segmenter = None
+        self.profiler = StageProfiler()
         self._initialized = False
 
     def initialize(self):
@@ -103,13 +214,11 @@ class BoundaryAIPipeline:
         print(f"  SAM Model: {self.config.sam_model}")
         print(f"  Tile Size: {self.config.tile_size}")
 
-        self.segmenter = SAMSegmenter(
-            model_type=self.config.sam_model,
-            min_area=self.config.min_parcel_area_pixels,
-            max_area=self.config.max_parcel_area_pixels,
-            stability_score_thresh=self.config.stability_threshold,
-            pred_iou_thresh=self.config.iou_threshold,
-        )
+        if self.config.num_workers <= 1:
+            self.segmenter = create_segmenter(self.config)
+        else:
+            # Each worker process loads its own model
+            print(f"  Workers: {self.config.num_workers}")
 
         self._initialized = True
         print("Pipeline initialized successfully")
@@ -120,7 +229,8 @@ class BoundaryAIPipeline:
         ror_path: Optional[str] = None,
         village_name: str = "Village",
         max_tiles: Optional[int] = None,
-        progress_callback=None
+        progress_callback=None,
+        stream_to: Optional[str] = None
     ) -> PipelineResult:
         """
         Process a drone image to extract land parcels.
@@ -131,6 +241,12 @@ class BoundaryAIPipeline:
             village_name: Name of the village
             max_tiles: Maximum tiles to process (for testing)
             progress_callback: Optional callback(current, total, message)
+            stream_to: Optional output directory. Parcels are appended to the
+                GeoPackage there as soon as they are final and then dropped
+                from memory, so segmentation runs in bounded RAM. Requires
+                merge_strategy='seam'. The result's ``parcels`` stay empty
+                unless ``stream_read_back`` is set or ROR matching runs;
+                ``output_path`` points at the GeoPackage.
 
         Returns:
             PipelineResult with detected parcels and statistics
@@ -140,6 +256,11 @@ class BoundaryAIPipeline:
         # Initialize SAM if needed
         self.initialize()
 
+        # Fresh stage timings for this run
+        self.profiler = StageProfiler()
+        if self.segmenter is not None:
+            self.segmenter.profiler = self.profiler
+
         # Load image
         print(f"\n{'='*60}")
         print(f"Processing: {village_name}")
@@ -158,73 +279,227 @@ class BoundaryAIPipeline:
 
         # Process tiles
         all_parcels = []
+        merged_parcels = []
+        raw_count = 0
         tiles_processed = 0
         total_tiles = min(max_tiles, metadata['total_tiles']) if max_tiles else metadata['total_tiles']
 
-        print(f"\nSegmenting with SAM...")
-        for tile in loader.iter_tiles():
-            if max_tiles and tiles_processed >= max_tiles:
-                break
+        seam_merger = None
+        if self.config.merge_strategy == 'seam':
+            seam_merger = SeamMerger(loader, overlap_threshold=self.config.merge_overlap_threshold)
 
-            tiles_processed += 1
+        if self.config.journal_path and self.config.parcel_mask_format != 'none':
+            raise ValueError("Journaled runs require parcel_mask_format='none'")
 
-            if progress_callback:
-                progress_callback(tiles_processed, total_tiles, f"Tile {tile.tile_id}")
+        stream = None
+        if stream_to:
+            if seam_merger is None:
+                raise ValueError("Streaming output requires merge_strategy='seam'")
+            stream = ParcelStream(stream_to, village_name, metadata['crs'], self.config)
+            merged_parcels = stream
 
-            print(f"\r  Processing tile {tiles_processed}/{total_tiles}...", end='', flush=True)
+        tile_ids = loader.tile_indices()[:total_tiles]
 
-            # Run SAM segmentation on this tile
-            masks = self.segmenter.segment_image(tile.data)
+        journal = None
+        pending_ids = tile_ids
+        if self.config.journal_path:
+            journal = TileJournal(
+                self.config.journal_path,
+                segmentation_config_hash(self.config, metadata)
+            )
+            done = journal.completed_tiles()
+            pending_ids = [t for t in tile_ids if t not in done]
+            print(f"  Journal: {len(tile_ids) - len(pending_ids)} tiles already segmented")
 
-            # Convert masks to polygons with geo coordinates
-            tile_parcels = self.segmenter.masks_to_polygons(
-                masks,
-                transform=tile.transform,
-                simplify_tolerance=self.config.simplify_tolerance
+        print(f"\nSegmenting with SAM...")
+        if self.config.num_workers > 1:
+            # Worker stage timings stay in the workers; record the wait here.
+            # Their memory shows up as children_peak_rss_mb once the pool exits
+            tile_iter = self._segment_tiles_parallel(image_path, pending_ids)
+            results = self.profiler.iter_stage('tile_workers', tile_iter)
+        else:
+            tile_iter = loader.iter_tiles(
+                prefetch=self.config.tile_prefetch,
+                num_workers=self.config.tile_read_workers,
+                tile_ids=pending_ids
             )
+            results = self._segment_tiles(self.profiler.iter_stage('tile_read', tile_iter))
 
-            all_parcels.extend(tile_parcels)
+        if journal is not None:
+            results = self._with_journal(tile_ids, results, journal)
 
-        print(f"\n  Raw parcels detected: {len(all_parcels)}")
+        for tile_id, tile_parcels in results:
+            tiles_processed += 1
+
+            if progress_callback:
+                progress_callback(tiles_processed, total_tiles, f"Tile {tile_id}")
+
+            print(f"\r  Processing tile {tiles_processed}/{total_tiles}...", end='', flush=True)
+
+            raw_count += len(tile_parcels)
+            if seam_merger is not None:
+                # Merge across seams as tiles complete
+                with self.profiler.stage('merge'):
+                    finalized = seam_merger.add_tile(tile_id, tile_parcels)
+                # Only a stream writes; a plain list extend is not export time
+                with self.profiler.stage('export' if stream is not None else 'merge'):
+                    merged_parcels.extend(finalized)
+            else:
+                all_parcels.extend(tile_parcels)
+
+        # Stops background readers/workers if iteration ended early
+        tile_iter.close()
+        if journal is not None:
+            journal.close()
+        print(f"\n  Raw parcels detected: {raw_count}")
 
         # Merge overlapping parcels from adjacent tiles
         print("Merging overlapping parcels...")
-        merged_parcels = merge_overlapping_parcels(
-            all_parcels,
-            overlap_threshold=self.config.merge_overlap_threshold
-        )
+        with self.profiler.stage('merge'):
+            if seam_merger is not None:
+                remaining = seam_merger.flush()
+            else:
+                merged_parcels = merge_overlapping_parcels(
+                    all_parcels,
+                    overlap_threshold=self.config.merge_overlap_threshold
+                )
+        if seam_merger is not None:
+            with self.profiler.stage('export' if stream is not None else 'merge'):
+                merged_parcels.extend(remaining)
+            print(f"  Interior parcels: {seam_merger.stats['interior']}, "
+                  f"seam parcels: {seam_merger.stats['seam']}")
         print(f"  After merging: {len(merged_parcels)} parcels")
 
-        # Convert to GeoDataFrame
-        parcels_gdf = parcels_to_geodataframe(merged_parcels, crs=metadata['crs'])
-
-        # Calculate areas
-        parcels_gdf['area_sqm'] = parcels_gdf.geometry.area
-        parcels_gdf['area_acres'] = parcels_gdf['area_sqm'] / 4046.86
+        if stream is not None:
+            with self.profiler.stage('export'):
+                stream.close()
+            print(f"  Streamed to: {stream.path}")
+            match_ror = bool(ror_path) and Path(ror_path).exists()
+            if self.config.stream_read_back or match_ror:
+                parcels_gdf = stream.read()
+            else:
+                parcels_gdf = parcels_to_geodataframe([], crs=metadata['crs'])
+        else:
+            # Convert to GeoDataFrame
+            parcels_gdf = parcels_to_geodataframe(merged_parcels, crs=metadata['crs'])
+
+            # Calculate areas
+            parcels_gdf['area_sqm'] = parcels_gdf.geometry.area
+            parcels_gdf['area_acres'] = parcels_gdf['area_sqm'] / 4046.86
 
         # Match to ROR if provided
         if ror_path and Path(ror_path).exists():
             print(f"\nMatching to ROR: {ror_path}")
-            parcels_gdf = self._match_to_ror(parcels_gdf, ror_path)
+            with self.profiler.stage('ror_match'):
+                parcels_gdf = self._match_to_ror(parcels_gdf, ror_path)
+            if stream is not None and len(parcels_gdf) > 0:
+                # Matching is global, so the streamed layer is rewritten once
+                parcels_gdf.to_file(stream.path, driver='GPKG')
 
         # Calculate processing time
         processing_time = (datetime.now() - start_time).total_seconds()
 
-        # Calculate statistics
-        stats = self._calculate_statistics(parcels_gdf, metadata, processing_time)
+        # Calculate statistics (streamed parcels may not be loaded back)
+        if stream is not None and len(parcels_gdf) < stream.count:
+            stats = self._calculate_statistics(stream.attributes(), metadata, processing_time)
+        else:
+            stats = self._calculate_statistics(parcels_gdf, metadata, processing_time)
+        stats['profile'] = self.profiler.summary()
+        if self.config.chrome_trace_path:
+            self.profiler.write_chrome_trace(self.config.chrome_trace_path)
 
         print(f"\nProcessing complete in {processing_time:.1f} seconds")
-        print(f"  Total parcels: {len(parcels_gdf)}")
-        print(f"  Avg confidence: {parcels_gdf['confidence'].mean():.1%}")
+        print(f"  Total parcels: {stats['total_parcels']}")
+        print(f"  Avg confidence: {stats['avg_confidence']:.1%}")
 
         return PipelineResult(
             village_name=village_name,
             parcels=parcels_gdf,
             statistics=stats,
             processing_time=processing_time,
-            config=self.config
+            config=self.config,
+            profiler=self.profiler,
+            output_path=stream.path if stream is not None else None
         )
 
+    def _segment_tiles(
+        self,
+        tiles: Iterable[ImageTile]
+    ) -> Iterator[Tuple[Tuple[int, int], List[DetectedParcel]]]:
+        """
+        Run SAM over tiles and vectorize the masks.
+
+        Tiles are grouped into batches of ``sam_batch_size`` so the image
+        encoder can process several tiles per forward pass.
+
+        Yields:
+            (tile_id, parcels) for each tile, in input order
+        """
+        batch_size = max(1, self.config.sam_batch_size)
+        tiles = iter(tiles)
+
+        while True:
+            batch = list(islice(tiles, batch_size))
+            if not batch:
+                break
+
+            # Run SAM segmentation on this batch
+            if batch_size == 1:
+                batch_masks = [self.segmenter.segment_image(batch[0].data)]
+            else:
+                batch_masks = self.segmenter.segment_batch([tile.data for tile in batch])
+
+            for tile, masks in zip(batch, batch_masks):
+                with self.profiler.stage('vectorize'):
+                    tile_parcels = vectorize_tile(self.segmenter, self.config, tile, masks)
+                yield tile.tile_id, tile_parcels
+
+    def _with_journal(
+        self,
+        tile_ids: List[Tuple[int, int]],
+        segmented: Iterator[Tuple[Tuple[int, int], List[DetectedParcel]]],
+        journal: TileJournal
+    ) -> Iterator[Tuple[Tuple[int, int], List[DetectedParcel]]]:
+        """
+        Interleave journaled tiles with newly segmented ones.
+
+        ``segmented`` must cover exactly the tiles missing from the journal,
+        in tile order. New results are recorded before being yielded, and
+        the combined stream stays in tile order.
+        """
+        done = journal.completed_tiles()
+        for tile_id in tile_ids:
+            if tile_id in done:
+                yield tile_id, journal.load(tile_id)
+            else:
+                seg_id, parcels = next(segmented)
+                journal.record(seg_id, parcels)
+                yield seg_id, parcels
+
+    def _segment_tiles_parallel(
+        self,
+        image_path: str,
+        tile_ids: List[Tuple[int, int]]
+    ) -> Iterator[Tuple[Tuple[int, int], List[DetectedParcel]]]:
+        """
+        Segment tiles in a pool of worker processes.
+
+        Workers pull tile indices from the pool's shared task queue, read
+        them with ``ORILoader.get_tile`` and return vectorized parcels.
+        Results are yielded in tile order whatever order workers finish
+        in, so downstream merging is deterministic.
+
+        Yields:
+            (tile_id, parcels) for each tile, in input order
+        """
+        ctx = multiprocessing.get_context('spawn')
+        with ctx.Pool(
+            processes=self.config.num_workers,
+            initializer=_init_tile_worker,
+            initargs=(image_path, self.config)
+        ) as pool:
+            yield from pool.imap(_process_tile, tile_ids)
+
     def _match_to_ror(self, parcels_gdf: gpd.GeoDataFrame, ror_path: str) -> gpd.GeoDataFrame:
         """Match detected parcels to ROR records."""
         ror_loader = RORLoader(ror_path)
@@ -232,8 +507,20 @@ class BoundaryAIPipeline:
         print(f"  Loaded {len(ror_df)} ROR records")
 
         # Create constraint engine and match
-        engine = create_constraint_engine(ror_df)
-        matched_gdf, match_results = engine.match_segments_to_ror(parcels_gdf)
+        engine = create_constraint_engine(
+            ror_df,
+            solver=self.config.ror_solver,
+            area_ratio_band=self.config.ror_area_ratio_band
+        )
+        if self.config.ror_block_shapefile:
+            reference = ShapefileLoader(self.config.ror_block_shapefile).gdf
+            matched_gdf, match_results = engine.match_segments_by_block(
+                parcels_gdf, reference, block_column=self.config.ror_block_column
+            )
+            n_blocks = matched_gdf['match_block'].nunique()
+            print(f"  Matched within {n_blocks} survey blocks")
+        else:
+            matched_gdf, match_results = engine.match_segments_to_ror(parcels_gdf)
 
         matched_count = matched_gdf['is_matched'].sum() if 'is_matched' in matched_gdf.columns else 0
         print(f"  Matched {matched_count} parcels to ROR")
@@ -242,7 +529,7 @@ class BoundaryAIPipeline:
 
     def _calculate_statistics(
         self,
-        parcels_gdf: gpd.GeoDataFrame,
+        parcels_gdf: pd.DataFrame,
         metadata: Dict,
         processing_time: float
     ) -> Dict:
@@ -283,6 +570,71 @@ class BoundaryAIPipeline:
         return stats
 
 
+def create_segmenter(config: PipelineConfig) -> SAMSegmenter:
+    """Build the SAM segmenter described by a pipeline config."""
+    return SAMSegmenter(
+        model_type=config.sam_model,
+        min_area=config.min_parcel_area_pixels,
+        max_area=config.max_parcel_area_pixels,
+        stability_score_thresh=config.stability_threshold,
+        pred_iou_thresh=config.iou_threshold,
+        embedding_cache=(
+            EmbeddingCache(config.embedding_cache_dir)
+            if config.embedding_cache_dir else None
+        ),
+    )
+
+
+def vectorize_tile(
+    segmenter: SAMSegmenter,
+    config: PipelineConfig,
+    tile: ImageTile,
+    masks: List[Dict]
+) -> List[DetectedParcel]:
+    """Convert a tile's SAM masks to polygons with geo coordinates."""
+    return segmenter.masks_to_polygons(
+        masks,
+        transform=tile.transform,
+        simplify_tolerance=config.simplify_tolerance,
+        tile_id=tile.tile_id,
+        mask_format=config.parcel_mask_format,
+        simplify_mode=config.simplify_mode
+    )
+
+
+# Per-process state for tile workers (set by _init_tile_worker)
+_worker_state: Dict = {}
+
+
+def _init_tile_worker(image_path: str, config: PipelineConfig):
+    """Load the image handle and SAM model once per worker process."""
+    import torch
+
+    threads = config.torch_threads_per_worker
+    if not threads:
+        threads = max(1, (os.cpu_count() or 1) // max(1, config.num_workers))
+    torch.set_num_threads(threads)
+
+    _worker_state['loader'] = ORILoader(
+        image_path,
+        tile_size=config.tile_size,
+        overlap=config.tile_overlap
+    )
+    _worker_state['segmenter'] = create_segmenter(config)
+    _worker_state['config'] = config
+
+
+def _process_tile(tile_id: Tuple[int, int]) -> Tuple[Tuple[int, int], List[DetectedParcel]]:
+    """Segment and vectorize one tile inside a worker process."""
+    loader = _worker_state['loader']
+    segmenter = _worker_state['segmenter']
+    config = _worker_state['config']
+
+    tile = loader.get_tile(*tile_id)
+    masks = segmenter.segment_image(tile.data)
+    return tile_id, vectorize_tile(segmenter, config, tile, masks)
+
+
 def run_pipeline(
     image_path: str,
     ror_path: Optional[str] = None,
@@ -321,9 +673,16 @@ def run_pipeline(
     return result
 
 
+def geopackage_path(output_dir: str, village_name: str) -> Path:
+    """Path of the parcels GeoPackage written by export_results."""
+    name = village_name.replace(' ', '_')
+    return Path(output_dir) / f"{name}_parcels.gpkg"
+
+
 def export_results(
     result: PipelineResult,
-    output_dir: str
+    output_dir: str,
+    append: bool = False
 ) -> Dict[str, str]:
     """
     Export pipeline results to files.
@@ -331,6 +690,11 @@ def export_results(
     Args:
         result: Pipeline result
         output_dir: Output directory
+        append: Append the parcels to an existing GeoPackage and skip the
+            other outputs (used for streaming batches)
+
+    For streamed runs (``result.output_path`` set) the streamed GeoPackage
+    is kept as is, and GeoJSON is only written if the parcels were read back.
 
     Returns:
         Dict mapping output type to file path
@@ -342,15 +706,35 @@ def export_results(
     name = result.village_name.replace(' ', '_')
 
     # Export parcels as GeoPackage
-    gpkg_path = output_dir / f"{name}_parcels.gpkg"
-    result.parcels.to_file(gpkg_path, driver='GPKG')
-    outputs['geopackage'] = str(gpkg_path)
-    print(f"Saved: {gpkg_path}")
-
-    # Export parcels as GeoJSON
-    geojson_path = output_dir / f"{name}_parcels.geojson"
-    result.parcels.to_file(geojson_path, driver='GeoJSON')
-    outputs['geojson'] = str(geojson_path)
+    gpkg_path = geopackage_path(output_dir, result.village_name)
+    if append:
+        mode = 'a' if gpkg_path.exists() else 'w'
+        result.parcels.to_file(gpkg_path, driver='GPKG', mode=mode)
+        outputs['geopackage'] = str(gpkg_path)
+        return outputs
+
+    profiler = result.profiler or StageProfiler(enabled=False)
+    with profiler.stage('export'):
+        if result.output_path is not None:
+            # Streamed run: the GeoPackage is already written, and
+            # result.parcels is empty unless it was read back
+            outputs['geopackage'] = str(result.output_path)
+        else:
+            result.parcels.to_file(gpkg_path, driver='GPKG')
+            outputs['geopackage'] = str(gpkg_path)
+            print(f"Saved: {gpkg_path}")
+
+        # Export parcels as GeoJSON
+        if result.output_path is None or len(result.parcels) > 0:
+            geojson_path = output_dir / f"{name}_parcels.geojson"
+            result.parcels.to_file(geojson_path, driver='GeoJSON')
+            outputs['geojson'] = str(geojson_path)
+
+    if result.profiler is not None:
+        # Include export time in the reported breakdown
+        result.statistics['profile'] = result.profiler.summary()
+        if result.config.chrome_trace_path:
+            outputs['trace'] = result.profiler.write_chrome_trace(result.config.chrome_trace_path)
 
     # Export statistics as JSON
     stats_path = output_dir / f"{name}_stats.json"
@@ -0,0 +1,373 @@
+"""
+Planar Topology Model for Parcel Layers
+
+Builds a shared-edge (TopoJSON-like) representation of a parcel layer
+once: nodes, arcs and faces. Every piece of boundary is stored as a single
+arc that knows the parcel on each side, and each parcel is the set of arcs
+around it. Neighbour lookups are therefore plain reads, and editing a
+shared arc moves the boundary of both parcels at once.
+
+Polygons are rebuilt from their arcs on demand, so layer-level operations
+(shared-boundary detection, simplification, export) can work on arcs
+instead of pairwise shapely predicates.
+"""
+
+from typing import Dict, Hashable, List, Optional, Sequence, Set
+
+import numpy as np
+import geopandas as gpd
+import shapely
+from shapely import STRtree
+from shapely.geometry import LineString
+
+
+EXTERIOR = -1  # Parcel position for the outside of the layer
+
+
+class PlanarTopology:
+    """
+    Shared-arc topology of a parcel layer.
+
+    Attributes:
+        arcs: Arc geometries (LineStrings, closed for isolated rings)
+        arc_parcels: (n_arcs, k) positions of the parcels using each arc,
+            sorted and padded with EXTERIOR. k is 2 for a clean layer
+            (one parcel on either side) and grows where overlapping
+            parcels share an edge
+        n_overlapping_arcs: Arcs used by more than two parcels
+        arc_nodes: (n_arcs, 2) start and end node ids of each arc
+        nodes: (n_nodes, 2) node coordinates
+
+    Usage:
+        topo = PlanarTopology(parcels)
+        topo.neighbors(parcel_id)
+        topo.set_arc(arc_id, new_coords)
+        parcels = topo.to_geodataframe()
+    """
+
+    def __init__(self, parcels: gpd.GeoDataFrame, tolerance: float = 1e-6):
+        """
+        Build the topology.
+
+        Boundaries are noded together, so partially coincident edges are
+        split where they stop being shared.
+
+        Args:
+            parcels: GeoDataFrame of parcel polygons
+            tolerance: Distance within which a noded edge counts as lying
+                on a parcel boundary
+        """
+        self.parcels = parcels
+        self.crs = parcels.crs
+        self.labels: List[Hashable] = parcels.index.tolist()
+        self._positions: Dict[Hashable, int] = {label: i for i, label in enumerate(self.labels)}
+
+        geoms = parcels.geometry.to_numpy()
+        boundaries = shapely.boundary(geoms)
+
+        # Node the whole edge network once
+        edges = shapely.get_parts(shapely.union_all(boundaries))
+        edges = edges[shapely.get_type_id(edges) == 1]  # LineStrings only
+
+        # Parcels each edge lies on
+        midpoints = shapely.line_interpolate_point(edges, 0.5, normalized=True)
+        edge_idx, parcel_idx = STRtree(boundaries).query(
+            midpoints, predicate='dwithin', distance=tolerance
+        )
+        order = np.lexsort((parcel_idx, edge_idx))
+        edge_idx, parcel_idx = edge_idx[order], parcel_idx[order]
+
+        # Every parcel using each edge (more than two only with overlaps)
+        hit_edges, first, counts = np.unique(edge_idx, return_index=True, return_counts=True)
+        width = max(2, counts.max()) if len(counts) else 2
+        rank = np.arange(len(edge_idx)) - np.repeat(first, counts)
+        sides = np.full((len(edges), width), EXTERIOR, dtype=np.int64)
+        sides[edge_idx, rank] = parcel_idx
+        sides.sort(axis=1)
+
+        # Arcs: maximal chains of edges used by the same parcels
+        used = (sides != EXTERIOR).any(axis=1)
+        owner_sets, group = np.unique(sides[used], axis=0, return_inverse=True)
+        group = group.ravel()
+        order = np.argsort(group, kind='stable')
+        merged = shapely.line_merge(
+            shapely.multilinestrings(edges[used][order], indices=group[order])
+        )
+        self.arcs, arc_group = shapely.get_parts(merged, return_index=True)
+        self.arc_parcels = owner_sets[arc_group].reshape(-1, width)
+        self.n_overlapping_arcs = int(((self.arc_parcels != EXTERIOR).sum(axis=1) > 2).sum())
+
+        # Nodes are arc endpoints
+        ends = np.stack([
+            shapely.get_coordinates(shapely.get_point(self.arcs, 0)),
+            shapely.get_coordinates(shapely.get_point(self.arcs, -1)),
+        ], axis=1).reshape(-1, 2)
+        self.nodes, inverse = np.unique(ends, axis=0, return_inverse=True)
+        self.arc_nodes = inverse.reshape(-1, 2)
+
+        # Faces and adjacency
+        self._parcel_arcs: List[List[int]] = [[] for _ in self.labels]
+        self._neighbors: List[Set[int]] = [set() for _ in self.labels]
+        for arc_id, owners in enumerate(self.arc_parcels):
+            owners = owners[owners != EXTERIOR].tolist()
+            for p in owners:
+                self._parcel_arcs[p].append(arc_id)
+                self._neighbors[p].update(q for q in owners if q != p)
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    @property
+    def n_arcs(self) -> int:
+        return len(self.arcs)
+
+    def _position(self, label: Hashable) -> int:
+        return self._positions[label]
+
+    def neighbors(self, label: Hashable) -> List[Hashable]:
+        """Parcels sharing at least one arc with a parcel."""
+        return [self.labels[p] for p in sorted(self._neighbors[self._position(label)])]
+
+    def arcs_of(self, label: Hashable) -> List[int]:
+        """Arc ids around a parcel."""
+        return list(self._parcel_arcs[self._position(label)])
+
+    def shared_arcs(self, label_a: Hashable, label_b: Hashable) -> List[int]:
+        """Arc ids on the boundary between two parcels."""
+        b = self._position(label_b)
+        return [
+            arc_id for arc_id in self._parcel_arcs[self._position(label_a)]
+            if b in self.arc_parcels[arc_id]
+        ]
+
+    def set_arc(self, arc_id: int, coords: Sequence[Sequence[float]]):
+        """
+        Replace the geometry of an arc (both parcels see the change).
+
+        Args:
+            arc_id: Arc to edit
+            coords: New coordinates; endpoints must stay on the arc's nodes
+
+        Raises:
+            ValueError: If the endpoints move off the arc's nodes
+        """
+        coords = np.asarray(coords, dtype=float)
+        start, end = self.nodes[self.arc_nodes[arc_id]]
+        if len(coords) < 2 or not (np.allclose(coords[0], start) and np.allclose(coords[-1], end)):
+            raise ValueError("Arc endpoints must stay on their nodes; use move_node() instead")
+
+        coords[0], coords[-1] = start, end
+        self.arcs[arc_id] = LineString(coords)
+
+    def move_node(self, node_id: int, xy: Sequence[float]):
+        """Move a node, dragging the ends of every arc that meets there."""
+        xy = np.asarray(xy, dtype=float)
+        self.nodes[node_id] = xy
+
+        for arc_id in np.flatnonzero((self.arc_nodes == node_id).any(axis=1)):
+            coords = np.array(self.arcs[arc_id].coords)
+            if self.arc_nodes[arc_id, 0] == node_id:
+                coords[0] = xy
+            if self.arc_nodes[arc_id, 1] == node_id:
+                coords[-1] = xy
+            self.arcs[arc_id] = LineString(coords)
+
+    def simplify(self, tolerance: float) -> 'PlanarTopology':
+        """
+        Simplify every arc once (Douglas-Peucker), in place.
+
+        Nodes never move, so neighbouring parcels keep an identical shared
+        boundary. Arcs that would cross another arc, or closed arcs that
+        would collapse, keep their original geometry.
+
+        Args:
+            tolerance: Simplification tolerance in layer units
+
+        Returns:
+            self, for chaining
+        """
+        if tolerance <= 0 or self.n_arcs == 0:
+            return self
+
+        original = self.arcs
+        simplified = shapely.simplify(original, tolerance, preserve_topology=True)
+
+        collapsed = shapely.is_closed(simplified) & (shapely.get_num_coordinates(simplified) < 4)
+        simplified[collapsed] = original[collapsed]
+
+        # Arcs may only meet at their ends; revert crossing arcs until none are left
+        while True:
+            a, b = STRtree(simplified).query(simplified, predicate='intersects')
+            a, b = a[a < b], b[a < b]
+            conflict = ~shapely.touches(simplified[a], simplified[b])
+            changed = np.unique(np.r_[a[conflict], b[conflict]])
+            changed = changed[simplified[changed] != original[changed]]
+            if len(changed) == 0:
+                break
+            simplified[changed] = original[changed]
+
+        self.arcs = simplified
+        return self
+
+    def polygon(self, label: Hashable):
+        """Rebuild a parcel's polygon from its arcs."""
+        arc_ids = self._parcel_arcs[self._position(label)]
+        return shapely.build_area(shapely.multilinestrings(self.arcs[arc_ids]))
+
+    def to_geodataframe(self) -> gpd.GeoDataFrame:
+        """
+        Rebuild the parcel layer from the (possibly edited) arcs.
+
+        Returns:
+            Copy of the input parcels with geometries rebuilt from arcs
+        """
+        polygons = np.array([
+            shapely.build_area(shapely.multilinestrings(self.arcs[arc_ids]))
+            for arc_ids in self._parcel_arcs
+        ], dtype=object)
+
+        parcels = self.parcels.copy()
+        parcels[parcels.geometry.name] = gpd.GeoSeries(polygons, index=parcels.index, crs=self.crs)
+        return parcels
+
+    def shared_boundaries(self) -> gpd.GeoDataFrame:
+        """
+        Boundary lines between neighbouring parcels.
+
+        Returns:
+            GeoDataFrame with one row per neighbouring pair: merged shared
+            line, 'parcel_1', 'parcel_2' (index labels) and 'length'
+        """
+        # Every pair of parcels using the same arc
+        width = self.arc_parcels.shape[1]
+        arc_ids, pair_list = [], []
+        for c1 in range(width):
+            for c2 in range(c1 + 1, width):
+                both = np.flatnonzero(self.arc_parcels[:, c1] != EXTERIOR)
+                arc_ids.append(both)
+                pair_list.append(self.arc_parcels[both][:, [c1, c2]])
+        interior = np.concatenate(arc_ids)
+        arc_pairs = np.concatenate(pair_list).reshape(-1, 2)
+
+        if len(interior) == 0:
+            return gpd.GeoDataFrame(
+                columns=['geometry', 'parcel_1', 'parcel_2', 'length'],
+                geometry='geometry',
+                crs=self.crs
+            )
+
+        pairs, group = np.unique(arc_pairs, axis=0, return_inverse=True)
+        group = group.ravel()
+        order = np.argsort(group, kind='stable')
+        lines = shapely.line_merge(
+            shapely.multilinestrings(self.arcs[interior[order]], indices=group[order])
+        )
+
+        return gpd.GeoDataFrame({
+            'geometry': lines,
+            'parcel_1': [self.labels[a] for a, _ in pairs],
+            'parcel_2': [self.labels[b] for _, b in pairs],
+            'length': shapely.length(lines),
+        }, crs=self.crs)
+
+    def _rings(self, position: int) -> List[List[int]]:
+        """Chain a parcel's arcs into rings of signed arc ids (~id = reversed)."""
+        remaining = set(self._parcel_arcs[position])
+        rings = []
+
+        while remaining:
+            arc_id = min(remaining)
+            remaining.discard(arc_id)
+            start, end = self.arc_nodes[arc_id]
+            ring = [arc_id]
+
+            while end != start:
+                next_arc: Optional[int] = None
+                for candidate in sorted(remaining):
+                    if self.arc_nodes[candidate, 0] == end:
+                        next_arc, end = candidate, self.arc_nodes[candidate, 1]
+                        break
+                    if self.arc_nodes[candidate, 1] == end:
+                        next_arc, end = ~candidate, self.arc_nodes[candidate, 0]
+                        break
+                if next_arc is None:  # Open chain (invalid input)
+                    break
+                remaining.discard(next_arc if next_arc >= 0 else ~next_arc)
+                ring.append(next_arc)
+
+            rings.append(ring)
+
+        return rings
+
+    def _ring_coords(self, ring: List[int]) -> np.ndarray:
+        parts = []
+        for arc_id in ring:
+            coords = np.asarray(self.arcs[arc_id if arc_id >= 0 else ~arc_id].coords)
+            parts.append(coords if arc_id >= 0 else coords[::-1])
+        return np.concatenate([parts[0]] + [p[1:] for p in parts[1:]])
+
+    def to_topojson(self, object_name: str = 'parcels') -> Dict:
+        """
+        Export as a TopoJSON topology (untransformed coordinates).
+
+        Args:
+            object_name: Name of the parcel geometry collection
+
+        Returns:
+            TopoJSON dictionary
+        """
+        geometries = []
+        for position, label in enumerate(self.labels):
+            rings = self._rings(position)
+            ring_polygons = [shapely.Polygon(self._ring_coords(r)) for r in rings]
+
+            # Outer rings are not inside another ring of the same parcel
+            outers = [
+                i for i, poly in enumerate(ring_polygons)
+                if not any(j != i and other.contains(poly) for j, other in enumerate(ring_polygons))
+            ]
+            polygons = []
+            for i in outers:
+                holes = [
+                    rings[j] for j, poly in enumerate(ring_polygons)
+                    if j not in outers and ring_polygons[i].contains(poly)
+                ]
+                polygons.append([rings[i]] + holes)
+
+            geometry = {'id': label, 'properties': {}}
+            if len(polygons) == 1:
+                geometry.update(type='Polygon', arcs=polygons[0])
+            else:
+                geometry.update(type='MultiPolygon', arcs=polygons)
+            geometries.append(geometry)
+
+        return {
+            'type': 'Topology',
+            'arcs': [np.asarray(a.coords).tolist() for a in self.arcs],
+            'objects': {
+                object_name: {'type': 'GeometryCollection', 'geometries': geometries}
+            },
+        }
+
+
+def simplify_shared_boundaries(
+    parcels: gpd.GeoDataFrame,
+    tolerance: float
+) -> gpd.GeoDataFrame:
+    """
+    Simplify a parcel layer without opening gaps or overlaps.
+
+    Each shared boundary is simplified once and both parcels are rebuilt
+    from it, unlike per-polygon ``simplify``.
+
+    Args:
+        parcels: GeoDataFrame of parcel polygons
+        tolerance: Douglas-Peucker tolerance in layer units
+
+    Returns:
+        Copy of parcels with simplified geometries
+    """
+    if len(parcels) == 0 or tolerance <= 0:
+        return parcels.copy()
+
+    return PlanarTopology(parcels).simplify(tolerance).to_geodataframe()
@@ -0,0 +1,171 @@
+"""
+Pipeline Stage Profiling
+
+Lightweight wall-clock timers and peak-memory sampling for the stages of
+a village run (tile read, SAM, or its encoder and mask decoding when
+embeddings are cached or batched, vectorization, merge, ROR matching,
+export). The pipeline reports the breakdown in its
+statistics JSON and can also write a Chrome trace (open it in
+chrome://tracing or https://ui.perfetto.dev).
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, TypeVar
+
+try:
+    import resource
+    RESOURCE_AVAILABLE = True
+except ImportError:  # Windows
+    RESOURCE_AVAILABLE = False
+
+
+T = TypeVar('T')
+
+
+def peak_rss_mb(children: bool = False) -> float:
+    """
+    Peak resident set size so far, in MB.
+
+    Args:
+        children: Report the largest terminated child process (e.g. tile
+            workers) instead of this process
+    """
+    if not RESOURCE_AVAILABLE:
+        return 0.0
+    who = resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF
+    max_rss = resource.getrusage(who).ru_maxrss
+    # ru_maxrss is bytes on macOS and KB on Linux
+    if sys.platform == 'darwin':
+        return max_rss / (1024 * 1024)
+    return max_rss / 1024
+
+
+class StageProfiler:
+    """
+    Accumulates per-stage timings and RSS high-water growth.
+
+    The high-water mark only rises, so a stage is charged with how far it
+    rose while the stage ran. Concurrent stages (e.g. prefetching tile
+    reads) can be charged for each other's growth.
+
+    Usage:
+        profiler = StageProfiler()
+        with profiler.stage('merge'):
+            ...
+        profiler.summary()
+    """
+
+    def __init__(self, enabled: bool = True):
+        """
+        Initialize profiler.
+
+        Args:
+            enabled: When False every method is a cheap no-op
+        """
+        self.enabled = enabled
+        self._origin = time.perf_counter()
+        self._lock = threading.Lock()
+        self._totals: Dict[str, Dict] = {}
+        self._events: List[Dict] = []
+
+    @contextmanager
+    def stage(self, name: str):
+        """Time a block of work under a stage name."""
+        if not self.enabled:
+            yield
+            return
+
+        rss_start = peak_rss_mb()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._record(name, start, time.perf_counter(), rss_start)
+
+    def iter_stage(self, name: str, iterable: Iterable[T]) -> Iterator[T]:
+        """
+        Time how long each ``next()`` on an iterable takes.
+
+        Useful for producers such as tile readers, where the cost shows up
+        as time the consumer spends waiting.
+        """
+        iterator = iter(iterable)
+        while True:
+            rss_start = peak_rss_mb() if self.enabled else 0.0
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            if self.enabled:
+                self._record(name, start, time.perf_counter(), rss_start)
+            yield item
+
+    def _record(self, name: str, start: float, end: float, rss_start: float):
+        duration = end - start
+        rss_growth = peak_rss_mb() - rss_start
+
+        with self._lock:
+            totals = self._totals.setdefault(
+                name, {'total_seconds': 0.0, 'count': 0, 'rss_growth_mb': 0.0}
+            )
+            totals['total_seconds'] += duration
+            totals['count'] += 1
+            totals['rss_growth_mb'] += rss_growth
+
+            self._events.append({
+                'name': name,
+                'ph': 'X',
+                'ts': (start - self._origin) * 1e6,
+                'dur': duration * 1e6,
+                'pid': os.getpid(),
+                'tid': threading.get_ident(),
+            })
+
+    def summary(self) -> Dict:
+        """
+        Get the per-stage breakdown.
+
+        Returns:
+            Dict with one entry per stage (total/mean seconds, call count,
+            how far the RSS high-water mark rose during it), peak RSS of
+            this process and of the largest finished child process
+            (worker pools report here once they have shut down)
+        """
+        with self._lock:
+            stages = {
+                name: {
+                    'total_seconds': round(t['total_seconds'], 4),
+                    'count': t['count'],
+                    'mean_seconds': round(t['total_seconds'] / t['count'], 4),
+                    'rss_growth_mb': round(t['rss_growth_mb'], 1),
+                }
+                for name, t in self._totals.items()
+            }
+
+        return {
+            'stages': stages,
+            'peak_rss_mb': round(peak_rss_mb(), 1),
+            'children_peak_rss_mb': round(peak_rss_mb(children=True), 1),
+        }
+
+    def write_chrome_trace(self, path: str) -> str:
+        """
+        Write recorded stage events in Chrome trace event format.
+
+        Returns:
+            Path written
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            events = list(self._events)
+        with open(path, 'w') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+        return str(path)
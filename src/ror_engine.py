@@ -7,6 +7,8 @@ Applies Record of Rights constraints to segmentation:
 - Matching: Link segments to ROR records
 """
 
+import re
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
 
@@ -14,10 +16,39 @@ import numpy as np
 import pandas as pd
 import geopandas as gpd
 from scipy.optimize import linear_sum_assignment
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import min_weight_full_bipartite_matching
+import shapely
+from shapely import STRtree
 from shapely.geometry import Polygon
 from shapely.ops import unary_union
 
 
+def survey_block(survey_no) -> Optional[str]:
+    """
+    Block key of a survey number.
+
+    Sub-divisions share their parent block: ``'123/2A'``, ``'123-1'`` and
+    ``123.0`` all map to ``'123'``.
+
+    Args:
+        survey_no: Survey number (str or number)
+
+    Returns:
+        Block key, or None if the survey number is missing
+    """
+    if survey_no is None or (not isinstance(survey_no, str) and pd.isna(survey_no)):
+        return None
+
+    text = str(survey_no).strip()
+    match = re.match(r'\d+', text)
+    if match:
+        return str(int(match.group()))
+
+    block = re.split(r'[/\-\s]', text)[0]
+    return block or None
+
+
 @dataclass
 class MatchResult:
     """Result of segment-to-ROR matching"""
@@ -52,7 +83,9 @@ class RORConstraintEngine:
         self,
         ror_records: List[Dict],
         count_tolerance: float = 0.3,
-        area_tolerance: float = 0.05
+        area_tolerance: float = 0.05,
+        solver: str = 'dense',
+        area_ratio_band: float = 1.5
     ):
         """
         Initialize constraint engine.
@@ -61,10 +94,27 @@ class RORConstraintEngine:
             ror_records: List of ROR record dictionaries
             count_tolerance: Allowable deviation from expected count (default 30%)
             area_tolerance: Allowable area mismatch (default 5%)
+            solver: Assignment solver, 'dense' (full Hungarian) or 'sparse'
+                (only pairs within area_ratio_band; for district-scale ROR)
+            area_ratio_band: Sparse solver only. A segment and record are
+                candidates when their areas differ by at most this factor.
+                Runtime grows with the number of candidate pairs, not the
+                matrix size. A narrow band on a large problem is cheap, but
+                once most pairs fall in the band the sparse solver is
+                slower than dense (e.g. 20k x 20k at 1.05 takes minutes).
+                Records with no area (<= 0) are never matched by the sparse
+                solver. The dense solver matches them at the maximum cost.
         """
+        if solver not in ('dense', 'sparse'):
+            raise ValueError(f"Unknown solver: {solver}. Use 'dense' or 'sparse'")
+        if area_ratio_band < 1.0:
+            raise ValueError("area_ratio_band must be >= 1.0")
+
         self.ror_records = ror_records
         self.count_tolerance = count_tolerance
         self.area_tolerance = area_tolerance
+        self.solver = solver
+        self.area_ratio_band = area_ratio_band
 
         # Pre-compute statistics
         self.expected_count = len(ror_records)
@@ -213,7 +263,9 @@ class RORConstraintEngine:
         Match generated segments to ROR records using optimal assignment.
 
         Uses Hungarian algorithm to find optimal matching that minimizes
-        total area mismatch.
+        total area mismatch. With ``solver='sparse'`` only segment/record
+        pairs within ``area_ratio_band`` are considered; segments left
+        without a candidate stay unmatched.
 
         Args:
             segments: GeoDataFrame of generated segments
@@ -222,79 +274,316 @@ class RORConstraintEngine:
             Tuple of (segments with ROR info, list of match results)
         """
         segments = segments.copy()
-        n_segments = len(segments)
-        n_ror = len(self.ror_records)
 
         # Ensure area column exists
         if 'area_sqm' not in segments.columns:
             segments['area_sqm'] = segments.geometry.area
 
+        seg_areas = np.asarray(segments.geometry.area, dtype=float)
+        row_ind, col_ind, mismatches = self._solve(seg_areas, self._ror_area_array())
+
+        return self._apply_matches(segments, row_ind, col_ind, mismatches)
+
+    def match_segments_by_block(
+        self,
+        segments: gpd.GeoDataFrame,
+        reference: gpd.GeoDataFrame,
+        block_column: str = 'survey_no',
+        max_workers: Optional[int] = None
+    ) -> Tuple[gpd.GeoDataFrame, List[MatchResult]]:
+        """
+        Match segments to ROR records block by block.
+
+        Survey numbers such as ``123/2A`` belong to block ``123``. Block
+        footprints come from a reference shapefile (e.g.
+        ``ShapefileLoader(path).gdf``); each segment joins the block that
+        contains its representative point and is matched only against ROR
+        records of that block. Segments and records whose block is missing
+        on either side are matched together in one residual problem.
+
+        Many small problems are much cheaper than one village-wide problem
+        and rule out implausible long-range area matches. Blocks are solved
+        on a thread pool (the dense solver releases the GIL).
+
+        Args:
+            segments: GeoDataFrame of generated segments
+            reference: Reference parcels with a survey number column
+            block_column: Column in ``reference`` holding survey numbers
+            max_workers: Threads for solving blocks (default: executor default)
+
+        Returns:
+            Tuple of (segments with ROR info and ``match_block``, list of
+            match results)
+        """
+        if block_column not in reference.columns:
+            raise ValueError(f"Reference has no '{block_column}' column")
+
+        segments = segments.copy()
+        if 'area_sqm' not in segments.columns:
+            segments['area_sqm'] = segments.geometry.area
+
+        if segments.crs is not None and reference.crs is not None and reference.crs != segments.crs:
+            reference = reference.to_crs(segments.crs)
+
+        seg_areas = np.asarray(segments.geometry.area, dtype=float)
+        ror_areas = self._ror_area_array()
+
+        # Block of each reference parcel, segment and ROR record
+        ref_blocks = np.array([survey_block(v) for v in reference[block_column]], dtype=object)
+        seg_blocks = np.full(len(segments), None, dtype=object)
+        if len(segments) and len(reference):
+            tree = STRtree(np.asarray(reference.geometry))
+            points = shapely.point_on_surface(np.asarray(segments.geometry))
+            seg_pos, ref_pos = tree.query(points, predicate='intersects')
+            # A point on a shared edge hits both parcels; keep the lower index
+            order = np.lexsort((ref_pos, seg_pos))
+            seg_pos, ref_pos = seg_pos[order], ref_pos[order]
+            seg_pos, first = np.unique(seg_pos, return_index=True)
+            seg_blocks[seg_pos] = ref_blocks[ref_pos[first]]
+        ror_blocks = np.array(
+            [survey_block(r.get('survey_no')) for r in self.ror_records], dtype=object
+        )
+
+        # Blocks present on both sides are solved on their own
+        shared = (set(seg_blocks) & set(ror_blocks)) - {None}
+        seg_in_block = np.array([b in shared for b in seg_blocks], dtype=bool)
+        ror_in_block = np.array([b in shared for b in ror_blocks], dtype=bool)
+
+        problems = [
+            (np.flatnonzero(seg_blocks == block), np.flatnonzero(ror_blocks == block))
+            for block in sorted(shared)
+        ]
+        problems.append((np.flatnonzero(~seg_in_block), np.flatnonzero(~ror_in_block)))
+
+        def solve(problem):
+            seg_idx, ror_idx = problem
+            rows, cols, mismatches = self._solve(seg_areas[seg_idx], ror_areas[ror_idx])
+            return seg_idx[rows], ror_idx[cols], mismatches
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            solved = list(executor.map(solve, problems))
+
+        row_ind = np.concatenate([r for r, _, _ in solved]).astype(int)
+        col_ind = np.concatenate([c for _, c, _ in solved]).astype(int)
+        mismatches = np.concatenate([m for _, _, m in solved]).astype(float)
+
+        order = np.argsort(row_ind, kind='stable')
+        segments, match_results = self._apply_matches(
+            segments, row_ind[order], col_ind[order], mismatches[order]
+        )
+        segments['match_block'] = pd.Series(
+            np.where(seg_in_block, seg_blocks, None), index=segments.index, dtype=object
+        )
+
+        return segments, match_results
+
+    def _solve(
+        self,
+        seg_areas: np.ndarray,
+        ror_areas: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Solve one area assignment problem with the configured solver.
+
+        Returns:
+            (segment indices, ROR indices, area mismatch) of matched pairs
+        """
+        if self.solver == 'sparse':
+            return self._solve_sparse(seg_areas, ror_areas)
+
         # Build cost matrix based on area difference
-        cost_matrix = np.zeros((n_segments, n_ror))
-
-        for i, (_, seg) in enumerate(segments.iterrows()):
-            seg_area = seg.geometry.area
-            for j, ror in enumerate(self.ror_records):
-                ror_area = ror.get('expected_area_sqm', 0)
-                if ror_area > 0:
-                    # Normalized area difference
-                    cost_matrix[i, j] = abs(seg_area - ror_area) / ror_area
-                else:
-                    cost_matrix[i, j] = 1.0  # Max cost if no area info
+        cost_matrix = self._area_cost_matrix(seg_areas, ror_areas)
 
         # Solve assignment problem
         # Handle case where n_segments != n_ror
-        if n_segments >= n_ror:
+        if len(seg_areas) >= len(ror_areas):
             row_ind, col_ind = linear_sum_assignment(cost_matrix)
         else:
             # Transpose and solve, then swap indices
             col_ind, row_ind = linear_sum_assignment(cost_matrix.T)
 
-        # Initialize new columns
-        segments['ror_survey_no'] = None
-        segments['ror_area_sqm'] = None
-        segments['ror_owner'] = None
-        segments['ror_land_type'] = None
-        segments['area_mismatch'] = None
-        segments['is_matched'] = False
-
-        match_results = []
-
-        # Apply matches
-        for i, j in zip(row_ind, col_ind):
-            if i < n_segments and j < n_ror:
-                ror = self.ror_records[j]
-                seg_area = segments.iloc[i].geometry.area
-                ror_area = ror.get('expected_area_sqm', 0)
-                mismatch = cost_matrix[i, j]
-
-                segments.iloc[i, segments.columns.get_loc('ror_survey_no')] = ror.get('survey_no')
-                segments.iloc[i, segments.columns.get_loc('ror_area_sqm')] = ror_area
-                segments.iloc[i, segments.columns.get_loc('ror_owner')] = ror.get('owner')
-                segments.iloc[i, segments.columns.get_loc('ror_land_type')] = ror.get('land_type')
-                segments.iloc[i, segments.columns.get_loc('area_mismatch')] = mismatch
-                segments.iloc[i, segments.columns.get_loc('is_matched')] = True
-
-                match_results.append(MatchResult(
-                    segment_id=i,
-                    ror_survey_no=ror.get('survey_no'),
-                    ror_area_sqm=ror_area,
-                    generated_area_sqm=seg_area,
-                    area_mismatch=mismatch,
-                    match_confidence=1.0 - min(mismatch, 1.0)
-                ))
+        return row_ind, col_ind, cost_matrix[row_ind, col_ind]
+
+    def _ror_area_array(self) -> np.ndarray:
+        """Expected ROR areas as a float array (missing -> 0)."""
+        return np.array(
+            [r.get('expected_area_sqm', 0) or 0 for r in self.ror_records],
+            dtype=float
+        )
+
+    @staticmethod
+    def _area_cost_matrix(seg_areas: np.ndarray, ror_areas: np.ndarray) -> np.ndarray:
+        """
+        Normalized area difference for every segment/ROR pair.
+
+        Records without area info (area <= 0 or NaN) get the max cost 1.0.
+        """
+        valid = ror_areas > 0
+        safe_areas = np.where(valid, ror_areas, 1.0)
+        cost = np.abs(seg_areas[:, None] - ror_areas[None, :]) / safe_areas[None, :]
+        return np.where(valid[None, :], cost, 1.0)
+
+    def _banded_edges(
+        self,
+        seg_areas: np.ndarray,
+        ror_areas: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Candidate segment/ROR pairs whose areas are within the ratio band.
+
+        ROR areas are sorted once; each segment's candidates are the
+        contiguous run with ``seg / band <= ror <= seg * band``. Records
+        without area info (area <= 0) get no candidates.
+
+        Returns:
+            (segment indices, ROR indices, area mismatch) per edge
+        """
+        band = self.area_ratio_band
+        valid = np.flatnonzero(ror_areas > 0)
+        order = valid[np.argsort(ror_areas[valid], kind='stable')]
+        sorted_areas = ror_areas[order]
+
+        lo = np.searchsorted(sorted_areas, seg_areas / band, side='left')
+        hi = np.searchsorted(sorted_areas, seg_areas * band, side='right')
+        counts = hi - lo
+
+        seg_idx = np.repeat(np.arange(len(seg_areas)), counts)
+        # Position within each segment's run, offset to its start
+        starts = np.repeat(lo - np.cumsum(counts) + counts, counts)
+        ror_idx = order[np.arange(counts.sum()) + starts]
+
+        mismatch = np.abs(seg_areas[seg_idx] - ror_areas[ror_idx]) / ror_areas[ror_idx]
+        return seg_idx, ror_idx, mismatch
+
+    def _solve_sparse(
+        self,
+        seg_areas: np.ndarray,
+        ror_areas: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Min-cost matching over the banded candidate graph.
+
+        Each node on the smaller side also gets a private dummy partner with
+        a cost larger than any real matching, so a full matching always
+        exists and the solver first maximizes real matches, then minimizes
+        total mismatch. With a band covering every area ratio this is the
+        dense solution, except that records without area stay unmatched.
+
+        Returns:
+            (segment indices, ROR indices, area mismatch) of matched pairs,
+            ordered like the dense solver's output
+        """
+        n_segments, n_ror = len(seg_areas), len(ror_areas)
+        seg_idx, ror_idx, mismatch = self._banded_edges(seg_areas, ror_areas)
+
+        empty = np.array([], dtype=int)
+        if len(seg_idx) == 0:
+            return empty, empty, np.array([], dtype=float)
+
+        # Rows are the smaller side, as the dense solver transposes
+        segments_are_rows = n_segments <= n_ror
+        if segments_are_rows:
+            rows, cols, n_rows, n_cols = seg_idx, ror_idx, n_segments, n_ror
+        else:
+            rows, cols, n_rows, n_cols = ror_idx, seg_idx, n_ror, n_segments
+
+        # Edge weights must be non-zero to count as edges, hence the +1
+        # (a constant per real edge; dummy cost keeps cardinality first).
+        # Band-limited mismatch is at most band - 1, so this bounds any
+        # real matching's cost.
+        dummy_cost = n_rows * (self.area_ratio_band + 1.0) + 1.0
+        dummy_rows = np.arange(n_rows)
+        graph = csr_matrix(
+            (
+                np.concatenate([mismatch + 1.0, np.full(n_rows, dummy_cost)]),
+                (np.concatenate([rows, dummy_rows]), np.concatenate([cols, n_cols + dummy_rows]))
+            ),
+            shape=(n_rows, n_cols + n_rows)
+        )
+
+        match_rows, match_cols = min_weight_full_bipartite_matching(graph)
+        real = match_cols < n_cols
+        match_rows, match_cols = match_rows[real], match_cols[real]
+
+        if segments_are_rows:
+            seg_matched, ror_matched = match_rows, match_cols
+        else:
+            seg_matched, ror_matched = match_cols, match_rows
+
+        # Dense output is ordered by segment, or by ROR record when
+        # segments are fewer
+        order = np.argsort(seg_matched if n_segments >= n_ror else ror_matched, kind='stable')
+        seg_matched, ror_matched = seg_matched[order], ror_matched[order]
+
+        mismatches = np.abs(seg_areas[seg_matched] - ror_areas[ror_matched]) / ror_areas[ror_matched]
+        return seg_matched, ror_matched, mismatches
+
+    def _apply_matches(
+        self,
+        segments: gpd.GeoDataFrame,
+        row_ind: np.ndarray,
+        col_ind: np.ndarray,
+        mismatches: np.ndarray
+    ) -> Tuple[gpd.GeoDataFrame, List[MatchResult]]:
+        """
+        Write matched ROR attributes onto segments and build match results.
+
+        Args:
+            segments: GeoDataFrame of segments (modified in place)
+            row_ind: Matched segment positions
+            col_ind: Matched ROR record positions (parallel to row_ind)
+            mismatches: Area mismatch for each matched pair
+
+        Returns:
+            Tuple of (segments with ROR info, list of match results)
+        """
+        n_segments = len(segments)
+        seg_areas = np.asarray(segments.geometry.area, dtype=float)
+        row_ind = np.asarray(row_ind, dtype=int)
+        col_ind = np.asarray(col_ind, dtype=int)
+
+        matched_ror = [self.ror_records[j] for j in col_ind]
+        ror_area_values = [ror.get('expected_area_sqm', 0) for ror in matched_ror]
+
+        def column(values) -> pd.Series:
+            col = np.full(n_segments, None, dtype=object)
+            if len(row_ind):
+                col[row_ind] = values
+            return pd.Series(col, index=segments.index, dtype=object)
+
+        # Bulk column assignment (object columns, as before)
+        segments['ror_survey_no'] = column([ror.get('survey_no') for ror in matched_ror])
+        segments['ror_area_sqm'] = column(ror_area_values)
+        segments['ror_owner'] = column([ror.get('owner') for ror in matched_ror])
+        segments['ror_land_type'] = column([ror.get('land_type') for ror in matched_ror])
+        segments['area_mismatch'] = column(list(mismatches))
+
+        is_matched = np.zeros(n_segments, dtype=bool)
+        is_matched[row_ind] = True
+        segments['is_matched'] = is_matched
+
+        match_results = [
+            MatchResult(
+                segment_id=int(i),
+                ror_survey_no=ror.get('survey_no'),
+                ror_area_sqm=ror_area,
+                generated_area_sqm=float(seg_areas[i]),
+                area_mismatch=mismatch,
+                match_confidence=1.0 - min(mismatch, 1.0)
+            )
+            for i, ror, ror_area, mismatch in zip(row_ind, matched_ror, ror_area_values, mismatches)
+        ]
 
         # Handle unmatched segments
-        for i in range(n_segments):
-            if not segments.iloc[i]['is_matched']:
-                match_results.append(MatchResult(
-                    segment_id=i,
-                    ror_survey_no=None,
-                    ror_area_sqm=None,
-                    generated_area_sqm=segments.iloc[i].geometry.area,
-                    area_mismatch=1.0,
-                    match_confidence=0.0
-                ))
+        for i in np.flatnonzero(~is_matched):
+            match_results.append(MatchResult(
+                segment_id=int(i),
+                ror_survey_no=None,
+                ror_area_sqm=None,
+                generated_area_sqm=float(seg_areas[i]),
+                area_mismatch=1.0,
+                match_confidence=0.0
+            ))
 
         return segments, match_results
 
@@ -413,12 +702,13 @@ class RORConstraintEngine:
         return stats
 
 
-def create_constraint_engine(ror_data: pd.DataFrame) -> RORConstraintEngine:
+def create_constraint_engine(ror_data: pd.DataFrame, **kwargs) -> RORConstraintEngine:
     """
     Create constraint engine from ROR DataFrame.
 
     Args:
         ror_data: DataFrame from RORLoader
+        **kwargs: Passed to RORConstraintEngine (e.g. solver='sparse')
 
     Returns:
         RORConstraintEngine instance
@@ -432,4 +722,4 @@ def create_constraint_engine(ror_data: pd.DataFrame) -> RORConstraintEngine:
             'owner': row.get('owner_name', 'Unknown')
         })
 
-    return RORConstraintEngine(records)
+    return RORConstraintEngine(records, **kwargs)
@@ -5,26 +5,92 @@ Uses Meta's Segment Anything Model (SAM) to detect land parcel boundaries
 from drone imagery.
 """
 
+import heapq
 import os
 import numpy as np
 import torch
 from pathlib import Path
-from typing import List, Tuple, Optional, Dict, Any
+from typing import List, Tuple, Optional, Dict, Any, Union
 from dataclasses import dataclass
 import cv2
 
 # SAM imports
 try:
     from segment_anything import sam_model_registry, SamAutomaticMaskGenerator, SamPredictor
+    from segment_anything.utils.amg import (
+        MaskData,
+        area_from_rle,
+        batch_iterator,
+        box_xyxy_to_xywh,
+        rle_to_mask,
+    )
+    from torchvision.ops.boxes import batched_nms
     SAM_AVAILABLE = True
 except ImportError:
     SAM_AVAILABLE = False
     print("Warning: segment_anything not installed. Run: pip install segment-anything")
 
+from shapely import STRtree
 from shapely.geometry import Polygon, MultiPolygon
 from shapely.ops import unary_union
 import geopandas as gpd
 
+from .embedding_cache import EmbeddingCache, model_fingerprint
+from .planar_topology import simplify_shared_boundaries
+from .profiling import StageProfiler
+
+
+@dataclass
+class CompactMask:
+    """
+    Run-length encoded binary mask, cropped to its bounding box.
+
+    A parcel mask is mostly background, so storing only the bbox crop as
+    alternating background/foreground run lengths takes a few KB instead
+    of a full tile-sized uint8 array.
+    """
+    shape: Tuple[int, int]            # Full mask shape (H, W)
+    bbox: Tuple[int, int, int, int]   # Crop box (x, y, w, h)
+    runs: np.ndarray                  # Run lengths, starting with background
+
+    @classmethod
+    def from_mask(cls, mask: np.ndarray) -> 'CompactMask':
+        """Encode a binary mask."""
+        mask = mask.astype(bool)
+        rows = np.flatnonzero(mask.any(axis=1))
+        cols = np.flatnonzero(mask.any(axis=0))
+
+        if len(rows) == 0:
+            return cls(shape=mask.shape, bbox=(0, 0, 0, 0), runs=np.zeros(0, dtype=np.uint32))
+
+        x, y = int(cols[0]), int(rows[0])
+        w, h = int(cols[-1]) - x + 1, int(rows[-1]) - y + 1
+        flat = mask[y:y + h, x:x + w].ravel()
+
+        # Run boundaries wherever the value changes
+        changes = np.flatnonzero(flat[1:] != flat[:-1]) + 1
+        bounds = np.concatenate(([0], changes, [flat.size]))
+        runs = np.diff(bounds)
+        if flat[0]:
+            runs = np.concatenate(([0], runs))
+
+        return cls(shape=mask.shape, bbox=(x, y, w, h), runs=runs.astype(np.uint32))
+
+    def decode(self) -> np.ndarray:
+        """Decode to a full-size uint8 mask."""
+        mask = np.zeros(self.shape, dtype=np.uint8)
+        x, y, w, h = self.bbox
+        if w == 0 or h == 0:
+            return mask
+
+        values = (np.arange(len(self.runs)) % 2).astype(np.uint8)
+        mask[y:y + h, x:x + w] = np.repeat(values, self.runs).reshape(h, w)
+        return mask
+
+    @property
+    def nbytes(self) -> int:
+        return self.runs.nbytes
+
 
 @dataclass
 class DetectedParcel:
@@ -35,7 +101,14 @@ class DetectedParcel:
     area_sqm: float          # Area in square meters
     confidence: float        # Detection confidence (0-1)
     bbox: Tuple[int, int, int, int]  # Bounding box (x, y, w, h)
-    mask: Optional[np.ndarray] = None  # Binary mask
+    mask: Optional[Union[np.ndarray, CompactMask]] = None  # Binary mask
+    tile_id: Optional[Tuple[int, int]] = None  # Source tile (row_idx, col_idx)
+
+    def get_mask(self) -> Optional[np.ndarray]:
+        """Get the binary mask, decoding a compact mask on demand."""
+        if isinstance(self.mask, CompactMask):
+            return self.mask.decode()
+        return self.mask
 
 
 class SAMSegmenter:
@@ -59,6 +132,8 @@ class SAMSegmenter:
         max_area: int = 1000000,      # Maximum parcel area in pixels
         stability_score_thresh: float = 0.85,
         pred_iou_thresh: float = 0.80,
+        embedding_cache: Optional[EmbeddingCache] = None,
+        profiler: Optional[StageProfiler] = None,
     ):
         """
         Initialize SAM segmenter.
@@ -71,6 +146,8 @@ class SAMSegmenter:
             max_area: Maximum parcel area in pixels to keep
             stability_score_thresh: SAM stability threshold
             pred_iou_thresh: SAM IoU threshold
+            embedding_cache: Optional on-disk cache of image embeddings
+            profiler: Optional stage profiler for encoder/decoder timings
         """
         if not SAM_AVAILABLE:
             raise ImportError("segment_anything not installed")
@@ -80,6 +157,8 @@ class SAMSegmenter:
         self.max_area = max_area
         self.stability_score_thresh = stability_score_thresh
         self.pred_iou_thresh = pred_iou_thresh
+        self.embedding_cache = embedding_cache
+        self.profiler = profiler or StageProfiler(enabled=False)
 
         # Set device
         if device is None:
@@ -91,6 +170,7 @@ class SAMSegmenter:
 
         # Load model
         self.checkpoint_path = self._get_checkpoint(checkpoint_path)
+        self.model_id = model_fingerprint(self.model_type, self.checkpoint_path)
         self._load_model()
 
     def _get_checkpoint(self, checkpoint_path: Optional[str]) -> Path:
@@ -155,20 +235,176 @@ class SAMSegmenter:
         Returns:
             List of mask dictionaries from SAM
         """
-        # Ensure correct format
+        image = self._to_uint8(image)
+
+        if self.embedding_cache is None:
+            # Run SAM
+            with self.profiler.stage('sam'):
+                masks = self.mask_generator.generate(image)
+            return self._filter_by_area(masks)
+
+        # Cached path: reuse or compute the embedding, then decode the point grid
+        with self.profiler.stage('sam_encoder'):
+            features, input_size = self.embedding_cache.get_or_encode(
+                self.mask_generator.predictor, image, self.model_id
+            )
+
+        with self.profiler.stage('mask_decoder'):
+            masks = self._generate_from_embedding(image, features, input_size)
+
+        return self._filter_by_area(masks)
+
+    def segment_batch(self, tiles: List[np.ndarray]) -> List[List[Dict[str, Any]]]:
+        """
+        Segment several tiles with a single batched image-encoder pass.
+
+        The ViT encoder dominates SAM runtime, so encoding N tiles together
+        amortises its cost. Each tile's point grid is then decoded from its
+        own embedding in batches of ``points_per_batch`` prompts, using the
+        same filtering, NMS and small-region cleanup as ``segment_image``.
+
+        Args:
+            tiles: List of RGB image arrays (H, W, 3). Edge tiles may be smaller.
+
+        Returns:
+            One list of mask dictionaries per input tile, in input order
+        """
+        if not tiles:
+            return []
+
+        images = [self._to_uint8(tile) for tile in tiles]
+        embeddings = [None] * len(images)
+
+        # Reuse cached embeddings; only encode the misses
+        keys = [None] * len(images)
+        if self.embedding_cache is not None:
+            transform = self.mask_generator.predictor.transform
+            for i, image in enumerate(images):
+                keys[i] = self.embedding_cache.make_key(image, self.model_id)
+                cached = self.embedding_cache.get(keys[i])
+                if cached is not None:
+                    input_size = transform.get_preprocess_shape(
+                        image.shape[0], image.shape[1], transform.target_length
+                    )
+                    features = torch.from_numpy(np.asarray(cached)).to(self.device)
+                    embeddings[i] = (features, input_size)
+
+        to_encode = [i for i, emb in enumerate(embeddings) if emb is None]
+        if to_encode:
+            with self.profiler.stage('sam_encoder'):
+                features, input_sizes = self._encode_batch([images[i] for i in to_encode])
+            for j, i in enumerate(to_encode):
+                embeddings[i] = (features[j:j + 1], input_sizes[j])
+                if self.embedding_cache is not None:
+                    self.embedding_cache.put(keys[i], features[j:j + 1].cpu().numpy())
+
+        results = []
+        for image, (features, input_size) in zip(images, embeddings):
+            with self.profiler.stage('mask_decoder'):
+                masks = self._generate_from_embedding(image, features, input_size)
+            results.append(self._filter_by_area(masks))
+
+        return results
+
+    @torch.no_grad()
+    def _encode_batch(self, images: List[np.ndarray]) -> Tuple[torch.Tensor, List[Tuple[int, int]]]:
+        """Run the SAM image encoder over a batch of images."""
+        transform = self.mask_generator.predictor.transform
+
+        inputs = []
+        input_sizes = []
+        for image in images:
+            resized = transform.apply_image(image)
+            tensor = torch.as_tensor(resized, device=self.device)
+            tensor = tensor.permute(2, 0, 1).contiguous()
+            input_sizes.append(tuple(tensor.shape[-2:]))
+            # preprocess normalises and pads to the encoder's square input size
+            inputs.append(self.sam.preprocess(tensor[None, :, :, :]))
+
+        features = self.sam.image_encoder(torch.cat(inputs, dim=0))
+        return features, input_sizes
+
+    @torch.no_grad()
+    def _generate_from_embedding(
+        self,
+        image: np.ndarray,
+        features: torch.Tensor,
+        input_size: Tuple[int, int]
+    ) -> List[Dict[str, Any]]:
+        """
+        Equivalent of ``SamAutomaticMaskGenerator.generate`` for a single
+        full-image crop, using a precomputed image embedding.
+
+        Only the embedding cache and ``segment_batch`` use this; it relies on
+        segment-anything internals, hence the pinned version in
+        requirements-gpu.txt.
+        """
+        generator = self.mask_generator
+        predictor = generator.predictor
+        orig_size = image.shape[:2]
+        crop_box = [0, 0, orig_size[1], orig_size[0]]
+
+        # Install the embedding as if set_image() had just run
+        predictor.reset_image()
+        predictor.original_size = orig_size
+        predictor.input_size = input_size
+        predictor.features = features
+        predictor.is_image_set = True
+
+        points_scale = np.array(orig_size)[None, ::-1]
+        points_for_image = generator.point_grids[0] * points_scale
+
+        data = MaskData()
+        for (points,) in batch_iterator(generator.points_per_batch, points_for_image):
+            batch_data = generator._process_batch(points, orig_size, crop_box, orig_size)
+            data.cat(batch_data)
+            del batch_data
+        predictor.reset_image()
+
+        keep_by_nms = batched_nms(
+            data["boxes"].float(),
+            data["iou_preds"],
+            torch.zeros_like(data["boxes"][:, 0]),
+            iou_threshold=generator.box_nms_thresh,
+        )
+        data.filter(keep_by_nms)
+        data["crop_boxes"] = torch.tensor([crop_box for _ in range(len(data["rles"]))])
+        data.to_numpy()
+
+        if generator.min_mask_region_area > 0:
+            data = generator.postprocess_small_regions(
+                data,
+                generator.min_mask_region_area,
+                max(generator.box_nms_thresh, generator.crop_nms_thresh),
+            )
+
+        masks = []
+        for idx, rle in enumerate(data["rles"]):
+            masks.append({
+                'segmentation': rle_to_mask(rle),
+                'area': area_from_rle(rle),
+                'bbox': box_xyxy_to_xywh(data["boxes"][idx]).tolist(),
+                'predicted_iou': data["iou_preds"][idx].item(),
+                'point_coords': [data["points"][idx].tolist()],
+                'stability_score': data["stability_score"][idx].item(),
+                'crop_box': box_xyxy_to_xywh(data["crop_boxes"][idx]).tolist(),
+            })
+
+        return masks
+
+    def _to_uint8(self, image: np.ndarray) -> np.ndarray:
+        """Ensure image is uint8 as expected by SAM."""
         if image.dtype != np.uint8:
             image = (image * 255).astype(np.uint8) if image.max() <= 1 else image.astype(np.uint8)
+        return image
 
-        # Run SAM
-        masks = self.mask_generator.generate(image)
-
-        # Filter by area
+    def _filter_by_area(self, masks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Keep masks within the configured parcel area range."""
         filtered_masks = []
         for mask in masks:
             area = mask['area']
             if self.min_area <= area <= self.max_area:
                 filtered_masks.append(mask)
-
         return filtered_masks
 
     def segment_with_points(
@@ -188,10 +424,12 @@ class SAMSegmenter:
         Returns:
             List of mask dictionaries
         """
-        if image.dtype != np.uint8:
-            image = (image * 255).astype(np.uint8) if image.max() <= 1 else image.astype(np.uint8)
+        image = self._to_uint8(image)
 
-        self.predictor.set_image(image)
+        if self.embedding_cache is not None:
+            self.embedding_cache.set_image(self.predictor, image, self.model_id)
+        else:
+            self.predictor.set_image(image)
 
         if point_labels is None:
             point_labels = [1] * len(points)  # All foreground
@@ -223,7 +461,10 @@ class SAMSegmenter:
         self,
         masks: List[Dict[str, Any]],
         transform=None,
-        simplify_tolerance: float = 2.0
+        simplify_tolerance: float = 2.0,
+        tile_id: Optional[Tuple[int, int]] = None,
+        mask_format: str = 'full',
+        simplify_mode: str = 'polygon'
     ) -> List[DetectedParcel]:
         """
         Convert SAM masks to polygon geometries.
@@ -232,11 +473,21 @@ class SAMSegmenter:
             masks: List of SAM mask dictionaries
             transform: Rasterio affine transform for geo-coordinates
             simplify_tolerance: Polygon simplification tolerance in pixels
+            tile_id: Source tile index recorded on each parcel
+            mask_format: How to keep each parcel's mask - 'full' (uint8
+                array, as DetectedParcel.mask always was), 'rle' (CompactMask,
+                decoded lazily via DetectedParcel.get_mask) or 'none'
+            simplify_mode: 'polygon' simplifies each outline on its own;
+                'shared' simplifies the tile's outlines together so that
+                boundaries two parcels share are simplified once
 
         Returns:
             List of DetectedParcel objects
         """
-        parcels = []
+        if simplify_mode not in ('polygon', 'shared'):
+            raise ValueError(f"Unknown simplify_mode: {simplify_mode}")
+
+        outlines = []
 
         for mask_dict in masks:
             mask = mask_dict['segmentation'].astype(np.uint8)
@@ -263,9 +514,24 @@ class SAMSegmenter:
             if polygon.is_empty:
                 continue
 
-            # Simplify
-            polygon = polygon.simplify(simplify_tolerance)
+            outlines.append((mask_dict, mask, contour, polygon))
+
+        # Simplify
+        simplified = [polygon.simplify(simplify_tolerance) for _, _, _, polygon in outlines]
+        if simplify_mode == 'shared' and outlines:
+            shared = simplify_shared_boundaries(
+                gpd.GeoDataFrame(geometry=[polygon for _, _, _, polygon in outlines]),
+                simplify_tolerance
+            ).geometry.tolist()
+            # Outlines that do not rebuild cleanly keep the per-polygon result
+            simplified = [
+                s if isinstance(s, Polygon) and s.is_valid else fallback
+                for s, fallback in zip(shared, simplified)
+            ]
 
+        parcels = []
+
+        for (mask_dict, mask, contour, _), polygon in zip(outlines, simplified):
             # Calculate area in pixels
             area_pixels = polygon.area
 
@@ -289,11 +555,22 @@ class SAMSegmenter:
                 area_sqm=area_sqm,
                 confidence=mask_dict.get('predicted_iou', mask_dict.get('stability_score', 0.5)),
                 bbox=(x, y, w, h),
-                mask=mask if mask.sum() < 1000000 else None  # Don't store huge masks
+                mask=self._store_mask(mask, mask_format),
+                tile_id=tile_id
             ))
 
         return parcels
 
+    def _store_mask(self, mask: np.ndarray, mask_format: str):
+        """Keep a parcel mask in the requested representation."""
+        if mask_format == 'none':
+            return None
+        if mask_format == 'rle':
+            return CompactMask.from_mask(mask)
+        if mask_format == 'full':
+            return mask if mask.sum() < 1000000 else None  # Don't store huge masks
+        raise ValueError(f"Unknown mask_format: {mask_format}")
+
 
 def merge_overlapping_parcels(
     parcels: List[DetectedParcel],
@@ -302,6 +579,11 @@ def merge_overlapping_parcels(
     """
     Merge parcels that significantly overlap.
 
+    Parcels are visited largest first; each one absorbs every later parcel
+    whose overlap with the growing merged polygon exceeds the threshold.
+    Candidates come from an STRtree query instead of a scan over all
+    later parcels, so only spatially intersecting pairs are examined.
+
     Args:
         parcels: List of detected parcels
         overlap_threshold: IoU threshold for merging
@@ -314,31 +596,46 @@ def merge_overlapping_parcels(
 
     # Sort by area (largest first)
     parcels = sorted(parcels, key=lambda p: p.area_pixels, reverse=True)
+    geoms = np.array([p.geo_polygon for p in parcels], dtype=object)
+    tree = STRtree(geoms)
 
     merged = []
-    used = set()
+    used = np.zeros(len(parcels), dtype=bool)
 
     for i, p1 in enumerate(parcels):
-        if i in used:
+        if used[i]:
             continue
 
         current_polygon = p1.geo_polygon
         current_confidence = p1.confidence
 
-        for j, p2 in enumerate(parcels[i+1:], start=i+1):
-            if j in used:
-                continue
-
-            # Check overlap
-            if current_polygon.intersects(p2.geo_polygon):
-                intersection = current_polygon.intersection(p2.geo_polygon)
-                iou = intersection.area / min(current_polygon.area, p2.geo_polygon.area)
-
-                if iou > overlap_threshold:
-                    # Merge
-                    current_polygon = unary_union([current_polygon, p2.geo_polygon])
-                    current_confidence = max(current_confidence, p2.confidence)
-                    used.add(j)
+        # Later parcels intersecting the current polygon, visited in order.
+        # The polygon only grows, so after each merge we re-query and add
+        # newly reachable parcels beyond the current position.
+        queued = set()
+        heap = []
+
+        def enqueue(after: int):
+            for j in tree.query(current_polygon, predicate='intersects'):
+                j = int(j)
+                if j > after and not used[j] and j not in queued:
+                    queued.add(j)
+                    heapq.heappush(heap, j)
+
+        enqueue(i)
+        while heap:
+            j = heapq.heappop(heap)
+            p2 = parcels[j]
+
+            intersection = current_polygon.intersection(p2.geo_polygon)
+            iou = intersection.area / min(current_polygon.area, p2.geo_polygon.area)
+
+            if iou > overlap_threshold:
+                # Merge
+                current_polygon = unary_union([current_polygon, p2.geo_polygon])
+                current_confidence = max(current_confidence, p2.confidence)
+                used[j] = True
+                enqueue(j)
 
         merged.append(DetectedParcel(
             polygon=current_polygon,  # Will be in geo coords
@@ -347,26 +644,32 @@ def merge_overlapping_parcels(
             area_sqm=current_polygon.area,
             confidence=current_confidence,
             bbox=(0, 0, 0, 0),
-            mask=None
+            mask=None,
+            tile_id=p1.tile_id
         ))
-        used.add(i)
+        used[i] = True
 
     return merged
 
 
-def parcels_to_geodataframe(parcels: List[DetectedParcel], crs: str = None) -> gpd.GeoDataFrame:
+def parcels_to_geodataframe(
+    parcels: List[DetectedParcel],
+    crs: str = None,
+    start_index: int = 0
+) -> gpd.GeoDataFrame:
     """
     Convert list of detected parcels to GeoDataFrame.
 
     Args:
         parcels: List of DetectedParcel objects
         crs: Coordinate reference system
+        start_index: Offset for parcel IDs (when converting in batches)
 
     Returns:
         GeoDataFrame with parcel geometries
     """
     data = []
-    for i, parcel in enumerate(parcels):
+    for i, parcel in enumerate(parcels, start=start_index):
         data.append({
             'parcel_id': f'P{i+1:04d}',
             'area_sqm': parcel.area_sqm,
@@ -375,5 +678,14 @@ def parcels_to_geodataframe(parcels: List[DetectedParcel], crs: str = None) -> g
             'geometry': parcel.geo_polygon
         })
 
+    if not data:
+        # Keep the parcel schema so empty results still export and summarize
+        return gpd.GeoDataFrame(
+            data,
+            columns=['parcel_id', 'area_sqm', 'area_acres', 'confidence', 'geometry'],
+            geometry='geometry',
+            crs=crs
+        ).astype({'area_sqm': float, 'area_acres': float, 'confidence': float})
+
     gdf = gpd.GeoDataFrame(data, crs=crs)
     return gdf
@@ -0,0 +1,162 @@
+"""
+Seam-Aware Cross-Tile Merging
+
+Tiles from ORILoader overlap by ``tile_overlap`` pixels, so a parcel can
+only be detected twice if it lies in the overlap strip between adjacent
+tiles. Instead of merging every raw parcel against every other one, this
+module:
+
+1. Merges each tile's own overlapping masks locally
+2. Passes interior parcels (outside every overlap strip) straight through
+3. Reconciles seam parcels only with seam parcels from adjacent tiles
+
+Tiles can be added as they finish, and parcels are released once every
+tile they reach into has been processed. Merging therefore streams
+alongside segmentation in near-linear time.
+
+Results can differ from the global ``merge_overlapping_parcels``, which
+visits every raw parcel largest first and so depends on the order of
+parcels from unrelated tiles. Here duplicates are reconciled within one
+tile first and then only across the seams they touch.
+"""
+
+from typing import Dict, Iterable, List, Set, Tuple
+
+import numpy as np
+from shapely import STRtree
+from shapely.geometry import box
+
+from .image_loader import ORILoader
+from .sam_segmenter import DetectedParcel, merge_overlapping_parcels
+
+
+TileId = Tuple[int, int]
+
+
+class SeamMerger:
+    """
+    Incrementally merge per-tile parcels across tile seams.
+
+    Usage:
+        merger = SeamMerger(loader)
+        for tile in tiles:
+            finalized.extend(merger.add_tile(tile.tile_id, parcels))
+        finalized.extend(merger.flush())
+    """
+
+    def __init__(self, loader: ORILoader, overlap_threshold: float = 0.5):
+        """
+        Initialize the merger.
+
+        Args:
+            loader: Loader that produced the tiles (defines tile footprints)
+            overlap_threshold: IoU threshold for merging, as in
+                ``merge_overlapping_parcels``
+        """
+        self.overlap_threshold = overlap_threshold
+
+        self._tile_ids: List[TileId] = loader.tile_indices()
+        self._footprints = np.array(
+            [box(*loader.tile_bounds(r, c)) for r, c in self._tile_ids],
+            dtype=object
+        )
+        self._tile_tree = STRtree(self._footprints)
+
+        self._completed: Set[TileId] = set()
+        self._pending: Dict[int, Tuple[DetectedParcel, Set[TileId]]] = {}
+        self._by_tile: Dict[TileId, Set[int]] = {}
+        self._next_id = 0
+
+        self.stats = {'interior': 0, 'seam': 0}
+
+    def _tiles_reached(self, parcel: DetectedParcel) -> Set[TileId]:
+        """Tiles whose footprint a parcel intersects."""
+        hits = self._tile_tree.query(parcel.geo_polygon, predicate='intersects')
+        reached = {self._tile_ids[i] for i in hits}
+        if parcel.tile_id is not None:
+            reached.add(parcel.tile_id)
+        return reached
+
+    def _add_pending(self, parcel: DetectedParcel, reached: Set[TileId]):
+        pid = self._next_id
+        self._next_id += 1
+        self._pending[pid] = (parcel, reached)
+        for tile_id in reached:
+            self._by_tile.setdefault(tile_id, set()).add(pid)
+
+    def _remove_pending(self, pid: int) -> DetectedParcel:
+        parcel, reached = self._pending.pop(pid)
+        for tile_id in reached:
+            self._by_tile[tile_id].discard(pid)
+        return parcel
+
+    def add_tile(
+        self,
+        tile_id: TileId,
+        parcels: Iterable[DetectedParcel]
+    ) -> List[DetectedParcel]:
+        """
+        Add a finished tile's parcels.
+
+        Args:
+            tile_id: (row_idx, col_idx) of the tile
+            parcels: Parcels detected in that tile
+
+        Returns:
+            Parcels that are now final (no unprocessed tile can affect them)
+        """
+        parcels = list(parcels)
+        for parcel in parcels:
+            parcel.tile_id = tile_id
+
+        # Same-tile duplicates (e.g. nested SAM masks)
+        local = merge_overlapping_parcels(parcels, self.overlap_threshold)
+
+        finalized = []
+        seam = []
+        for parcel in local:
+            reached = self._tiles_reached(parcel)
+            if len(reached) == 1:
+                finalized.append(parcel)
+            else:
+                seam.append(parcel)
+
+        self.stats['interior'] += len(finalized)
+        self.stats['seam'] += len(seam)
+
+        # Reconcile with pending seam parcels from neighbours that reach here
+        neighbour_ids = [
+            pid for pid in self._by_tile.get(tile_id, ())
+            if self._pending[pid][0].tile_id != tile_id
+        ]
+        if neighbour_ids and seam:
+            group = [self._remove_pending(pid) for pid in sorted(neighbour_ids)] + seam
+            seam = merge_overlapping_parcels(group, self.overlap_threshold)
+
+        for parcel in seam:
+            self._add_pending(parcel, self._tiles_reached(parcel))
+
+        self._completed.add(tile_id)
+
+        # Release seam parcels whose every reached tile is done
+        for pid in sorted(self._by_tile.get(tile_id, ())):
+            parcel, reached = self._pending[pid]
+            if reached <= self._completed:
+                finalized.append(self._remove_pending(pid))
+
+        return finalized
+
+    def flush(self) -> List[DetectedParcel]:
+        """
+        Release all pending parcels.
+
+        Call after the last tile, or when stopping early (e.g. ``max_tiles``)
+        with neighbouring tiles left unprocessed.
+        """
+        finalized = [self._remove_pending(pid) for pid in sorted(self._pending)]
+        return finalized
+
+    @property
+    def pending_count(self) -> int:
+        """Number of seam parcels waiting on unprocessed tiles."""
+        return len(self._pending)
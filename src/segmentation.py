@@ -25,6 +25,8 @@ from scipy.optimize import linear_sum_assignment
 from scipy.ndimage import label as ndimage_label
 from skimage import measure
 
+from .embedding_cache import EmbeddingCache, model_fingerprint
+
 
 class ParcelSegmenter:
     """
@@ -513,6 +515,7 @@ class RORGuidedSegmenter:
         use_area_filtering: bool = True,
         use_iterative_refinement: bool = True,
         use_hungarian_matching: bool = True,
+        embedding_cache: Optional[EmbeddingCache] = None,
     ):
         """
         Initialize ROR-Guided Segmenter.
@@ -529,6 +532,10 @@ class RORGuidedSegmenter:
             use_area_filtering: Filter candidates by ROR area constraints
             use_iterative_refinement: Enable refinement loop for poor matches
             use_hungarian_matching: Optimal matching vs greedy nearest-neighbor
+
+        Performance:
+            embedding_cache: Optional on-disk cache of SAM image embeddings,
+                shared across configurations that segment the same tile
         """
         self.model_type = model_type
         self.device = device
@@ -542,6 +549,9 @@ class RORGuidedSegmenter:
         self.use_iterative_refinement = use_iterative_refinement
         self.use_hungarian_matching = use_hungarian_matching
 
+        self.embedding_cache = embedding_cache
+        self.model_id = None
+
         self.sam = None
         self.predictor = None
         self._initialized = False
@@ -576,6 +586,8 @@ class RORGuidedSegmenter:
 
             self.sam = sam
             self.predictor = SamPredictor(sam)
+            if self.embedding_cache is not None:
+                self.model_id = model_fingerprint(self.model_type, checkpoint_path)
             self._initialized = True
 
         except ImportError:
@@ -881,7 +893,10 @@ class RORGuidedSegmenter:
 
         if hasattr(self, 'predictor') and self.predictor is not None:
             # Use native SAM predictor
-            self.predictor.set_image(image)
+            if self.embedding_cache is not None:
+                self.embedding_cache.set_image(self.predictor, image, self.model_id)
+            else:
+                self.predictor.set_image(image)
 
             for i, (x, y) in enumerate(points):
                 # Convert geo coords to pixel coords
@@ -0,0 +1,180 @@
+"""
+Per-Tile Result Journal
+
+Records each tile's vectorized parcels in a SQLite database as soon as the
+tile finishes. A restarted village run skips tiles already in the journal
+and only re-runs merging and ROR matching. Changing merge or matching
+thresholds therefore never requires re-segmenting.
+
+Entries are keyed by tile index plus a hash of the image file (path,
+size and modification time) and the settings that affect segmentation
+output, so a journal is never reused across incompatible runs or a
+re-processed ORI. Masks are not journaled, so journaling requires
+``parcel_mask_format='none'``.
+"""
+
+import hashlib
+import json
+import sqlite3
+from dataclasses import asdict
+from pathlib import Path
+from typing import Dict, List, Set, Tuple
+
+import shapely
+
+from .sam_segmenter import DetectedParcel
+
+
+TileId = Tuple[int, int]
+
+# PipelineConfig fields that change what a tile segments to
+SEGMENTATION_FIELDS = (
+    'tile_size',
+    'tile_overlap',
+    'sam_model',
+    'min_parcel_area_pixels',
+    'max_parcel_area_pixels',
+    'stability_threshold',
+    'iou_threshold',
+    'simplify_tolerance',
+    'simplify_mode',
+)
+
+
+def segmentation_config_hash(config, metadata: Dict) -> str:
+    """
+    Hash the image and the config fields that affect per-tile results.
+
+    Args:
+        config: PipelineConfig
+        metadata: Image metadata from ``ORILoader.get_metadata``
+
+    Returns:
+        Short hex digest
+    """
+    config_dict = asdict(config)
+    key = {field: config_dict[field] for field in SEGMENTATION_FIELDS}
+    path = Path(metadata['path']).resolve()
+    stat = path.stat()
+    # Size and mtime catch an ORI replaced in place by a re-flown image
+    key['image'] = {
+        'path': str(path),
+        'width': metadata['width'],
+        'height': metadata['height'],
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+    }
+    payload = json.dumps(key, sort_keys=True).encode()
+    return hashlib.sha256(payload).hexdigest()[:16]
+
+
+class TileJournal:
+    """
+    SQLite journal of per-tile segmentation results.
+
+    Each tile is written in one transaction together with its completion
+    marker. A crash mid-write therefore never leaves a half-recorded tile.
+    """
+
+    def __init__(self, path: str, config_hash: str):
+        """
+        Open (or create) a journal.
+
+        Args:
+            path: SQLite database path
+            config_hash: Hash from ``segmentation_config_hash``
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.config_hash = config_hash
+
+        self.conn = sqlite3.connect(str(self.path))
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS tiles (
+                config_hash TEXT NOT NULL,
+                tile_row INTEGER NOT NULL,
+                tile_col INTEGER NOT NULL,
+                n_parcels INTEGER NOT NULL,
+                PRIMARY KEY (config_hash, tile_row, tile_col)
+            );
+            CREATE TABLE IF NOT EXISTS parcels (
+                config_hash TEXT NOT NULL,
+                tile_row INTEGER NOT NULL,
+                tile_col INTEGER NOT NULL,
+                idx INTEGER NOT NULL,
+                polygon BLOB NOT NULL,
+                geo_polygon BLOB NOT NULL,
+                area_pixels REAL,
+                area_sqm REAL,
+                confidence REAL,
+                bbox_x INTEGER, bbox_y INTEGER, bbox_w INTEGER, bbox_h INTEGER,
+                PRIMARY KEY (config_hash, tile_row, tile_col, idx)
+            );
+        """)
+        self.conn.commit()
+
+    def completed_tiles(self) -> Set[TileId]:
+        """Tiles already recorded for this config."""
+        rows = self.conn.execute(
+            "SELECT tile_row, tile_col FROM tiles WHERE config_hash = ?",
+            (self.config_hash,)
+        )
+        return {(r, c) for r, c in rows}
+
+    def record(self, tile_id: TileId, parcels: List[DetectedParcel]):
+        """Store a finished tile's parcels (masks are not stored)."""
+        row, col = tile_id
+        polygons = shapely.to_wkb([p.polygon for p in parcels])
+        geo_polygons = shapely.to_wkb([p.geo_polygon for p in parcels])
+
+        with self.conn:
+            self.conn.execute(
+                "DELETE FROM parcels WHERE config_hash = ? AND tile_row = ? AND tile_col = ?",
+                (self.config_hash, row, col)
+            )
+            self.conn.executemany(
+                "INSERT INTO parcels VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (self.config_hash, row, col, i, polygons[i], geo_polygons[i],
+                     float(p.area_pixels), float(p.area_sqm), float(p.confidence),
+                     *(int(v) for v in p.bbox))
+                    for i, p in enumerate(parcels)
+                ]
+            )
+            self.conn.execute(
+                "INSERT OR REPLACE INTO tiles VALUES (?, ?, ?, ?)",
+                (self.config_hash, row, col, len(parcels))
+            )
+
+    def load(self, tile_id: TileId) -> List[DetectedParcel]:
+        """Load a recorded tile's parcels."""
+        row, col = tile_id
+        rows = self.conn.execute(
+            "SELECT polygon, geo_polygon, area_pixels, area_sqm, confidence, "
+            "bbox_x, bbox_y, bbox_w, bbox_h FROM parcels "
+            "WHERE config_hash = ? AND tile_row = ? AND tile_col = ? ORDER BY idx",
+            (self.config_hash, row, col)
+        ).fetchall()
+
+        if not rows:
+            return []
+
+        polygons = shapely.from_wkb([r[0] for r in rows])
+        geo_polygons = shapely.from_wkb([r[1] for r in rows])
+
+        return [
+            DetectedParcel(
+                polygon=polygons[i],
+                geo_polygon=geo_polygons[i],
+                area_pixels=r[2],
+                area_sqm=r[3],
+                confidence=r[4],
+                bbox=(r[5], r[6], r[7], r[8]),
+                mask=None,
+                tile_id=tile_id
+            )
+            for i, r in enumerate(rows)
+        ]
+
+    def close(self):
+        self.conn.close()
@@ -13,6 +13,7 @@ from dataclasses import dataclass
 
 import numpy as np
 import geopandas as gpd
+import shapely
 from shapely.geometry import Polygon, MultiPolygon, LineString, Point
 from shapely.ops import unary_union, polygonize
 from shapely.validation import make_valid
@@ -46,7 +47,8 @@ class TopologyFixer:
         gap_threshold: float = 10.0,
         overlap_threshold: float = 1.0,
         sliver_threshold: float = 0.1,
-        min_area: float = 10.0
+        min_area: float = 10.0,
+        gap_detection: str = 'hull'
     ):
         """
         Initialize topology fixer.
@@ -56,11 +58,19 @@ class TopologyFixer:
             overlap_threshold: Maximum overlap area to resolve (sqm)
             sliver_threshold: Ratio threshold for sliver detection (area/perimeter^2)
             min_area: Minimum valid parcel area (sqm)
+            gap_detection: How validate() finds gaps: 'hull' (convex hull
+                minus parcels, includes bays along the village edge) or
+                'faces' (enclosed faces of the noded boundary network, see
+                build_faces)
         """
+        if gap_detection not in ('hull', 'faces'):
+            raise ValueError(f"Unknown gap_detection: {gap_detection}. Use 'hull' or 'faces'")
+
         self.gap_threshold = gap_threshold
         self.overlap_threshold = overlap_threshold
         self.sliver_threshold = sliver_threshold
         self.min_area = min_area
+        self.gap_detection = gap_detection
 
     def fix_topology(
         self,
@@ -125,7 +135,7 @@ class TopologyFixer:
         gdf = gdf[~gdf.geometry.is_empty & gdf.geometry.notna()]
 
         # Handle MultiPolygons - keep only the largest part
-        multi_mask = gdf.geometry.type == 'MultiPolygon'
+        multi_mask = gdf.geometry.geom_type == 'MultiPolygon'
         if multi_mask.any():
             gdf.loc[multi_mask, 'geometry'] = gdf.loc[multi_mask, 'geometry'].apply(
                 lambda mp: max(mp.geoms, key=lambda g: g.area) if mp else None
@@ -134,86 +144,126 @@ class TopologyFixer:
         return gdf
 
     def _remove_slivers(self, gdf: gpd.GeoDataFrame) -> gpd.GeoDataFrame:
-        """Remove sliver polygons (thin fragments)."""
+        """
+        Remove sliver polygons (thin fragments).
+
+        Each sliver is merged into the largest non-sliver parcel it touches.
+        Sliver/neighbour pairs come from one spatial-index query, and every
+        receiving parcel is unioned with all of its slivers at once.
+        """
         gdf = gdf.copy()
+        geoms = gdf.geometry.to_numpy()
 
-        def is_sliver(geom):
-            if geom is None or geom.is_empty:
-                return True
-            area = geom.area
-            perimeter = geom.length
-            if perimeter == 0:
-                return True
-            # Isoperimetric quotient - slivers have low values
+        # Isoperimetric quotient - slivers have low values
+        area = shapely.area(geoms)
+        perimeter = shapely.length(geoms)
+        with np.errstate(divide='ignore', invalid='ignore'):
             ipq = (4 * np.pi * area) / (perimeter ** 2)
-            return ipq < self.sliver_threshold
 
-        sliver_mask = gdf.geometry.apply(is_sliver)
+        missing = shapely.is_missing(geoms)
+        sliver_mask = (
+            missing | shapely.is_empty(geoms) | (perimeter == 0) | (ipq < self.sliver_threshold)
+        )
 
         # Get non-sliver parcels
         non_slivers = gdf[~sliver_mask].copy()
-        slivers = gdf[sliver_mask]
+        sliver_geoms = geoms[sliver_mask & ~missing]
+
+        if len(sliver_geoms) == 0 or len(non_slivers) == 0:
+            return non_slivers
+
+        sliver_idx, target_idx = non_slivers.sindex.query(sliver_geoms, predicate='touches')
+        if len(sliver_idx) == 0:
+            return non_slivers
+
+        targets = non_slivers.geometry.to_numpy().copy()
+
+        # Largest touching parcel per sliver (ties go to the first one)
+        order = np.lexsort((target_idx, -shapely.area(targets)[target_idx], sliver_idx))
+        sliver_idx, target_idx = sliver_idx[order], target_idx[order]
+        first = np.r_[True, sliver_idx[1:] != sliver_idx[:-1]]
+        sliver_idx, target_idx = sliver_idx[first], target_idx[first]
+
+        # One union per receiving parcel
+        order = np.argsort(target_idx, kind='stable')
+        sliver_idx, target_idx = sliver_idx[order], target_idx[order]
+        receivers, starts = np.unique(target_idx, return_index=True)
+        merged = np.array([
+            shapely.union_all(np.concatenate([targets[[t]], sliver_geoms[group]]))
+            for t, group in zip(receivers, np.split(sliver_idx, starts[1:]))
+        ], dtype=object)
+
+        ok = shapely.is_valid(merged)
+        targets[receivers[ok]] = merged[ok]
+
+        non_slivers[non_slivers.geometry.name] = gpd.GeoSeries(
+            targets, index=non_slivers.index, crs=non_slivers.crs
+        )
+        return non_slivers
 
-        # Merge slivers into adjacent parcels
-        if len(slivers) > 0 and len(non_slivers) > 0:
-            for idx, sliver in slivers.iterrows():
-                if sliver.geometry is None:
-                    continue
+    def _overlap_pairs(
+        self,
+        gdf: gpd.GeoDataFrame
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Find every pair of parcels overlapping by more than overlap_threshold.
 
-                # Find touching parcels
-                touches = non_slivers[non_slivers.geometry.touches(sliver.geometry)]
+        Candidate pairs come from one bulk spatial-index query. "intersects"
+        is used rather than "overlaps" so nested parcels are caught too;
+        pairs that merely touch fall out on the area threshold.
 
-                if len(touches) > 0:
-                    # Merge into largest touching parcel
-                    largest_idx = touches.geometry.area.idxmax()
-                    merged = unary_union([non_slivers.loc[largest_idx, 'geometry'], sliver.geometry])
-                    if merged.is_valid:
-                        non_slivers.loc[largest_idx, 'geometry'] = merged
+        Returns:
+            (positions i, positions j with i < j, intersection geometries,
+            intersection areas), sorted by (i, j)
+        """
+        geoms = gdf.geometry.to_numpy()
+        left, right = gdf.sindex.query(geoms, predicate='intersects')
 
-        return non_slivers
+        keep = left < right
+        left, right = left[keep], right[keep]
+        order = np.lexsort((right, left))
+        left, right = left[order], right[order]
 
-    def _fix_overlaps(self, gdf: gpd.GeoDataFrame) -> gpd.GeoDataFrame:
-        """Fix overlapping parcels by assigning overlap to one parcel."""
-        gdf = gdf.copy()
+        intersections = shapely.intersection(geoms[left], geoms[right])
+        areas = shapely.area(intersections)
 
-        # Build spatial index
-        sindex = gdf.sindex
+        over = areas > self.overlap_threshold
+        return left[over], right[over], intersections[over], areas[over]
 
-        processed = set()
-
-        for idx, parcel in gdf.iterrows():
-            if idx in processed:
-                continue
+    def _fix_overlaps(self, gdf: gpd.GeoDataFrame) -> gpd.GeoDataFrame:
+        """
+        Fix overlapping parcels by assigning overlap to one parcel.
 
-            # Find potential overlaps
-            possible_matches = list(sindex.intersection(parcel.geometry.bounds))
+        Each overlap goes to the larger parcel of the pair. All overlaps a
+        parcel loses are removed from it with a single difference.
+        """
+        gdf = gdf.copy()
+        if len(gdf) < 2:
+            return gdf
 
-            for other_idx in possible_matches:
-                if other_idx <= idx or other_idx in processed:
-                    continue
+        left, right, intersections, _ = self._overlap_pairs(gdf)
+        if len(left) == 0:
+            return gdf
 
-                other = gdf.loc[other_idx]
+        geoms = gdf.geometry.to_numpy().copy()
+        areas = shapely.area(geoms)
 
-                # Check for actual overlap
-                if parcel.geometry.intersects(other.geometry):
-                    intersection = parcel.geometry.intersection(other.geometry)
+        # Assign overlap to larger parcel (ties go to the first one)
+        losers = np.where(areas[left] >= areas[right], right, left)
 
-                    if intersection.area > self.overlap_threshold:
-                        # Assign overlap to larger parcel
-                        if parcel.geometry.area >= other.geometry.area:
-                            # Remove overlap from other
-                            new_other = other.geometry.difference(intersection)
-                            if new_other.is_valid and not new_other.is_empty:
-                                gdf.loc[other_idx, 'geometry'] = new_other
-                        else:
-                            # Remove overlap from current
-                            new_parcel = parcel.geometry.difference(intersection)
-                            if new_parcel.is_valid and not new_parcel.is_empty:
-                                gdf.loc[idx, 'geometry'] = new_parcel
-                                parcel = gdf.loc[idx]  # Update reference
+        order = np.argsort(losers, kind='stable')
+        losers, intersections = losers[order], intersections[order]
+        targets, starts = np.unique(losers, return_index=True)
+        lost = np.array(
+            [shapely.union_all(group) for group in np.split(intersections, starts[1:])],
+            dtype=object
+        )
 
-            processed.add(idx)
+        trimmed = shapely.difference(geoms[targets], lost)
+        ok = shapely.is_valid(trimmed) & ~shapely.is_empty(trimmed)
+        geoms[targets[ok]] = trimmed[ok]
 
+        gdf[gdf.geometry.name] = gpd.GeoSeries(geoms, index=gdf.index, crs=gdf.crs)
         return gdf
 
     def _fill_gaps(self, gdf: gpd.GeoDataFrame) -> gpd.GeoDataFrame:
@@ -241,41 +291,42 @@ class TopologyFixer:
         if gaps.is_empty:
             return gdf
 
-        # Handle MultiPolygon gaps
-        if gaps.type == 'MultiPolygon':
-            gap_polygons = list(gaps.geoms)
-        elif gaps.type == 'Polygon':
-            gap_polygons = [gaps]
-        else:
-            return gdf
+        gap_polygons = shapely.get_parts(gaps)
+        gap_polygons = gap_polygons[shapely.get_type_id(gap_polygons) == 3]  # Polygons only
 
-        # Assign each gap to nearest parcel
-        for gap in gap_polygons:
-            if gap.area > self.gap_threshold:
-                # Gap too large - might be intentional (road, etc.)
-                continue
+        # Gaps too large might be intentional (road, etc.); tiny ones are negligible
+        gap_areas = shapely.area(gap_polygons)
+        gap_polygons = gap_polygons[(gap_areas <= self.gap_threshold) & (gap_areas >= 0.01)]
+        if len(gap_polygons) == 0:
+            return gdf
 
-            if gap.area < 0.01:  # Negligible
+        # Candidate parcels of every gap in one bulk query. Parcels only grow
+        # by absorbing gaps, which touch each other at points at most, so
+        # the candidate sets stay complete as gaps are merged.
+        geoms = gdf.geometry.to_numpy().copy()
+        gap_boundaries = shapely.boundary(gap_polygons)
+        gap_idx, parcel_idx = gdf.sindex.query(gap_polygons, predicate='intersects')
+        order = np.lexsort((parcel_idx, gap_idx))
+        gap_idx, parcel_idx = gap_idx[order], parcel_idx[order]
+        gaps_with_candidates, starts = np.unique(gap_idx, return_index=True)
+
+        for k, candidates in zip(gaps_with_candidates, np.split(parcel_idx, starts[1:])):
+            # Parcel sharing the longest boundary with the gap (first on ties),
+            # measured on current geometries as earlier gaps may have merged
+            shared_length = shapely.length(
+                shapely.intersection(shapely.boundary(geoms[candidates]), gap_boundaries[k])
+            )
+            best = np.argmax(shared_length)
+            if shared_length[best] <= 0:
                 continue
 
-            # Find parcel that shares longest boundary with gap
-            gap_boundary = gap.boundary
-            best_parcel_idx = None
-            best_shared_length = 0
-
-            for idx, parcel in gdf.iterrows():
-                shared = parcel.geometry.boundary.intersection(gap_boundary)
-                shared_length = shared.length if hasattr(shared, 'length') else 0
-
-                if shared_length > best_shared_length:
-                    best_shared_length = shared_length
-                    best_parcel_idx = idx
-
             # Merge gap into best parcel
-            if best_parcel_idx is not None and best_shared_length > 0:
-                merged = unary_union([gdf.loc[best_parcel_idx, 'geometry'], gap])
-                if merged.is_valid:
-                    gdf.loc[best_parcel_idx, 'geometry'] = merged
+            target = candidates[best]
+            merged = shapely.union(geoms[target], gap_polygons[k])
+            if merged.is_valid:
+                geoms[target] = merged
+
+        gdf[gdf.geometry.name] = gpd.GeoSeries(geoms, index=gdf.index, crs=gdf.crs)
 
         return gdf
 
@@ -322,37 +373,86 @@ class TopologyFixer:
     def _detect_overlaps(self, gdf: gpd.GeoDataFrame) -> List[TopologyIssue]:
         """Detect overlapping parcels."""
         issues = []
-        sindex = gdf.sindex
+        if len(gdf) < 2:
+            return issues
 
-        checked = set()
-        for idx, parcel in gdf.iterrows():
-            possible_matches = list(sindex.intersection(parcel.geometry.bounds))
-
-            for other_idx in possible_matches:
-                if other_idx <= idx:
-                    continue
-
-                pair = (min(idx, other_idx), max(idx, other_idx))
-                if pair in checked:
-                    continue
-                checked.add(pair)
-
-                other = gdf.loc[other_idx]
-                if parcel.geometry.intersects(other.geometry):
-                    intersection = parcel.geometry.intersection(other.geometry)
-                    if intersection.area > self.overlap_threshold:
-                        centroid = intersection.centroid
-                        issues.append(TopologyIssue(
-                            type='OVERLAP',
-                            severity='HIGH' if intersection.area > 10 else 'MEDIUM',
-                            location=(centroid.x, centroid.y),
-                            area=intersection.area,
-                            parcels_involved=[idx, other_idx],
-                            message=f'Overlap of {intersection.area:.1f} sqm between parcels {idx} and {other_idx}'
-                        ))
+        left, right, intersections, areas = self._overlap_pairs(gdf)
+        centroids = shapely.centroid(intersections)
+        xs, ys = shapely.get_x(centroids).tolist(), shapely.get_y(centroids).tolist()
+        labels = gdf.index.tolist()
+
+        for i, j, area, x, y in zip(left, right, areas.tolist(), xs, ys):
+            idx, other_idx = labels[i], labels[j]
+            issues.append(TopologyIssue(
+                type='OVERLAP',
+                severity='HIGH' if area > 10 else 'MEDIUM',
+                location=(x, y),
+                area=area,
+                parcels_involved=[idx, other_idx],
+                message=f'Overlap of {area:.1f} sqm between parcels {idx} and {other_idx}'
+            ))
 
         return issues
 
+    def build_faces(self, gdf: gpd.GeoDataFrame) -> gpd.GeoDataFrame:
+        """
+        Build the planar face model of a parcel layer.
+
+        All parcel boundaries are noded together once and polygonized. Each
+        resulting face is covered by zero (GAP), one (PARCEL) or several
+        (OVERLAP) parcels, found from one bulk point-in-polygon query.
+        Gap faces list the parcels they touch.
+
+        Args:
+            gdf: GeoDataFrame with parcel geometries
+
+        Returns:
+            GeoDataFrame of faces with 'face_type', 'parcel_ids' (index
+            labels), 'area' and 'ipq' (isoperimetric quotient) columns
+        """
+        columns = ['face_type', 'parcel_ids', 'area', 'ipq']
+        geoms = gdf.geometry.to_numpy()
+        if len(gdf) == 0:
+            return gpd.GeoDataFrame(columns=columns, geometry=[], crs=gdf.crs)
+
+        # Node the edge network once and take its faces
+        edges = shapely.union_all(shapely.boundary(geoms))
+        faces = shapely.get_parts(shapely.polygonize(shapely.get_parts(edges)))
+
+        # Parcels covering each face
+        points = shapely.point_on_surface(faces)
+        face_idx, parcel_idx = gdf.sindex.query(points, predicate='within')
+        cover_count = np.bincount(face_idx, minlength=len(faces))
+
+        face_type = np.where(
+            cover_count == 0, 'GAP', np.where(cover_count == 1, 'PARCEL', 'OVERLAP')
+        )
+
+        # Gap faces are attributed to the parcels they touch
+        is_gap = cover_count == 0
+        gap_faces = np.flatnonzero(is_gap)
+        touch_idx, touch_parcel = gdf.sindex.query(faces[is_gap], predicate='touches')
+        face_idx = np.concatenate([face_idx, gap_faces[touch_idx]])
+        parcel_idx = np.concatenate([parcel_idx, touch_parcel])
+
+        order = np.lexsort((parcel_idx, face_idx))
+        face_idx, parcel_idx = face_idx[order], parcel_idx[order]
+        labels = gdf.index.tolist()
+        parcel_ids = [[] for _ in range(len(faces))]
+        for f, p in zip(face_idx, parcel_idx):
+            parcel_ids[f].append(labels[p])
+
+        areas = shapely.area(faces)
+        perimeters = shapely.length(faces)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ipq = np.where(perimeters > 0, (4 * np.pi * areas) / perimeters ** 2, 0.0)
+
+        return gpd.GeoDataFrame(
+            {'face_type': face_type, 'parcel_ids': parcel_ids, 'area': areas, 'ipq': ipq},
+            geometry=faces,
+            crs=gdf.crs
+        )
+
     def _detect_gaps(self, gdf: gpd.GeoDataFrame) -> List[TopologyIssue]:
         """Detect gaps between parcels."""
         issues = []
@@ -360,6 +460,9 @@ class TopologyFixer:
         if len(gdf) < 2:
             return issues
 
+        if self.gap_detection == 'faces':
+            return self._detect_gap_faces(gdf)
+
         # Get convex hull of all parcels
         all_parcels = unary_union(gdf.geometry)
         hull = all_parcels.convex_hull
@@ -370,12 +473,7 @@ class TopologyFixer:
         if gaps.is_empty:
             return issues
 
-        if gaps.type == 'MultiPolygon':
-            gap_polygons = list(gaps.geoms)
-        elif gaps.type == 'Polygon':
-            gap_polygons = [gaps]
-        else:
-            return issues
+        gap_polygons = [g for g in shapely.get_parts(gaps) if g.geom_type == 'Polygon']
 
         for gap in gap_polygons:
             if gap.area > 1.0:  # Minimum gap size to report
@@ -398,6 +496,29 @@ class TopologyFixer:
 
         return issues
 
+    def _detect_gap_faces(self, gdf: gpd.GeoDataFrame) -> List[TopologyIssue]:
+        """Detect enclosed gaps from the face model."""
+        faces = self.build_faces(gdf)
+        gaps = faces[(faces['face_type'] == 'GAP') & (faces['area'] > 1.0)]
+        centroids = shapely.centroid(gaps.geometry.to_numpy())
+
+        issues = []
+        for area, ipq, parcel_ids, x, y in zip(
+            gaps['area'].tolist(), gaps['ipq'].tolist(), gaps['parcel_ids'],
+            shapely.get_x(centroids).tolist(), shapely.get_y(centroids).tolist()
+        ):
+            kind = 'Sliver gap' if ipq < self.sliver_threshold else 'Gap'
+            issues.append(TopologyIssue(
+                type='GAP',
+                severity='HIGH' if area > self.gap_threshold else 'LOW',
+                location=(x, y),
+                area=area,
+                parcels_involved=parcel_ids[:5],  # Limit to 5
+                message=f'{kind} of {area:.1f} sqm detected'
+            ))
+
+        return issues
+
     def _detect_slivers(self, gdf: gpd.GeoDataFrame) -> List[TopologyIssue]:
         """Detect sliver polygons."""
         issues = []
@@ -8,14 +8,20 @@ with proper topology (no gaps, no overlaps).
 from typing import Dict, List, Optional, Tuple, Union
 import numpy as np
 import geopandas as gpd
+import shapely
+from shapely import STRtree
 from shapely.geometry import (
-    Polygon, MultiPolygon, LineString, MultiLineString,
-    GeometryCollection, box, mapping
+    Polygon, MultiPolygon, GeometryCollection, box, mapping
 )
-from shapely.ops import unary_union, polygonize, linemerge
+from shapely.ops import polygonize, linemerge
 from shapely.validation import make_valid
 import rasterio
 from rasterio.features import shapes
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import connected_components
+from scipy.spatial import cKDTree
+
+from .planar_topology import PlanarTopology, simplify_shared_boundaries
 
 
 class MaskVectorizer:
@@ -26,7 +32,8 @@ class MaskVectorizer:
     def __init__(
         self,
         simplify_tolerance: float = 1.0,
-        min_area: float = 50.0
+        min_area: float = 50.0,
+        simplify_mode: str = 'polygon'
     ):
         """
         Initialize vectorizer.
@@ -34,9 +41,16 @@ class MaskVectorizer:
         Args:
             simplify_tolerance: Douglas-Peucker simplification tolerance
             min_area: Minimum polygon area to keep
+            simplify_mode: 'polygon' simplifies each polygon on its own;
+                'shared' simplifies each shared boundary once so
+                neighbouring polygons stay gap- and overlap-free
         """
+        if simplify_mode not in ('polygon', 'shared'):
+            raise ValueError(f"Unknown simplify_mode: {simplify_mode}")
+
         self.simplify_tolerance = simplify_tolerance
         self.min_area = min_area
+        self.simplify_mode = simplify_mode
 
     def vectorize_mask(
         self,
@@ -75,11 +89,19 @@ class MaskVectorizer:
 
             # Simplify geometries
             if self.simplify_tolerance > 0:
-                gdf['geometry'] = gdf.geometry.simplify(
+                simplified = gdf.geometry.simplify(
                     self.simplify_tolerance,
                     preserve_topology=True
                 )
 
+                if self.simplify_mode == 'shared':
+                    shared = simplify_shared_boundaries(gdf, self.simplify_tolerance).geometry
+                    # Polygons that do not rebuild cleanly keep the per-polygon result
+                    ok = (shared.geom_type == 'Polygon') & shared.is_valid
+                    simplified = shared.where(ok, simplified)
+
+                gdf['geometry'] = simplified
+
             # Calculate areas
             gdf['area_sqm'] = gdf.geometry.area
             gdf['segment_id'] = range(len(gdf))
@@ -195,38 +217,57 @@ class TopologyEnforcer:
         self,
         parcels: gpd.GeoDataFrame
     ) -> gpd.GeoDataFrame:
-        """Remove overlapping areas between parcels."""
+        """
+        Remove overlapping areas between parcels.
+
+        Larger parcels take priority. Each parcel is differenced only
+        against the already-accepted parcels it overlaps, found through an
+        STRtree, rather than against the union of everything accepted so
+        far.
+        """
         if len(parcels) <= 1:
             return parcels
 
         parcels = parcels.copy()
-        geometries = list(parcels.geometry)
+        geometries = parcels.geometry.to_numpy()
+
+        # Candidate neighbours of every parcel, grouped per parcel
+        left, right = STRtree(geometries).query(geometries, predicate='intersects')
+        keep = left != right
+        left, right = left[keep], right[keep]
+        order = np.argsort(left, kind='stable')
+        left, right = left[order], right[order]
+        bounds = np.searchsorted(left, np.arange(len(geometries) + 1))
 
         # Process parcels in order of size (larger first)
-        size_order = np.argsort([-g.area for g in geometries])
+        size_order = np.argsort(-shapely.area(geometries))
 
+        accepted = np.full(len(geometries), None, dtype=object)
         cleaned = []
-        used_area = None
 
-        for idx in size_order:
+        for rank, idx in enumerate(size_order):
             geom = geometries[idx]
 
-            if used_area is None:
-                used_area = geom
+            if rank == 0:
+                accepted[idx] = geom
                 cleaned.append((idx, geom))
-            else:
-                # Subtract already used area
-                if geom.intersects(used_area):
-                    geom = geom.difference(used_area)
+                continue
+
+            # Subtract already accepted neighbours
+            neighbours = accepted[right[bounds[idx]:bounds[idx + 1]]]
+            neighbours = neighbours[~shapely.is_missing(neighbours)]
+            neighbours = neighbours[shapely.intersects(geom, neighbours)]
+            if len(neighbours):
+                geom = geom.difference(shapely.union_all(neighbours))
 
-                if not geom.is_empty and geom.area >= self.min_area:
-                    # Handle MultiPolygon - keep largest
-                    if isinstance(geom, MultiPolygon):
-                        geom = max(geom.geoms, key=lambda g: g.area)
+            if not geom.is_empty and geom.area >= self.min_area:
+                # Handle MultiPolygon - keep largest
+                if isinstance(geom, MultiPolygon):
+                    geom = max(geom.geoms, key=lambda g: g.area)
 
-                    if isinstance(geom, Polygon) and geom.area >= self.min_area:
-                        used_area = used_area.union(geom)
-                        cleaned.append((idx, geom))
+                if isinstance(geom, Polygon) and geom.area >= self.min_area:
+                    accepted[idx] = geom
+                    cleaned.append((idx, geom))
 
         # Reconstruct GeoDataFrame
         if cleaned:
@@ -246,16 +287,68 @@ class TopologyEnforcer:
         self,
         parcels: gpd.GeoDataFrame
     ) -> gpd.GeoDataFrame:
-        """Snap nearby vertices to ensure clean topology."""
-        # This is a simplified version - full implementation would use
-        # a proper vertex snapping algorithm
+        """
+        Snap nearby vertices to ensure clean topology.
+
+        All parcel vertices go into one KD-tree. Vertices are clustered
+        greedily in coordinate order: each unassigned vertex claims every
+        unassigned vertex within snap_tolerance, and the whole cluster
+        takes its coordinate.
+        Clusters never chain beyond one tolerance, and snapped vertices of
+        neighbouring parcels become exactly identical. Parcels that would
+        become invalid are left unsnapped.
+        """
         parcels = parcels.copy()
+        geometries = parcels.geometry.to_numpy()
+
+        coords = shapely.get_coordinates(geometries)
+        if len(coords) == 0:
+            return parcels
+
+        # Distinct vertices (complex view sorts like (x, y) but much faster)
+        points, inverse = np.unique(
+            np.ascontiguousarray(coords).view(np.complex128).ravel(), return_inverse=True
+        )
+        points = points.view(np.float64).reshape(-1, 2)
+
+        pairs = cKDTree(points).query_pairs(self.snap_tolerance, output_type='ndarray')
+        if len(pairs) == 0:
+            return parcels
+
+        # Greedy clustering in vertex order, resolved in parallel rounds: a
+        # vertex becomes a seed once no lower undecided vertex is within
+        # reach and no seed already claims it
+        n = len(points)
+        source = np.r_[pairs[:, 0], pairs[:, 1]]
+        target = np.r_[pairs[:, 1], pairs[:, 0]]
+
+        UNDECIDED, SEED, CLAIMED = 0, 1, 2
+        state = np.full(n, CLAIMED, dtype=np.int8)
+        state[source] = UNDECIDED
+
+        while (state == UNDECIDED).any():
+            blocked = np.zeros(n, dtype=bool)
+            lower = (target < source) & (state[target] == UNDECIDED)
+            blocked[source[lower]] = True
+            state[(state == UNDECIDED) & ~blocked] = SEED
+
+            near_seed = np.zeros(n, dtype=bool)
+            near_seed[source[state[target] == SEED]] = True
+            state[(state == UNDECIDED) & near_seed] = CLAIMED
+
+        # Each claimed vertex takes the lowest seed within reach
+        seed_of = np.full(n, n)
+        to_seed = (state[target] == SEED) & (state[source] != SEED)
+        np.minimum.at(seed_of, source[to_seed], target[to_seed])
+        representative = np.where(seed_of < n, seed_of, np.arange(n))
 
-        # Buffer and unbuffer to snap nearby vertices
-        parcels['geometry'] = parcels.geometry.buffer(
-            self.snap_tolerance
-        ).buffer(-self.snap_tolerance)
+        snapped = shapely.set_coordinates(geometries.copy(), points[representative][inverse])
 
+        ok = shapely.is_valid(snapped)
+        geometries = geometries.copy()
+        geometries[ok] = shapely.remove_repeated_points(snapped[ok])
+
+        parcels['geometry'] = gpd.GeoSeries(geometries, index=parcels.index, crs=parcels.crs)
         return parcels
 
     def _clip_to_boundary(
@@ -390,33 +483,8 @@ class BoundaryRefiner:
                 crs=parcels.crs
             )
 
-        boundaries = []
-
-        for i, row1 in parcels.iterrows():
-            for j, row2 in parcels.iterrows():
-                if j <= i:
-                    continue
-
-                if row1.geometry.touches(row2.geometry) or row1.geometry.intersects(row2.geometry):
-                    # Get shared boundary
-                    shared = row1.geometry.intersection(row2.geometry)
-
-                    if isinstance(shared, (LineString, MultiLineString)):
-                        boundaries.append({
-                            'geometry': shared,
-                            'parcel_1': i,
-                            'parcel_2': j,
-                            'length': shared.length
-                        })
-
-        if boundaries:
-            return gpd.GeoDataFrame(boundaries, crs=parcels.crs)
-
-        return gpd.GeoDataFrame(
-            columns=['geometry', 'parcel_1', 'parcel_2', 'length'],
-            geometry='geometry',
-            crs=parcels.crs
-        )
+        # Shared arcs come straight out of the planar model
+        return PlanarTopology(parcels).shared_boundaries()
 
 
 def merge_adjacent_segments(
@@ -426,7 +494,11 @@ def merge_adjacent_segments(
     """
     Merge adjacent segments that likely belong to the same parcel.
 
-    Uses area similarity to decide which segments to merge.
+    Uses area similarity to decide which segments to merge. Segments are
+    adjacent when they share an edge (a common corner is not enough).
+    Touching pairs come from one spatial-index query, and similar pairs are
+    grouped transitively (connected components), so the result does not
+    depend on row order.
 
     Args:
         segments: Input segments
@@ -438,53 +510,48 @@ def merge_adjacent_segments(
     if len(segments) <= 1:
         return segments
 
-    segments = segments.copy()
-
-    # Build adjacency graph
-    sindex = segments.sindex
-    merged_indices = set()
-    merge_groups = []
-
-    for i, row in segments.iterrows():
-        if i in merged_indices:
-            continue
-
-        group = [i]
-        candidates = list(sindex.intersection(row.geometry.bounds))
-
-        for j in candidates:
-            if j == i or j in merged_indices:
-                continue
-
-            other = segments.iloc[j]
-
-            # Check if adjacent (touching)
-            if row.geometry.touches(other.geometry):
-                # Check area similarity
-                area_ratio = min(row.geometry.area, other.geometry.area) / max(row.geometry.area, other.geometry.area)
-
-                # Only merge if very similar in size
-                if area_ratio > 0.7:
-                    group.append(j)
-                    merged_indices.add(j)
-
-        merged_indices.add(i)
-        merge_groups.append(group)
-
-    # Create merged polygons
-    merged = []
+    geoms = segments.geometry.to_numpy()
+    areas = shapely.area(geoms)
+    n = len(geoms)
+
+    # Build adjacency graph (shared edge, not just a corner)
+    left, right = segments.sindex.query(geoms, predicate='touches')
+    keep = left < right
+    left, right = left[keep], right[keep]
+    shares_edge = shapely.length(shapely.intersection(geoms[left], geoms[right])) > 0
+    left, right = left[shares_edge], right[shares_edge]
+
+    # Only merge if very similar in size
+    with np.errstate(divide='ignore', invalid='ignore'):
+        area_ratio = np.minimum(areas[left], areas[right]) / np.maximum(areas[left], areas[right])
+    similar = area_ratio > 0.7
+
+    graph = csr_matrix(
+        (np.ones(similar.sum()), (left[similar], right[similar])), shape=(n, n)
+    )
+    _, labels = connected_components(graph, directed=False)
+
+    # Groups ordered by their first member
+    order = np.argsort(labels, kind='stable')
+    _, starts = np.unique(labels[order], return_index=True)
+    merge_groups = sorted(np.split(order, starts[1:]), key=lambda group: group[0])
+
+    # Create merged polygons; groups that do not union to a single
+    # polygon are left unmerged rather than losing parts
+    merged, segment_ids = [], []
     for group in merge_groups:
-        geoms = [segments.iloc[idx].geometry for idx in group]
-        merged_geom = unary_union(geoms)
-
-        # Keep as single polygon if possible
-        if isinstance(merged_geom, MultiPolygon):
-            merged_geom = max(merged_geom.geoms, key=lambda g: g.area)
-
-        merged.append({
-            'geometry': merged_geom,
-            'area_sqm': merged_geom.area,
-            'segment_id': group[0]
-        })
-
-    return gpd.GeoDataFrame(merged, crs=segments.crs)
+        union = shapely.union_all(geoms[group]) if len(group) > 1 else geoms[group[0]]
+        if len(group) > 1 and not isinstance(union, Polygon):
+            merged.extend(geoms[group])
+            segment_ids.extend(segments.index[group].tolist())
+        else:
+            merged.append(union)
+            segment_ids.append(segments.index[group[0]])
+
+    merged = np.array(merged, dtype=object)
+
+    return gpd.GeoDataFrame({
+        'geometry': merged,
+        'area_sqm': shapely.area(merged),
+        'segment_id': segment_ids
+    }, crs=segments.crs)
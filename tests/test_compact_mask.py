@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Tests for run-length encoded parcel masks.
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import numpy as np
+import pytest
+
+from src.sam_segmenter import CompactMask
+from stub_segmenter import LabelSegmenter
+
+
+def round_trip(mask):
+    compact = CompactMask.from_mask(mask)
+    decoded = compact.decode()
+    assert decoded.dtype == np.uint8
+    assert decoded.shape == mask.shape
+    np.testing.assert_array_equal(decoded, mask.astype(np.uint8))
+    return compact
+
+
+@pytest.mark.parametrize('shape', [(1, 1), (7, 13), (13, 7), (64, 64)])
+def test_empty_and_full_masks_round_trip(shape):
+    empty = round_trip(np.zeros(shape, dtype=bool))
+    assert empty.bbox == (0, 0, 0, 0)
+    assert empty.nbytes == 0
+
+    full = round_trip(np.ones(shape, dtype=np.uint8))
+    assert full.bbox == (0, 0, shape[1], shape[0])
+    # Foreground from the first pixel: an empty background run comes first
+    assert list(full.runs) == [0, shape[0] * shape[1]]
+
+
+@pytest.mark.parametrize('shape', [(7, 13), (13, 7), (40, 90)])
+def test_masks_round_trip(shape):
+    rng = np.random.default_rng(sum(shape))
+    for _ in range(20):
+        round_trip(rng.random(shape) < rng.uniform(0.05, 0.95))
+
+    # First pixel set, and a mask ending on the last pixel
+    first = np.zeros(shape, dtype=bool)
+    first[0, 0] = first[2, 3] = True
+    compact = round_trip(first)
+    assert compact.bbox == (0, 0, 4, 3)
+    assert compact.runs[0] == 0
+
+    last = np.zeros(shape, dtype=bool)
+    last[-1, -1] = last[-3, -2] = True
+    assert round_trip(last).bbox == (shape[1] - 2, shape[0] - 3, 2, 3)
+
+
+def test_masks_to_polygons_mask_formats():
+    mask = np.zeros((48, 80), dtype=bool)
+    mask[5:30, 10:70] = True
+    mask[30:40, 10:20] = True
+    masks = [{'segmentation': mask, 'area': int(mask.sum()), 'predicted_iou': 0.9}]
+    segmenter = LabelSegmenter()
+
+    # Direct calls keep full arrays on DetectedParcel.mask by default
+    (parcel,) = segmenter.masks_to_polygons(masks)
+    assert isinstance(parcel.mask, np.ndarray)
+    np.testing.assert_array_equal(parcel.mask, mask.astype(np.uint8))
+
+    (parcel,) = segmenter.masks_to_polygons(masks, mask_format='rle')
+    assert isinstance(parcel.mask, CompactMask)
+    np.testing.assert_array_equal(parcel.get_mask(), mask.astype(np.uint8))
+    assert parcel.mask.nbytes < mask.size
+
+    (parcel,) = segmenter.masks_to_polygons(masks, mask_format='none')
+    assert parcel.mask is None and parcel.get_mask() is None
@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+Tests for parcel confidence scoring.
+"""
+
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import pytest
+from shapely.geometry import Polygon, box
+
+from src.confidence import (
+    CONFLICT_COLUMNS, CONFLICT_TYPE_COLUMNS, ConfidenceScorer, ConflictDetector,
+    conflicts_to_records, explain_parcel
+)
+
+
+@pytest.fixture
+def parcels():
+    """
+    Parcels with the awkward inputs score_parcel handles one row at a time.
+
+    The first rows hit the bit-level differences between Python and
+    NumPy arithmetic: with a degenerate geometry, no ROR link and exact
+    inputs the weighted sum lands on a rounding midpoint (0.4545, 0.4075),
+    and the box's perimeter squares differently with float pow than x * x.
+    """
+    rng = np.random.default_rng(7)
+    n = 400
+    geometries = []
+    for _ in range(n):
+        x, y = rng.uniform(0, 5000, 2)
+        w, h = rng.uniform(2, 200, 2)
+        geometries.append(box(x, y, x + w, y + h))
+
+    # Degenerate geometries (empty, zero-area, self-intersecting bowtie)
+    # and a box whose perimeter squares differently
+    geometries[:4] = [
+        Polygon(),
+        Polygon([(0, 0), (10, 0), (20, 0)]),
+        Polygon([(0, 0), (10, 10), (10, 0), (0, 10)]),
+        box(0, 0, 27.02098739087679, 3.010924550534491),
+    ]
+
+    mismatch = rng.integers(0, 400, n) / 1000
+    mismatch[rng.random(n) < 0.2] = np.nan
+    edge_score = rng.integers(0, 1000, n) / 1000
+    edge_score[rng.random(n) < 0.2] = np.nan
+    survey_no = np.array([f'SY/{i}' for i in range(n)], dtype=object)
+    survey_no[rng.random(n) < 0.2] = None
+
+    mismatch[:2] = 0.0
+    edge_score[:2] = [0.03, 0.05]
+    survey_no[:2] = None
+
+    # Non-default, non-monotonic index
+    index = rng.permutation(n) * 3 + 1000
+    return gpd.GeoDataFrame(
+        {'area_mismatch': mismatch, 'ror_survey_no': survey_no, 'edge_score': edge_score},
+        geometry=geometries,
+        index=index,
+        crs='EPSG:32644'
+    )
+
+
+MIN_AREA, MAX_AREA = 500.0, 20000.0
+
+
+def make_village_stats(parcels, expected_count):
+    return {
+        'expected_count': expected_count,
+        'actual_count': len(parcels),
+        'min_area_sqm': MIN_AREA,
+        'max_area_sqm': MAX_AREA,
+    }
+
+
+@pytest.mark.parametrize('expected_count', [400, 600])
+def test_score_all_parcels_matches_score_parcel(parcels, expected_count):
+    scorer = ConfidenceScorer()
+    scored = scorer.score_all_parcels(parcels, expected_count, MIN_AREA, MAX_AREA)
+
+    village_stats = make_village_stats(parcels, expected_count)
+    assert list(scored.index) == list(parcels.index)
+    for idx in parcels.index:
+        expected = scorer.score_parcel(parcels.loc[idx], village_stats)
+        row = scored.loc[idx]
+        assert row['confidence'] == expected.confidence_score
+        assert row['routing'] == expected.routing.value
+        assert row['confidence_factors'] == expected.factors.to_dict()
+        assert row['reason_codes'] == expected.reason_codes
+
+
+def previous_explanation(row, count_ratio):
+    """Explanation text as score_parcel built it before reason codes."""
+    factors = row['confidence_factors']
+    lines = {
+        'AUTO_APPROVE': ["High confidence - auto-approved"],
+        'DESKTOP_REVIEW': ["Medium confidence - desktop review"],
+        'FIELD_VERIFICATION': ["Low confidence - field verification needed"],
+    }[row['routing']]
+    if not pd.isna(row['area_mismatch']):
+        if factors['area_match'] >= 0.95:
+            lines.append("Area matches ROR within 5%")
+        elif factors['area_match'] < 0.80:
+            lines.append(f"Area mismatch: {row['area_mismatch']:.1%}")
+    else:
+        lines.append("No ROR area for comparison")
+    if not pd.isna(row['ror_survey_no']):
+        lines.append(f"Linked to ROR: {row['ror_survey_no']}")
+    else:
+        lines.append("No ROR match found")
+    if factors['shape_regularity'] >= 0.7:
+        lines.append("Regular parcel shape")
+    elif factors['shape_regularity'] < 0.3:
+        lines.append("Irregular shape - verify boundary")
+    if count_ratio < 0.8:
+        lines.append("Village parcel count mismatch")
+    if factors['size_reasonable'] < 0.5:
+        lines.append("Unusual parcel size")
+    return lines
+
+
+@pytest.mark.parametrize('expected_count', [400, 600])
+def test_explain_parcel_matches_score_parcel_explanation(parcels, expected_count):
+    scorer = ConfidenceScorer()
+    scored = scorer.score_all_parcels(
+        parcels, expected_count, MIN_AREA, MAX_AREA, explain=True
+    )
+
+    assert pd.api.types.is_integer_dtype(scored['reason_codes'])
+    village_stats = make_village_stats(parcels, expected_count)
+    for idx in parcels.index:
+        expected = scorer.score_parcel(parcels.loc[idx], village_stats).explanation
+        assert explain_parcel(scored.loc[idx]) == expected
+        assert scored.at[idx, 'explanation'] == expected
+        assert expected == previous_explanation(scored.loc[idx], len(parcels) / expected_count)
+
+
+def loop_conflicts(parcels, ror_records, area_threshold=0.05):
+    """
+    The original per-row detect_conflicts, as a reference.
+
+    Missing ROR records are listed once each in ROR order; the original
+    iterated a set, so their order was arbitrary.
+    """
+    conflicts = []
+    for idx, row in parcels.iterrows():
+        mismatch = row.get('area_mismatch')
+        if mismatch is not None and not pd.isna(mismatch):
+            if mismatch > 0.20:
+                severity = 'HIGH'
+            elif mismatch > area_threshold:
+                severity = 'MEDIUM'
+            else:
+                continue
+            conflicts.append({
+                'type': 'AREA_MISMATCH',
+                'severity': severity,
+                'parcel_id': idx,
+                'survey_no': row.get('ror_survey_no'),
+                'generated_area_sqm': row.geometry.area,
+                'ror_area_sqm': row.get('ror_area_sqm'),
+                'mismatch_pct': mismatch * 100,
+                'message': f"Area mismatch: {mismatch:.1%}"
+            })
+
+    for idx, row in parcels[parcels['ror_survey_no'].isna()].iterrows():
+        conflicts.append({
+            'type': 'EXTRA_PARCEL',
+            'severity': 'HIGH',
+            'parcel_id': idx,
+            'survey_no': None,
+            'area_sqm': row.geometry.area,
+            'message': "No ROR record found for parcel"
+        })
+
+    matched_survey_nos = set(parcels['ror_survey_no'].dropna())
+    for record in ror_records:
+        survey_no = record.get('survey_no')
+        if survey_no not in matched_survey_nos:
+            matched_survey_nos.add(survey_no)
+            conflicts.append({
+                'type': 'MISSING_PARCEL',
+                'severity': 'HIGH',
+                'parcel_id': None,
+                'survey_no': survey_no,
+                'message': f"ROR record {survey_no} has no matching parcel"
+            })
+    return conflicts
+
+
+@pytest.fixture
+def matched_parcels():
+    """Matched parcels with an integer, non-default index."""
+    return gpd.GeoDataFrame(
+        {
+            'area_mismatch': [0.02, 0.10, 0.30, np.nan, 0.25],
+            'ror_survey_no': ['SY/3', 'SY/1', None, None, 'SY/5'],
+            'ror_area_sqm': [100.0, 90.0, np.nan, np.nan, 80.0],
+        },
+        geometry=[box(0, 0, 10, 10), box(10, 0, 20, 10), box(20, 0, 25, 10),
+                  box(25, 0, 30, 10), box(30, 0, 38, 10)],
+        index=[14, 11, 12, 10, 13],
+        crs='EPSG:32644'
+    )
+
+
+ROR_RECORDS = [{'survey_no': s} for s in ['SY/9', 'SY/1', 'SY/7', 'SY/3', 'SY/2', 'SY/7', 'SY/5']]
+
+
+def test_conflict_table_columns_and_null_fields(matched_parcels):
+    conflicts = ConflictDetector().detect_conflicts(matched_parcels, ROR_RECORDS)
+
+    assert list(conflicts.columns) == CONFLICT_COLUMNS
+    assert list(conflicts['type']) == ['AREA_MISMATCH'] * 3 + ['EXTRA_PARCEL'] * 2 + ['MISSING_PARCEL'] * 3
+
+    for conflict_type, columns in CONFLICT_TYPE_COLUMNS.items():
+        rows = conflicts[conflicts['type'] == conflict_type]
+        unused = [c for c in CONFLICT_COLUMNS if c not in columns]
+        assert rows[unused].isna().all().all()
+
+    area = conflicts[conflicts['type'] == 'AREA_MISMATCH']
+    assert list(area['parcel_id']) == [11, 12, 13]
+    assert list(area['severity']) == ['MEDIUM', 'HIGH', 'HIGH']
+    assert area['survey_no'].isna().tolist() == [False, True, False]
+    assert area['ror_area_sqm'].isna().tolist() == [False, True, False]
+
+    extra = conflicts[conflicts['type'] == 'EXTRA_PARCEL']
+    assert list(extra['parcel_id']) == [12, 10]
+    assert extra['survey_no'].isna().all()
+
+    assert conflicts.loc[conflicts['type'] == 'MISSING_PARCEL', 'parcel_id'].isna().all()
+
+
+def test_missing_parcels_follow_ror_order(matched_parcels):
+    conflicts = ConflictDetector().detect_conflicts(matched_parcels, ROR_RECORDS)
+
+    missing = conflicts[conflicts['type'] == 'MISSING_PARCEL']
+    assert list(missing['survey_no']) == ['SY/9', 'SY/7', 'SY/2']
+
+
+def test_conflict_summary_accepts_table_and_dicts(matched_parcels):
+    detector = ConflictDetector()
+    conflicts = detector.detect_conflicts(matched_parcels, ROR_RECORDS)
+
+    summary = detector.get_conflict_summary(conflicts)
+    assert summary == {
+        'total': 8,
+        'by_type': {'AREA_MISMATCH': 3, 'EXTRA_PARCEL': 2, 'MISSING_PARCEL': 3},
+        'by_severity': {'HIGH': 7, 'MEDIUM': 1, 'LOW': 0},
+    }
+    assert detector.get_conflict_summary(loop_conflicts(matched_parcels, ROR_RECORDS)) == summary
+    assert detector.get_conflict_summary(conflicts_to_records(conflicts)) == summary
+
+
+def test_conflict_records_match_per_row_dicts(matched_parcels):
+    conflicts = ConflictDetector().detect_conflicts(matched_parcels, ROR_RECORDS)
+    records = conflicts_to_records(conflicts)
+
+    # The per-row version kept NaN where a value was missing; records use None
+    expected = [
+        {key: None if isinstance(value, float) and np.isnan(value) else value
+         for key, value in conflict.items()}
+        for conflict in loop_conflicts(matched_parcels, ROR_RECORDS)
+    ]
+    assert records == expected
+    assert [list(r) for r in records] == [list(c) for c in expected]
+
+
+def test_conflict_records_are_json_serializable(matched_parcels):
+    # Without MISSING_PARCEL rows parcel_id has no None and stays integer
+    conflicts = ConflictDetector().detect_conflicts(
+        matched_parcels, [{'survey_no': 'SY/1'}, {'survey_no': 'SY/3'}]
+    )
+    assert not conflicts['type'].eq('MISSING_PARCEL').any()
+
+    text = json.dumps(conflicts_to_records(conflicts))
+
+    assert [r['parcel_id'] for r in json.loads(text)] == [11, 12, 13, 12, 10]
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Tests for the on-disk SAM embedding cache.
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import numpy as np
+
+from src.embedding_cache import EmbeddingCache
+
+
+def entry_bytes(cache):
+    return sum(p.stat().st_size for p in cache.cache_dir.glob('*.npy'))
+
+
+def test_round_trip_is_memory_mapped(tmp_path):
+    cache = EmbeddingCache(tmp_path)
+    features = np.random.default_rng(0).random((1, 8, 4, 4), dtype=np.float32)
+    cache.put('a', features)
+
+    cached = cache.get('a')
+    assert isinstance(cached, np.memmap)
+    assert np.asarray(cached).flags.writeable
+    np.testing.assert_array_equal(cached, features)
+    assert cache.get('missing') is None
+    assert cache.stats() == {'hits': 1, 'misses': 1, 'hit_rate': 0.5}
+
+
+def test_eviction_keeps_cache_under_budget(tmp_path):
+    features = np.zeros((1, 64, 16, 16), dtype=np.float32)
+    entry = features.nbytes + 128  # .npy header
+    cache = EmbeddingCache(tmp_path, max_bytes=3 * entry)
+
+    for i in range(10):
+        cache.put(f'k{i}', features)
+        assert entry_bytes(cache) <= cache.max_bytes
+        assert cache._total_bytes == entry_bytes(cache)
+
+    # Most recent entries survive
+    assert cache.get('k9') is not None
+    assert cache.get('k0') is None
+
+
+def test_eviction_ignores_in_flight_temp_files(tmp_path):
+    """Another worker's temp file is neither counted nor deleted."""
+    features = np.zeros((1, 64, 16, 16), dtype=np.float32)
+    cache = EmbeddingCache(tmp_path, max_bytes=1)
+
+    in_flight = tmp_path / 'other.npy.12345.tmp'
+    in_flight.write_bytes(b'x' * 10 ** 6)
+
+    cache.put('a', features)
+    cache._evict()
+
+    assert in_flight.exists()
+    assert not list(tmp_path.glob('*.tmp.npy'))
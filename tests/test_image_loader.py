@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Tests for tiled ORI reading.
+"""
+
+import sys
+import threading
+from itertools import islice
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import numpy as np
+import pytest
+import rasterio
+from rasterio.transform import from_origin
+
+from src.image_loader import ORILoader
+
+
+@pytest.fixture
+def loader(tmp_path):
+    """Random 3-band image whose size is not a multiple of the stride."""
+    path = tmp_path / 'ori.tif'
+    rng = np.random.default_rng(0)
+    with rasterio.open(
+        path, 'w', driver='GTiff', width=150, height=130, count=3, dtype='uint8',
+        crs='EPSG:32644', transform=from_origin(500000, 1800000, 0.5, 0.5)
+    ) as dst:
+        dst.write(rng.integers(0, 256, (3, 130, 150), dtype=np.uint8))
+    return ORILoader(str(path), tile_size=64, overlap=16)
+
+
+def reader_threads():
+    return [t for t in threading.enumerate() if t.name.startswith('ori-reader')]
+
+
+def assert_same_tiles(tiles, expected):
+    assert [t.tile_id for t in tiles] == [t.tile_id for t in expected]
+    for tile, reference in zip(tiles, expected):
+        assert tile.window == reference.window
+        assert tile.transform == reference.transform
+        np.testing.assert_array_equal(tile.data, reference.data)
+
+
+@pytest.mark.parametrize('prefetch, num_workers', [(1, 1), (2, 2), (4, 3)])
+def test_prefetch_matches_synchronous_iteration(loader, prefetch, num_workers):
+    expected = list(loader.iter_tiles())
+    tiles = list(loader.iter_tiles(prefetch=prefetch, num_workers=num_workers))
+
+    assert len(tiles) == loader.total_tiles == 12
+    assert_same_tiles(tiles, expected)
+
+
+def test_prefetch_reads_tile_subset_in_given_order(loader):
+    # Unsorted, as a resumed run might pass them
+    tile_ids = [(2, 3), (0, 1), (1, 2), (0, 0)]
+
+    expected = list(loader.iter_tiles(tile_ids=tile_ids))
+    tiles = list(loader.iter_tiles(prefetch=2, tile_ids=tile_ids))
+
+    assert [t.tile_id for t in tiles] == tile_ids
+    assert_same_tiles(tiles, expected)
+
+
+def test_early_close_stops_readers_and_closes_files(loader, monkeypatch):
+    opened = []
+    open_dataset = rasterio.open
+
+    def tracking_open(*args, **kwargs):
+        dataset = open_dataset(*args, **kwargs)
+        opened.append(dataset)
+        return dataset
+
+    monkeypatch.setattr(rasterio, 'open', tracking_open)
+
+    # Stop after a few tiles, as process_image does for max_tiles
+    tile_iter = loader.iter_tiles(prefetch=3, num_workers=2)
+    tiles = list(islice(tile_iter, 2))
+    assert len(reader_threads()) > 0
+    tile_iter.close()
+
+    assert [t.tile_id for t in tiles] == [(0, 0), (0, 1)]
+    assert reader_threads() == []
+    assert 0 < len(opened) <= 2
+    assert all(dataset.closed for dataset in opened)
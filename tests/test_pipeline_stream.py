@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Tests for streaming parcels to a GeoPackage.
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import json
+
+import geopandas as gpd
+import numpy as np
+from shapely.geometry import box
+
+from src.pipeline import ParcelStream, PipelineConfig, PipelineResult, export_results
+from src.sam_segmenter import DetectedParcel
+
+
+def parcel(i, confidence=0.9):
+    geom = box(i * 10.0, 0.0, i * 10.0 + 8.0, 5.0)
+    return DetectedParcel(
+        polygon=geom, geo_polygon=geom, area_pixels=geom.area, area_sqm=geom.area,
+        confidence=confidence, bbox=(0, 0, 8, 5)
+    )
+
+
+def test_empty_stream_reads_back_empty_schema(tmp_path):
+    """Nothing written: no GeoPackage, and read() still has the parcel schema."""
+    stream = ParcelStream(str(tmp_path), 'Empty Village', 'EPSG:32644', PipelineConfig())
+    stream.close()
+
+    assert not stream.path.exists()
+    parcels = stream.read()
+    assert len(parcels) == 0
+    assert {'parcel_id', 'area_sqm', 'area_acres', 'confidence'} <= set(parcels.columns)
+    assert parcels.crs == 'EPSG:32644'
+
+
+def test_stream_writes_batches_and_keeps_attributes(tmp_path):
+    config = PipelineConfig(stream_batch_size=3)
+    stream = ParcelStream(str(tmp_path), 'Village', 'EPSG:32644', config)
+    stream.extend(parcel(i) for i in range(4))
+    stream.extend([parcel(4, confidence=0.5)])
+    stream.close()
+
+    assert len(stream) == stream.count == 5
+    attributes = stream.attributes()
+    assert np.allclose(attributes['area_sqm'], 40.0)
+    assert np.isclose(attributes['confidence'].mean(), 0.82)
+
+    parcels = stream.read()
+    assert list(parcels['parcel_id']) == [f'P{i:04d}' for i in range(1, 6)]
+    assert np.isclose(parcels.area.sum(), attributes['area_sqm'].sum())
+
+
+def test_export_keeps_streamed_geopackage(tmp_path):
+    """export_results after a streamed run must not overwrite the layer."""
+    config = PipelineConfig()
+    stream = ParcelStream(str(tmp_path), 'Village', 'EPSG:32644', config)
+    stream.extend(parcel(i) for i in range(3))
+    stream.close()
+
+    result = PipelineResult(
+        village_name='Village',
+        parcels=stream.read().iloc[:0],  # Not read back
+        statistics={'total_parcels': 3},
+        processing_time=1.0,
+        config=config,
+        output_path=stream.path
+    )
+    outputs = export_results(result, str(tmp_path))
+
+    assert outputs['geopackage'] == str(stream.path)
+    assert 'geojson' not in outputs
+    assert len(gpd.read_file(stream.path)) == 3
+    with open(outputs['statistics']) as f:
+        assert json.load(f)['total_parcels'] == 3
@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+"""
+Tests for the multi-process tile worker pool.
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src import pipeline
+from src.pipeline import BoundaryAIPipeline, PipelineConfig
+from stub_segmenter import init_label_worker, use_label_segmenter, write_label_image
+
+
+def test_worker_pool_matches_single_process(tmp_path, monkeypatch):
+    image = str(write_label_image(tmp_path / 'ori.tif'))
+
+    single = BoundaryAIPipeline(PipelineConfig(tile_size=64, tile_overlap=16))
+    use_label_segmenter(single)
+    expected = single.process_image(image)
+
+    # Spawned workers import the initializer by reference, so they load
+    # the label segmenter instead of SAM
+    monkeypatch.setattr(pipeline, '_init_tile_worker', init_label_worker)
+    pooled = BoundaryAIPipeline(PipelineConfig(tile_size=64, tile_overlap=16, num_workers=2))
+    result = pooled.process_image(image)
+
+    assert len(result.parcels) == len(expected.parcels) > 0
+    assert result.parcels.geometry.geom_equals(expected.parcels.geometry).all()
+    assert (result.parcels['confidence'] == expected.parcels['confidence']).all()
+    # Worker memory is only visible through the reaped child processes
+    assert result.statistics['profile']['children_peak_rss_mb'] > 0
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Tests for the shared-arc planar topology model.
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import json
+
+import numpy as np
+import geopandas as gpd
+import shapely
+from shapely.geometry import Polygon, box
+
+from src.planar_topology import PlanarTopology
+
+
+def voronoi_fabric(n=30, size=100.0, seed=0):
+    rng = np.random.default_rng(seed)
+    points = shapely.multipoints(rng.uniform(0, size, (n, 2)))
+    extent = box(0, 0, size, size)
+    cells = shapely.get_parts(shapely.voronoi_polygons(points, extend_to=extent))
+    return gpd.GeoDataFrame(geometry=shapely.intersection(cells, extent), crs='EPSG:32644')
+
+
+def decode_topojson(topology, object_name='parcels'):
+    """Rebuild polygons from a TopoJSON topology (untransformed arcs)."""
+    arcs = topology['arcs']
+
+    def ring(arc_ids):
+        coords = []
+        for arc_id in arc_ids:
+            points = arcs[arc_id] if arc_id >= 0 else arcs[~arc_id][::-1]
+            coords.extend(points if not coords else points[1:])
+        return coords
+
+    polygons = {}
+    for geometry in topology['objects'][object_name]['geometries']:
+        parts = [geometry['arcs']] if geometry['type'] == 'Polygon' else geometry['arcs']
+        polygons[geometry['id']] = shapely.union_all([
+            Polygon(ring(rings[0]), [ring(hole) for hole in rings[1:]]) for rings in parts
+        ])
+    return polygons
+
+
+def test_neighbours_share_one_set_of_arcs():
+    parcels = voronoi_fabric()
+    topo = PlanarTopology(parcels)
+
+    for label in parcels.index:
+        geom = parcels.geometry[label]
+        expected = [
+            other for other in parcels.index
+            if other != label and geom.intersection(parcels.geometry[other]).length > 0
+        ]
+        assert topo.neighbors(label) == expected
+
+        for other in expected:
+            shared = topo.shared_arcs(label, other)
+            assert shared == topo.shared_arcs(other, label)
+            # The shared arcs are exactly the common boundary
+            common = geom.boundary.intersection(parcels.geometry[other].boundary)
+            assert np.isclose(shapely.length(topo.arcs[shared]).sum(), common.length)
+
+    # Every interior arc is stored once for both sides
+    total = sum(len(topo.arcs_of(label)) for label in parcels.index)
+    assert total == 2 * topo.n_arcs - (topo.arc_parcels == -1).any(axis=1).sum()
+    assert topo.to_geodataframe().geometry.geom_equals(parcels.geometry).all()
+
+
+def test_moving_a_node_moves_both_parcels():
+    parcels = gpd.GeoDataFrame(geometry=[box(0, 0, 10, 10), box(10, 0, 20, 10)], crs='EPSG:32644')
+    topo = PlanarTopology(parcels)
+    node = int(np.flatnonzero((topo.nodes == [10, 10]).all(axis=1))[0])
+
+    topo.move_node(node, (12, 10))
+    moved = topo.to_geodataframe()
+
+    assert np.isclose(moved.area[0], 110.0)
+    assert np.isclose(moved.area[1], 90.0)
+    assert shapely.area(shapely.intersection(moved.geometry[0], moved.geometry[1])) == 0
+
+
+def test_topojson_round_trip():
+    parcels = voronoi_fabric()
+    # A parcel with a hole and a multipart parcel
+    parcels.loc[len(parcels)] = box(120, 0, 140, 20).difference(box(125, 5, 135, 15))
+    parcels.loc[len(parcels)] = box(125, 5, 135, 15).union(box(150, 0, 160, 10))
+
+    topology = json.loads(json.dumps(PlanarTopology(parcels).to_topojson()))
+    polygons = decode_topojson(topology)
+
+    assert list(polygons) == list(parcels.index)
+    for label, polygon in polygons.items():
+        assert polygon.equals(parcels.geometry[label])
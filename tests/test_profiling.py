@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Tests for pipeline stage profiling.
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import pytest
+
+from src import profiling
+from src.profiling import StageProfiler
+
+pytest.importorskip('resource')
+
+
+class FakeUsage:
+    ru_maxrss = 512 * 1024 * 1024
+
+
+def test_max_rss_units_follow_platform(monkeypatch):
+    monkeypatch.setattr(profiling.resource, 'getrusage', lambda who: FakeUsage)
+
+    monkeypatch.setattr(profiling.sys, 'platform', 'darwin')
+    assert profiling.peak_rss_mb() == 512
+
+    monkeypatch.setattr(profiling.sys, 'platform', 'linux')
+    assert profiling.peak_rss_mb() == 512 * 1024
+
+
+def test_stage_is_charged_with_high_water_growth(monkeypatch):
+    # High-water mark at each stage start and end, then for the summary
+    samples = iter([100.0, 100.0, 100.0, 340.0, 340.0, 360.0, 360.0, 0.0])
+    monkeypatch.setattr(profiling, 'peak_rss_mb', lambda children=False: next(samples))
+
+    profiler = StageProfiler()
+    with profiler.stage('tile_read'):
+        pass
+    with profiler.stage('sam'):
+        pass
+    with profiler.stage('sam'):
+        pass
+
+    stages = profiler.summary()['stages']
+    assert stages['tile_read']['rss_growth_mb'] == 0
+    assert stages['sam']['rss_growth_mb'] == 260
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Tests for ROR constraint matching.
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import geopandas as gpd
+import numpy as np
+import pytest
+from scipy.optimize import linear_sum_assignment
+from shapely.geometry import box
+
+from src.ror_engine import MatchResult, RORConstraintEngine
+
+
+def test_block_of_segment_on_shared_edge_is_first_reference():
+    """A segment whose interior point lies on a block edge still gets a block."""
+    reference = gpd.GeoDataFrame(
+        {'survey_no': ['1', '2']},
+        geometry=[box(0, 0, 10, 10), box(10, 0, 20, 10)],
+        crs='EPSG:32644'
+    )
+    segments = gpd.GeoDataFrame(
+        geometry=[box(9, 0, 11, 10), box(12, 0, 18, 10)], crs='EPSG:32644'
+    )
+    engine = RORConstraintEngine([
+        {'survey_no': '1/1', 'expected_area_sqm': 20.0},
+        {'survey_no': '2/1', 'expected_area_sqm': 60.0},
+    ])
+
+    matched, _ = engine.match_segments_by_block(segments, reference)
+
+    assert list(matched['match_block']) == ['1', '2']
+    assert list(matched['ror_survey_no']) == ['1/1', '2/1']
+
+
+@pytest.mark.parametrize('n_segments, n_ror', [(60, 50), (50, 60)])
+def test_wide_band_sparse_solver_matches_dense(n_segments, n_ror):
+    rng = np.random.default_rng(n_segments)
+    seg_areas = rng.uniform(100, 1000, n_segments)
+    records = [{'expected_area_sqm': a} for a in rng.uniform(100, 1000, n_ror)]
+
+    # A band wider than any area ratio makes every pair a candidate
+    engine = RORConstraintEngine(records)
+    sparse_engine = RORConstraintEngine(records, solver='sparse', area_ratio_band=100.0)
+    dense = engine._solve(seg_areas, engine._ror_area_array())
+    sparse = sparse_engine._solve(seg_areas, sparse_engine._ror_area_array())
+
+    for dense_part, sparse_part in zip(dense, sparse):
+        np.testing.assert_allclose(sparse_part, dense_part)
+
+
+def test_sparse_solver_leaves_zero_area_records_unmatched():
+    records = [{'expected_area_sqm': 100.0}, {'expected_area_sqm': 0}]
+    seg_areas = np.array([100.0, 200.0])
+
+    dense = RORConstraintEngine(records)
+    sparse = RORConstraintEngine(records, solver='sparse', area_ratio_band=100.0)
+
+    assert list(dense._solve(seg_areas, dense._ror_area_array())[1]) == [0, 1]
+    assert list(sparse._solve(seg_areas, sparse._ror_area_array())[1]) == [0]
+
+
+def loop_match_segments_to_ror(engine, segments):
+    """The original cost-matrix loop and iloc write-back, as a reference."""
+    segments = segments.copy()
+    n_segments = len(segments)
+    n_ror = len(engine.ror_records)
+    if 'area_sqm' not in segments.columns:
+        segments['area_sqm'] = segments.geometry.area
+
+    cost_matrix = np.zeros((n_segments, n_ror))
+    for i, (_, seg) in enumerate(segments.iterrows()):
+        for j, ror in enumerate(engine.ror_records):
+            ror_area = ror.get('expected_area_sqm', 0)
+            if ror_area > 0:
+                cost_matrix[i, j] = abs(seg.geometry.area - ror_area) / ror_area
+            else:
+                cost_matrix[i, j] = 1.0
+
+    if n_segments >= n_ror:
+        row_ind, col_ind = linear_sum_assignment(cost_matrix)
+    else:
+        col_ind, row_ind = linear_sum_assignment(cost_matrix.T)
+
+    for column in ['ror_survey_no', 'ror_area_sqm', 'ror_owner', 'ror_land_type', 'area_mismatch']:
+        segments[column] = None
+    segments['is_matched'] = False
+
+    match_results = []
+    for i, j in zip(row_ind, col_ind):
+        ror = engine.ror_records[j]
+        ror_area = ror.get('expected_area_sqm', 0)
+        mismatch = cost_matrix[i, j]
+        segments.iloc[i, segments.columns.get_loc('ror_survey_no')] = ror.get('survey_no')
+        segments.iloc[i, segments.columns.get_loc('ror_area_sqm')] = ror_area
+        segments.iloc[i, segments.columns.get_loc('ror_owner')] = ror.get('owner')
+        segments.iloc[i, segments.columns.get_loc('ror_land_type')] = ror.get('land_type')
+        segments.iloc[i, segments.columns.get_loc('area_mismatch')] = mismatch
+        segments.iloc[i, segments.columns.get_loc('is_matched')] = True
+        match_results.append(MatchResult(
+            segment_id=i,
+            ror_survey_no=ror.get('survey_no'),
+            ror_area_sqm=ror_area,
+            generated_area_sqm=segments.iloc[i].geometry.area,
+            area_mismatch=mismatch,
+            match_confidence=1.0 - min(mismatch, 1.0)
+        ))
+
+    for i in range(n_segments):
+        if not segments.iloc[i]['is_matched']:
+            match_results.append(MatchResult(
+                segment_id=i,
+                ror_survey_no=None,
+                ror_area_sqm=None,
+                generated_area_sqm=segments.iloc[i].geometry.area,
+                area_mismatch=1.0,
+                match_confidence=0.0
+            ))
+    return segments, match_results
+
+
+@pytest.mark.parametrize('n_segments, n_ror', [(40, 30), (30, 40)])
+def test_matching_matches_nested_loop_version(n_segments, n_ror):
+    rng = np.random.default_rng(n_ror)
+    geoms = []
+    for _ in range(n_segments):
+        x, y = rng.uniform(0, 1000, 2)
+        w, h = rng.uniform(10, 40, 2)
+        geoms.append(box(x, y, x + w, y + h))
+    segments = gpd.GeoDataFrame(
+        {'parcel_id': np.arange(n_segments)},
+        geometry=geoms,
+        index=rng.permutation(n_segments) + 100,
+        crs='EPSG:32644'
+    )
+
+    records = []
+    for j in range(n_ror):
+        record = {'survey_no': f'{j}/1', 'owner': f'Owner {j}'}
+        # Some records lack an area or a land type
+        if j % 7:
+            record['expected_area_sqm'] = float(rng.uniform(100, 1600))
+        if j % 3:
+            record['land_type'] = 'dry'
+        records.append(record)
+    engine = RORConstraintEngine(records)
+
+    expected, expected_results = loop_match_segments_to_ror(engine, segments)
+    matched, results = engine.match_segments_to_ror(segments)
+
+    assert list(matched.columns) == list(expected.columns)
+    assert (matched.dtypes == expected.dtypes).all()
+    for column in ['ror_survey_no', 'ror_area_sqm', 'ror_owner', 'ror_land_type', 'area_mismatch']:
+        assert matched[column].tolist() == expected[column].tolist()
+    assert matched['is_matched'].tolist() == expected['is_matched'].tolist()
+    assert results == expected_results
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Tests for SAM segmentation.
+
+Without a cache ``segment_image`` calls ``SamAutomaticMaskGenerator.generate``.
+The cached and batched paths decode a stored embedding by re-implementing it
+on top of private helpers, so they are checked against the upstream generator
+with a small, randomly initialised model.
+"""
+
+import sys
+from functools import partial
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import numpy as np
+import pytest
+
+torch = pytest.importorskip('torch')
+segment_anything = pytest.importorskip('segment_anything')
+
+from segment_anything.utils.amg import build_all_layer_point_grids
+
+from src.embedding_cache import EmbeddingCache
+from src.sam_segmenter import SAMSegmenter
+
+
+def build_small_sam(checkpoint=None):
+    """
+    SAM with a two-block ViT at 256 px input.
+
+    Same components and code paths as ``vit_b``. The full 1024 px encoder
+    needs several GB per image on CPU, and a two-tile batch would not fit.
+    """
+    from segment_anything.modeling import (
+        ImageEncoderViT, MaskDecoder, PromptEncoder, Sam, TwoWayTransformer
+    )
+
+    image_size, patch_size, embed_dim = 256, 16, 256
+    sam = Sam(
+        image_encoder=ImageEncoderViT(
+            depth=2,
+            embed_dim=96,
+            img_size=image_size,
+            mlp_ratio=4,
+            norm_layer=partial(torch.nn.LayerNorm, eps=1e-6),
+            num_heads=2,
+            patch_size=patch_size,
+            qkv_bias=True,
+            use_rel_pos=True,
+            global_attn_indexes=(1,),
+            window_size=4,
+            out_chans=embed_dim,
+        ),
+        prompt_encoder=PromptEncoder(
+            embed_dim=embed_dim,
+            image_embedding_size=(image_size // patch_size, image_size // patch_size),
+            input_image_size=(image_size, image_size),
+            mask_in_chans=16,
+        ),
+        mask_decoder=MaskDecoder(
+            num_multimask_outputs=3,
+            transformer=TwoWayTransformer(depth=2, embedding_dim=embed_dim, mlp_dim=512, num_heads=8),
+            transformer_dim=embed_dim,
+            iou_head_depth=3,
+            iou_head_hidden_dim=256,
+        ),
+        pixel_mean=[123.675, 116.28, 103.53],
+        pixel_std=[58.395, 57.12, 57.375],
+    )
+    sam.eval()
+    if checkpoint is not None:
+        sam.load_state_dict(torch.load(checkpoint))
+    return sam
+
+
+@pytest.fixture(scope='module')
+def segmenter(tmp_path_factory):
+    torch.manual_seed(0)
+    checkpoint = tmp_path_factory.mktemp('sam') / 'sam_small_random.pth'
+    torch.save(build_small_sam().state_dict(), checkpoint)
+
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setitem(segment_anything.sam_model_registry, 'vit_b', build_small_sam)
+        # Random weights score poorly, so accept every mask to compare them all
+        segmenter = SAMSegmenter(
+            model_type='vit_b',
+            checkpoint_path=str(checkpoint),
+            device='cpu',
+            min_area=20,
+            stability_score_thresh=0.0,
+            pred_iou_thresh=0.0,
+        )
+    # A 4x4 prompt grid keeps CPU decoding fast
+    segmenter.mask_generator.point_grids = build_all_layer_point_grids(4, 0, 1)
+    return segmenter
+
+
+def make_image(height, width, seed=0):
+    rng = np.random.default_rng(seed)
+    image = np.zeros((height, width, 3), dtype=np.uint8)
+    image[:, width // 2:] = 200
+    image[height // 3:height * 5 // 6, width // 8:width * 3 // 8] = 90
+    return np.clip(image + rng.integers(0, 20, image.shape), 0, 255).astype(np.uint8)
+
+
+def assert_same_masks(masks, expected):
+    assert len(masks) == len(expected) > 0
+    for mask, ref in zip(masks, expected):
+        assert np.array_equal(mask['segmentation'], ref['segmentation'])
+        assert mask['area'] == ref['area']
+        assert mask['bbox'] == ref['bbox']
+        assert np.isclose(mask['predicted_iou'], ref['predicted_iou'], atol=1e-5)
+        assert np.isclose(mask['stability_score'], ref['stability_score'], atol=1e-5)
+
+
+def test_cached_segment_image_matches_upstream_generator(segmenter, tmp_path, monkeypatch):
+    image = make_image(48, 64)
+
+    expected = segmenter.segment_image(image)
+    monkeypatch.setattr(segmenter, 'embedding_cache', EmbeddingCache(tmp_path))
+
+    # Miss encodes and stores, hit decodes from the memory-mapped copy
+    assert_same_masks(segmenter.segment_image(image), expected)
+    assert_same_masks(segmenter.segment_image(image), expected)
+    assert segmenter.embedding_cache.stats()['hits'] == 1
+
+
+def test_segment_batch_matches_per_tile_segmentation(segmenter):
+    # An edge tile is cropped, so it resizes and pads differently in the batch
+    full_tile = make_image(64, 64, seed=1)
+    edge_tile = make_image(64, 24, seed=2)
+
+    batched = segmenter.segment_batch([full_tile, edge_tile])
+
+    assert len(batched) == 2
+    assert_same_masks(batched[0], segmenter.segment_image(full_tile))
+    assert_same_masks(batched[1], segmenter.segment_image(edge_tile))
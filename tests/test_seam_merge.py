@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Tests for merging duplicate parcels within and across tiles.
+"""
+
+import sys
+from itertools import combinations
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import numpy as np
+import pytest
+import rasterio
+from rasterio.transform import from_origin
+from shapely.geometry import box
+from shapely.ops import unary_union
+
+from src.image_loader import ORILoader
+from src.sam_segmenter import DetectedParcel, merge_overlapping_parcels
+from src.seam_merge import SeamMerger
+
+
+@pytest.fixture
+def loader(tmp_path):
+    """
+    96x96 px image in 2x2 tiles of 64 px with 16 px overlap, 1 m pixels.
+
+    Footprints (x, y in metres): (0, 0) 0-64 x 32-96, (0, 1) 48-96 x 32-96,
+    (1, 0) 0-64 x 0-48, (1, 1) 48-96 x 0-48.
+    """
+    path = tmp_path / 'ori.tif'
+    with rasterio.open(
+        path, 'w', driver='GTiff', width=96, height=96, count=3, dtype='uint8',
+        crs='EPSG:32644', transform=from_origin(0, 96, 1, 1)
+    ) as dst:
+        dst.write(np.zeros((3, 96, 96), dtype=np.uint8))
+    return ORILoader(str(path), tile_size=64, overlap=16)
+
+
+def parcel(minx, miny, maxx, maxy, confidence=0.9):
+    geom = box(minx, miny, maxx, maxy)
+    return DetectedParcel(
+        polygon=geom, geo_polygon=geom, area_pixels=geom.area, area_sqm=geom.area,
+        confidence=confidence, bbox=(0, 0, 0, 0)
+    )
+
+
+def pairwise_merge(parcels, overlap_threshold=0.5):
+    """The original O(n^2) merge loop, as a reference."""
+    parcels = sorted(parcels, key=lambda p: p.area_pixels, reverse=True)
+    merged = []
+    used = set()
+    for i, p1 in enumerate(parcels):
+        if i in used:
+            continue
+        current_polygon = p1.geo_polygon
+        current_confidence = p1.confidence
+        for j, p2 in enumerate(parcels[i + 1:], start=i + 1):
+            if j in used:
+                continue
+            if current_polygon.intersects(p2.geo_polygon):
+                intersection = current_polygon.intersection(p2.geo_polygon)
+                iou = intersection.area / min(current_polygon.area, p2.geo_polygon.area)
+                if iou > overlap_threshold:
+                    current_polygon = unary_union([current_polygon, p2.geo_polygon])
+                    current_confidence = max(current_confidence, p2.confidence)
+                    used.add(j)
+        merged.append((current_polygon, current_confidence))
+        used.add(i)
+    return merged
+
+
+def test_indexed_merge_matches_pairwise_merge():
+    rng = np.random.default_rng(42)
+    parcels = []
+    for _ in range(300):
+        x, y = rng.uniform(0, 400, 2)
+        w, h = rng.uniform(5, 30, 2)
+        parcels.append(parcel(x, y, x + w, y + h, confidence=rng.uniform(0.5, 1.0)))
+
+    expected = pairwise_merge(parcels)
+    merged = merge_overlapping_parcels(parcels)
+
+    assert 0 < len(merged) == len(expected) < len(parcels)
+    for result, (polygon, confidence) in zip(merged, expected):
+        assert result.geo_polygon.equals(polygon)
+        assert result.confidence == confidence
+
+
+def test_interior_parcels_pass_through_unchanged(loader):
+    merger = SeamMerger(loader)
+    interior = parcel(5, 70, 20, 90)
+
+    finalized = merger.add_tile((0, 0), [interior])
+
+    assert finalized == [interior]
+    assert finalized[0].geo_polygon.equals(box(5, 70, 20, 90))
+    assert merger.stats == {'interior': 1, 'seam': 0}
+    assert merger.pending_count == 0
+
+
+def test_seam_duplicates_merge_after_neighbours_finish(loader):
+    merger = SeamMerger(loader)
+
+    # One parcel across the vertical seam, one on the four-tile corner,
+    # each seen by every tile it reaches
+    edge = {(0, 0): parcel(40, 60, 60, 80), (0, 1): parcel(42, 60, 62, 80)}
+    corner = {
+        (0, 0): parcel(44, 40, 60, 56), (0, 1): parcel(45, 40, 61, 56),
+        (1, 0): parcel(44, 39, 60, 55), (1, 1): parcel(45, 39, 61, 55),
+    }
+
+    released = merger.add_tile((0, 0), [edge[(0, 0)], corner[(0, 0)]])
+    assert released == []
+    assert merger.pending_count == 2
+
+    released = merger.add_tile((0, 1), [edge[(0, 1)], corner[(0, 1)]])
+    assert len(released) == 1
+    assert released[0].geo_polygon.equals(box(40, 60, 62, 80))
+
+    # The corner parcel still reaches unfinished tiles
+    assert merger.add_tile((1, 0), [corner[(1, 0)]]) == []
+    assert merger.pending_count == 1
+
+    released += merger.add_tile((1, 1), [corner[(1, 1)]])
+    assert len(released) == 2
+    assert released[1].geo_polygon.equals(box(44, 39, 61, 56))
+    assert merger.flush() == []
+
+
+def test_output_has_no_overlaps(loader):
+    merger = SeamMerger(loader)
+    rng = np.random.default_rng(0)
+
+    # A 6x6 grid of 16 m parcels; every tile that reaches a parcel sees it
+    # with up to 1 m of jitter, so only true duplicates overlap
+    truth = [box(x, y, x + 16, y + 16) for x in range(0, 96, 16) for y in range(0, 96, 16)]
+    output = []
+    for tile_id in loader.tile_indices():
+        footprint = box(*loader.tile_bounds(*tile_id))
+        tile_parcels = []
+        for geom in truth:
+            if geom.intersects(footprint) and geom.intersection(footprint).area > 0:
+                minx, miny, maxx, maxy = geom.bounds
+                dx, dy = rng.uniform(0.1, 0.9, 2)
+                tile_parcels.append(parcel(minx + dx, miny + dy, maxx - dx, maxy - dy))
+        output += merger.add_tile(tile_id, tile_parcels)
+    output += merger.flush()
+
+    assert len(output) == len(truth)
+    for a, b in combinations(output, 2):
+        assert a.geo_polygon.intersection(b.geo_polygon).area == 0
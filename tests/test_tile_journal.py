@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Tests for resumable, journaled village runs.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import pytest
+
+from src.image_loader import ORILoader
+from src.pipeline import BoundaryAIPipeline, PipelineConfig
+from src.tile_journal import segmentation_config_hash
+from stub_segmenter import use_label_segmenter, write_label_image
+
+
+def run(image_path, max_tiles=None, **config):
+    pipe = BoundaryAIPipeline(PipelineConfig(tile_size=64, tile_overlap=16, **config))
+    segmenter = use_label_segmenter(pipe)
+    result = pipe.process_image(str(image_path), max_tiles=max_tiles)
+    return result, segmenter.calls
+
+
+def test_resumed_run_matches_uninterrupted_run(tmp_path):
+    image = write_label_image(tmp_path / 'ori.tif')
+    journal = str(tmp_path / 'journal.sqlite')
+
+    expected, total_calls = run(image)
+    _, first_calls = run(image, max_tiles=4, journal_path=journal)
+    resumed, resumed_calls = run(image, journal_path=journal)
+
+    # Only tiles missing from the journal are segmented again
+    assert first_calls == 4
+    assert resumed_calls == total_calls - 4
+
+    assert len(resumed.parcels) == len(expected.parcels)
+    assert resumed.parcels.geometry.geom_equals(expected.parcels.geometry).all()
+    assert (resumed.parcels['confidence'] == expected.parcels['confidence']).all()
+
+
+def test_replaced_image_changes_journal_key(tmp_path):
+    image = write_label_image(tmp_path / 'ori.tif', seed=0)
+    config = PipelineConfig(tile_size=64, tile_overlap=16)
+    before = segmentation_config_hash(config, ORILoader(str(image)).get_metadata())
+
+    # Same size and path, different content and mtime
+    write_label_image(image, seed=1)
+    stat = image.stat()
+    os.utime(image, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    after = segmentation_config_hash(config, ORILoader(str(image)).get_metadata())
+
+    assert before != after
+
+
+def test_journal_rejects_stored_masks(tmp_path):
+    image = write_label_image(tmp_path / 'ori.tif')
+    with pytest.raises(ValueError, match='parcel_mask_format'):
+        run(image, journal_path=str(tmp_path / 'journal.sqlite'), parcel_mask_format='rle')
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Tests for topology validation.
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import numpy as np
+import geopandas as gpd
+import shapely
+from shapely.geometry import Polygon, box
+from shapely.ops import unary_union
+
+from src.topology import TopologyFixer
+
+
+def voronoi_fabric(n=60, size=200.0, seed=0):
+    """Voronoi cells of random seeds, clipped to a square: a gap-free fabric."""
+    rng = np.random.default_rng(seed)
+    points = shapely.multipoints(rng.uniform(0, size, (n, 2)))
+    extent = box(0, 0, size, size)
+    cells = shapely.get_parts(shapely.voronoi_polygons(points, extend_to=extent))
+    return gpd.GeoDataFrame(geometry=shapely.intersection(cells, extent), crs='EPSG:32644')
+
+
+def overlap_area(gdf):
+    """Total pairwise intersection area."""
+    geoms = gdf.geometry.to_numpy()
+    left, right = gdf.sindex.query(geoms, predicate='intersects')
+    keep = left < right
+    return shapely.area(shapely.intersection(geoms[left[keep]], geoms[right[keep]])).sum()
+
+
+def test_hull_gap_detection_reports_gap_area():
+    parcels = gpd.GeoDataFrame(
+        geometry=[box(0, 0, 10, 10), box(12, 0, 22, 10), box(0, 12, 22, 22)],
+        crs='EPSG:32644'
+    )
+    issues = TopologyFixer(gap_detection='hull')._detect_gaps(parcels)
+
+    assert [issue.type for issue in issues] == ['GAP']
+    assert np.isclose(issues[0].area, 64.0)
+    assert sorted(issues[0].parcels_involved) == [0, 1, 2]
+
+
+def test_hull_gap_detection_ignores_tiled_parcels():
+    parcels = gpd.GeoDataFrame(geometry=[box(0, 0, 10, 10), box(10, 0, 20, 10)], crs='EPSG:32644')
+
+    assert TopologyFixer(gap_detection='hull')._detect_gaps(parcels) == []
+
+
+def holed_layer():
+    """Parcel 0 has a 10x10 hole, half filled by parcel 1; parcels 2 and 3 overlap."""
+    return gpd.GeoDataFrame(
+        geometry=[
+            box(0, 0, 30, 30).difference(box(10, 10, 20, 20)),
+            box(10, 10, 15, 20),
+            box(30, 0, 40, 10),
+            box(35, 0, 45, 10),
+        ],
+        crs='EPSG:32644'
+    )
+
+
+def test_faces_classify_gaps_holes_and_overlaps():
+    faces = TopologyFixer().build_faces(holed_layer())
+    by_type = {t: group for t, group in faces.groupby('face_type')}
+
+    # The empty half of the hole is a gap; the filled half is parcel 1
+    gap = by_type['GAP']
+    assert len(gap) == 1
+    assert np.isclose(gap['area'].iloc[0], 50.0)
+    assert gap['parcel_ids'].iloc[0] == [0, 1]
+
+    overlap = by_type['OVERLAP']
+    assert len(overlap) == 1
+    assert np.isclose(overlap['area'].iloc[0], 50.0)
+    assert overlap['parcel_ids'].iloc[0] == [2, 3]
+
+    parcel = by_type['PARCEL']
+    assert sorted(map(tuple, parcel['parcel_ids'])) == [(0,), (1,), (2,), (3,)]
+    assert np.isclose(parcel['area'].sum(), 800 + 50 + 50 + 50)
+
+
+def test_face_gap_detection_reports_only_enclosed_gaps():
+    parcels = holed_layer()
+    issues = TopologyFixer(gap_detection='faces')._detect_gaps(parcels)
+
+    assert [issue.type for issue in issues] == ['GAP']
+    assert np.isclose(issues[0].area, 50.0)
+    assert issues[0].parcels_involved == [0, 1]
+
+    # Hull mode also reports the bay between the parcels and their hull
+    assert len(TopologyFixer(gap_detection='hull')._detect_gaps(parcels)) > 1
+
+
+def test_fix_overlaps_leaves_no_overlaps():
+    fabric = voronoi_fabric()
+    parcels = fabric.copy()
+    parcels['geometry'] = fabric.buffer(1.0, join_style='mitre')
+    assert overlap_area(parcels) > 1000
+
+    exact = TopologyFixer(overlap_threshold=0.0)._fix_overlaps(parcels)
+    assert overlap_area(exact) < 1e-6
+    assert exact.is_valid.all()
+    covered = shapely.union_all(exact.geometry.to_numpy()).area
+    assert np.isclose(covered, shapely.union_all(parcels.geometry.to_numpy()).area)
+
+    # Overlaps under the threshold may stay, but none that validate reports
+    fixer = TopologyFixer()
+    assert fixer._detect_overlaps(fixer._fix_overlaps(parcels)) == []
+
+
+def sequential_remove_slivers(gdf, sliver_threshold=0.1):
+    """The original one-sliver-at-a-time loop, as a reference."""
+    def is_sliver(geom):
+        if geom is None or geom.is_empty or geom.length == 0:
+            return True
+        return (4 * np.pi * geom.area) / (geom.length ** 2) < sliver_threshold
+
+    sliver_mask = gdf.geometry.apply(is_sliver)
+    non_slivers = gdf[~sliver_mask].copy()
+    for _, sliver in gdf[sliver_mask].iterrows():
+        touches = non_slivers[non_slivers.geometry.touches(sliver.geometry)]
+        if len(touches) > 0:
+            largest_idx = touches.geometry.area.idxmax()
+            merged = unary_union([non_slivers.loc[largest_idx, 'geometry'], sliver.geometry])
+            if merged.is_valid:
+                non_slivers.loc[largest_idx, 'geometry'] = merged
+    return non_slivers
+
+
+def test_bulk_sliver_removal_matches_sequential():
+    """Irregular grid where some cells shed a 0.2 m strip along their left edge."""
+    rng = np.random.default_rng(1)
+    xs = np.r_[0, np.cumsum(rng.uniform(6, 14, 12))]
+    ys = np.r_[0, np.cumsum(rng.uniform(6, 14, 12))]
+
+    geoms = []
+    for j in range(12):
+        for i in range(12):
+            x0, x1, y0, y1 = xs[i], xs[i + 1], ys[j], ys[j + 1]
+            # Slivers on even rows only, so no two slivers touch
+            if j % 2 == 0 and rng.random() < 0.5:
+                geoms += [box(x0, y0, x0 + 0.2, y1), box(x0 + 0.2, y0, x1, y1)]
+            else:
+                geoms.append(box(x0, y0, x1, y1))
+    parcels = gpd.GeoDataFrame(geometry=geoms, crs='EPSG:32644')
+
+    expected = sequential_remove_slivers(parcels)
+    result = TopologyFixer()._remove_slivers(parcels)
+
+    assert len(result) < len(parcels)
+    assert list(result.index) == list(expected.index)
+    assert result.geometry.geom_equals(expected.geometry).all()
+    assert np.isclose(result.area.sum(), parcels.area.sum())
+
+
+def sequential_fill_gaps(gdf, gap_threshold=10.0):
+    """The original gap-by-gap, parcel-by-parcel loop, as a reference."""
+    gdf = gdf.copy()
+    minx, miny, maxx, maxy = gdf.total_bounds
+    bbox = Polygon([(minx, miny), (maxx, miny), (maxx, maxy), (minx, maxy)])
+    gaps = bbox.difference(unary_union(gdf.geometry))
+    gap_polygons = list(gaps.geoms) if gaps.geom_type == 'MultiPolygon' else [gaps]
+
+    for gap in gap_polygons:
+        if gap.area > gap_threshold or gap.area < 0.01:
+            continue
+        best_parcel_idx = None
+        best_shared_length = 0
+        for idx, parcel in gdf.iterrows():
+            shared_length = parcel.geometry.boundary.intersection(gap.boundary).length
+            if shared_length > best_shared_length:
+                best_shared_length = shared_length
+                best_parcel_idx = idx
+        if best_parcel_idx is not None:
+            merged = unary_union([gdf.loc[best_parcel_idx, 'geometry'], gap])
+            if merged.is_valid:
+                gdf.loc[best_parcel_idx, 'geometry'] = merged
+    return gdf
+
+
+def test_bulk_gap_filling_matches_sequential():
+    """Irregular grid with missing cells, two of them meeting at a corner."""
+    rng = np.random.default_rng(11)
+    xs = np.r_[0, np.cumsum(rng.uniform(2, 4, 10))]
+    ys = np.r_[0, np.cumsum(rng.uniform(2, 4, 10))]
+
+    # (3, 2) and (2, 3) meet at a point and both go to cell (2, 2), so it
+    # absorbs the second gap after growing; (2, 6) exceeds the threshold
+    missing = {(3, 2), (2, 3), (2, 6), (6, 2), (6, 6), (7, 4)}
+    cells = {
+        (i, j): box(xs[i], ys[j], xs[i + 1], ys[j + 1])
+        for j in range(10) for i in range(10) if (i, j) not in missing
+    }
+    # A parcel with a hole, filled back by the parcel itself
+    cells[(5, 8)] = cells[(5, 8)].difference(cells[(5, 8)].centroid.buffer(0.5))
+    parcels = gpd.GeoDataFrame(
+        geometry=list(cells.values()), index=np.arange(len(cells)) * 2, crs='EPSG:32644'
+    )
+
+    expected = sequential_fill_gaps(parcels)
+    result = TopologyFixer()._fill_gaps(parcels)
+
+    # The corner parcel takes both gaps; three more gaps and the hole fill
+    corner = parcels.index[list(cells).index((2, 2))]
+    both_gaps = (xs[4] - xs[3]) * (ys[3] - ys[2]) + (xs[3] - xs[2]) * (ys[4] - ys[3])
+    gained = expected.area - parcels.area
+    assert np.isclose(gained[corner], both_gaps)
+    assert (gained > 1e-9).sum() == 5
+
+    assert list(result.index) == list(expected.index)
+    assert result.geometry.geom_equals(expected.geometry).all()
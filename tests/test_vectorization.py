@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Tests for segment merging and mask vectorization.
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import numpy as np
+import geopandas as gpd
+import rasterio
+import shapely
+from shapely.geometry import MultiPolygon, Polygon, box
+
+from src.vectorization import MaskVectorizer, TopologyEnforcer, merge_adjacent_segments
+
+
+def grid(nx, ny, cell=10.0, keep=lambda i, j: True, width=lambda i, j: 1.0):
+    """Grid of cells; `width` scales each cell's x extent."""
+    geoms = [
+        box(i * cell, j * cell, i * cell + cell * width(i, j), (j + 1) * cell)
+        for i in range(nx) for j in range(ny) if keep(i, j)
+    ]
+    return gpd.GeoDataFrame(geometry=geoms, crs='EPSG:32644')
+
+
+def test_checkerboard_corners_do_not_merge():
+    """Cells sharing only a corner stay separate and no area is lost."""
+    segments = grid(10, 5, keep=lambda i, j: (i + j) % 2 == 0)
+    merged = merge_adjacent_segments(segments)
+
+    assert len(merged) == 25
+    assert np.isclose(merged.area.sum(), segments.area.sum())
+
+
+def test_equal_grid_merges_transitively():
+    """Equal cells sharing edges merge into one parcel."""
+    segments = grid(5, 4)
+    merged = merge_adjacent_segments(segments)
+
+    assert len(merged) == 1
+    assert merged.iloc[0].geometry.geom_type == 'Polygon'
+    assert np.isclose(merged.area_sqm.sum(), segments.area.sum())
+
+
+def test_mixed_sizes_preserve_total_area():
+    """Whatever merges, parcel count shrinks and total area is kept."""
+    rng = np.random.default_rng(0)
+    widths = rng.uniform(0.3, 1.0, (10, 10))
+    segments = grid(10, 10, width=lambda i, j: widths[i, j])
+    merged = merge_adjacent_segments(segments)
+
+    assert 1 <= len(merged) <= len(segments)
+    assert np.isclose(merged.area.sum(), segments.area.sum())
+    assert (merged.geom_type == 'Polygon').all()
+
+
+def test_result_does_not_depend_on_row_order():
+    segments = grid(6, 1)
+    shuffled = segments.sample(frac=1, random_state=3).reset_index(drop=True)
+
+    assert len(merge_adjacent_segments(segments)) == len(merge_adjacent_segments(shuffled)) == 1
+
+
+def test_shared_simplify_keeps_a_clean_fabric():
+    """Shared-mode vectorization of Voronoi labels simplifies without gaps or overlaps."""
+    rng = np.random.default_rng(0)
+    seeds = rng.uniform(0, 80, (25, 2))
+    rows, cols = np.mgrid[0:80, 0:80]
+    distances = np.hypot(cols[..., None] - seeds[:, 0], rows[..., None] - seeds[:, 1])
+    labels = (distances.argmin(axis=-1) + 1).astype(np.uint8)
+    transform = rasterio.Affine(1, 0, 0, 0, -1, 80)
+
+    raw = MaskVectorizer(simplify_tolerance=0, min_area=5).vectorize_mask(labels, transform)
+    polygon = MaskVectorizer(simplify_tolerance=1.0, min_area=5).vectorize_mask(labels, transform)
+    shared = MaskVectorizer(
+        simplify_tolerance=1.0, min_area=5, simplify_mode='shared'
+    ).vectorize_mask(labels, transform)
+
+    assert len(shared) == len(polygon) == len(raw) == 25
+    assert (shared.geom_type == 'Polygon').all()
+    assert shared.is_valid.all()
+
+    # Staircase pixel edges are actually simplified
+    def vertices(gdf):
+        return shapely.get_num_coordinates(gdf.geometry.to_numpy()).sum()
+    assert vertices(shared) < vertices(raw) / 2
+
+    # Neighbours still tile the raster exactly
+    union = shapely.union_all(shared.geometry.to_numpy())
+    assert np.isclose(union.area, 80 * 80)
+    assert np.isclose(shared.area_sqm.sum(), 80 * 80)
+
+    # Per-polygon simplification of the same labels does not
+    union = shapely.union_all(polygon.geometry.to_numpy())
+    assert not np.isclose(polygon.area_sqm.sum(), union.area)
+
+
+def union_overlap_removal(parcels, min_area):
+    """The original loop that differences against everything accepted so far."""
+    geometries = list(parcels.geometry)
+    cleaned = []
+    used_area = None
+    for idx in np.argsort([-g.area for g in geometries]):
+        geom = geometries[idx]
+        if used_area is None:
+            used_area = geom
+            cleaned.append((idx, geom))
+            continue
+        if geom.intersects(used_area):
+            geom = geom.difference(used_area)
+        if not geom.is_empty and geom.area >= min_area:
+            if isinstance(geom, MultiPolygon):
+                geom = max(geom.geoms, key=lambda g: g.area)
+            if isinstance(geom, Polygon) and geom.area >= min_area:
+                used_area = used_area.union(geom)
+                cleaned.append((idx, geom))
+    return cleaned
+
+
+def test_neighbour_overlap_removal_matches_union_loop():
+    rng = np.random.default_rng(7)
+    geoms = []
+    for _ in range(200):
+        x, y = rng.uniform(0, 300, 2)
+        w, h = rng.uniform(10, 40, 2)
+        geoms.append(box(x, y, x + w, y + h))
+    parcels = gpd.GeoDataFrame(geometry=geoms, crs='EPSG:32644')
+
+    expected = union_overlap_removal(parcels, min_area=50.0)
+    result = TopologyEnforcer(min_area=50.0)._remove_overlaps(parcels)
+
+    assert list(result.index) == [idx for idx, _ in expected]
+    for geom, (_, reference) in zip(result.geometry, expected):
+        assert geom.symmetric_difference(reference).area < 1e-6
+
+
+def test_snap_joins_near_corners_within_tolerance():
+    """Grid cells whose corners each parcel digitised up to 3 cm apart."""
+    rng = np.random.default_rng(3)
+    geoms = []
+    for i in range(6):
+        for j in range(6):
+            corners = np.array([(i, j), (i + 1, j), (i + 1, j + 1), (i, j + 1)]) * 10.0
+            corners += rng.uniform(-0.03, 0.03, corners.shape)
+            geoms.append(Polygon(corners))
+    parcels = gpd.GeoDataFrame(geometry=geoms, crs='EPSG:32644')
+    enforcer = TopologyEnforcer(snap_tolerance=0.1)
+
+    snapped = enforcer._snap_vertices(parcels)
+
+    # No vertex moves further than the tolerance
+    before = shapely.get_coordinates(parcels.geometry.to_numpy())
+    after = shapely.get_coordinates(snapped.geometry.to_numpy())
+    assert np.hypot(*(after - before).T).max() <= 0.1
+
+    # Each grid corner collapses to one shared vertex
+    assert len(np.unique(after, axis=0)) == 7 * 7
+    assert snapped.is_valid.all()
+    assert np.isclose(shapely.union_all(snapped.geometry.to_numpy()).area, snapped.area.sum())
+
+    # Row order does not change the result
+    shuffled = enforcer._snap_vertices(parcels.sample(frac=1, random_state=0))
+    assert shuffled.geometry.geom_equals_exact(snapped.geometry.loc[shuffled.index], 0).all()